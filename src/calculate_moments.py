@@ -3,6 +3,8 @@ import numpy as np
 import pandas as pd
 from pandas.api.types import is_categorical_dtype
 
+from src.shared import get_integer_codes
+
 DEFAULT_WINDOW = 7
 DEFAULT_TAKE_LOGS = True
 DEFAULT_CENTER = False
@@ -138,6 +140,63 @@ def calculate_period_outcome_sim(df, outcome, groupby=None):
     return out
 
 
+def calculate_period_outcomes_sim(df, outcomes, groupby=None):
+    """Calculate the means of several outcomes on a dataset of one period at once.
+
+    This is equivalent to calling :func:`calculate_period_outcome_sim` for every
+    outcome without filling missing values. The groups are identified only once by
+    their integer codes and the means of all outcomes are computed with
+    :func:`numpy.bincount` instead of one pandas groupby per outcome.
+
+    Args:
+        df (pandas.DataFrame): Simulated states DataFrame for one period.
+        outcomes (dict): Maps the names of the outcomes to columns in df or to boolean
+            or numeric arrays with one entry per individual.
+        groupby (str or None): Defines the subgroups for which the outcomes are
+            calculated.
+
+    Returns:
+        dict: Maps the names of the outcomes to Series with the outcome for one day.
+            The first index level is date. If groupby is specified, there is a second
+            index level with the groups. Empty groups have missing values.
+
+    """
+    date = pd.Timestamp(df["date"].iloc[0]).normalize()
+    date_index = pd.DatetimeIndex([date], name="date", freq="D")
+    if groupby is None:
+        codes = np.zeros(len(df), dtype=np.int8)
+        index = date_index
+    elif is_categorical_dtype(df[groupby]):
+        # Like the groupby, all categories are kept even if they are not observed.
+        codes, categories = get_integer_codes(df, groupby)
+        categories = pd.CategoricalIndex(
+            categories, categories=categories, ordered=df[groupby].cat.ordered
+        )
+        index = pd.MultiIndex.from_product(
+            [date_index, categories], names=["date", groupby]
+        )
+    else:
+        categorical = pd.Categorical(df[groupby])
+        codes, categories = categorical.codes, categorical.categories
+        index = pd.MultiIndex.from_product(
+            [date_index, categories], names=["date", groupby]
+        )
+
+    in_group = codes >= 0
+    codes = codes[in_group]
+    counts = np.bincount(codes, minlength=len(index))
+
+    out = {}
+    for name, outcome in outcomes.items():
+        values = df[outcome] if isinstance(outcome, str) else outcome
+        values = np.asarray(values, dtype=float)[in_group]
+        sums = np.bincount(codes, weights=values, minlength=len(index))
+        with np.errstate(invalid="ignore"):
+            means = sums / counts
+        out[name] = pd.Series(means, index=index, name=name)
+    return out
+
+
 def aggregate_and_smooth_period_outcome_sim(
     simulate_result,
     outcome,
@@ -169,7 +228,7 @@ def aggregate_and_smooth_period_outcome_sim(
 
     """
     period_outcomes = simulate_result["period_outputs"][outcome]
-    per_individual = pd.concat(period_outcomes)
+    per_individual = period_output_to_pandas(period_outcomes)
 
     out = _smooth_and_scale_daily_outcome_per_individual(
         per_individual,
@@ -182,6 +241,125 @@ def aggregate_and_smooth_period_outcome_sim(
     return out
 
 
+def compress_period_outputs(period_outputs):
+    """Store the daily series of each period output in one preallocated array.
+
+    sid returns a list with one small series per period for every period output.
+    Series which share the same groups on every day are stored as a dictionary with
+    the dates, the groups and a two-dimensional array with one row per day and one
+    column per group. This is much smaller when pickled and can be converted to
+    pandas without concatenating hundreds of series. Days on which an output is empty
+    get a row of NaNs and the date NaT. Other period outputs are kept as lists and
+    compressed period outputs are returned unchanged.
+
+    The arrays are filled after the simulation from the lists which sid returns because
+    sid offers no way to accumulate the period outputs while it simulates. Thus, the
+    peak memory during the simulation is unchanged and only the stored and pickled
+    period outputs shrink.
+
+    Args:
+        period_outputs (dict): Maps the names of the period outputs to lists with the
+            output of every period or to compressed period outputs.
+
+    Returns:
+        dict: Maps the names of the period outputs to compressed period outputs or
+            the original lists. Use :func:`period_output_to_pandas` to convert them.
+
+    """
+    return {
+        name: _compress_period_output(outputs)
+        for name, outputs in period_outputs.items()
+    }
+
+
+def _compress_period_output(outputs):
+    if isinstance(outputs, dict):
+        return outputs
+    if not outputs or not all(isinstance(sr, pd.Series) for sr in outputs):
+        return outputs
+    non_empty = [sr for sr in outputs if len(sr) > 0]
+    if not non_empty:
+        return outputs
+
+    first = non_empty[0]
+    if isinstance(first.index, pd.MultiIndex):
+        groups = first.index.droplevel(0)
+    elif len(first) == 1:
+        groups = None
+    else:
+        return outputs
+
+    n_groups = 1 if groups is None else len(groups)
+    values = np.full((len(outputs), n_groups), np.nan)
+    dates = []
+    for i, sr in enumerate(outputs):
+        if len(sr) == 0:
+            dates.append(pd.NaT)
+            continue
+        if len(sr) != n_groups or sr.name != first.name:
+            return outputs
+        if groups is not None and not sr.index.droplevel(0).equals(groups):
+            return outputs
+        if sr.index.get_level_values(0).nunique() != 1:
+            return outputs
+        values[i] = sr.to_numpy()
+        dates.append(sr.index.get_level_values(0)[0])
+
+    compressed = {
+        "name": first.name,
+        "dates": pd.Index(dates, name=first.index.names[0]),
+        "groups": groups,
+        "values": values,
+        "dtype": first.dtype,
+        "has_freq": getattr(first.index, "freq", None) is not None,
+    }
+    return compressed
+
+
+def period_output_to_pandas(period_output):
+    """Convert a period output to one series.
+
+    Args:
+        period_output (list or dict): A list with the outputs of each period or a
+            period output compressed by :func:`compress_period_outputs`.
+
+    Returns:
+        pd.Series: The concatenated outputs of all periods.
+
+    """
+    if not isinstance(period_output, dict):
+        return pd.concat(period_output)
+
+    dates = period_output["dates"]
+    values = period_output["values"]
+    is_empty_day = np.asarray(pd.isna(dates))
+    if is_empty_day.any():
+        dates = dates[~is_empty_day]
+        values = values[~is_empty_day]
+
+    groups = period_output["groups"]
+    if groups is None:
+        # Like pd.concat, keep the frequency of consecutive daily outputs.
+        index = (
+            pd.DatetimeIndex(dates, freq="infer")
+            if period_output["has_freq"]
+            else dates
+        )
+    else:
+        n_days, n_groups = values.shape
+        group_positions = np.tile(np.arange(n_groups), n_days)
+        index = pd.MultiIndex.from_arrays(
+            [dates.repeat(n_groups)]
+            + [
+                groups.get_level_values(level).take(group_positions)
+                for level in range(groups.nlevels)
+            ],
+            names=[dates.name] + list(groups.names),
+        )
+    sr = pd.Series(values.ravel(), index=index, name=period_output["name"])
+    return sr.astype(period_output["dtype"])
+
+
 def smoothed_outcome_per_hundred_thousand_rki(
     df,
     outcome,
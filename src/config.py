@@ -55,6 +55,13 @@ else:
 SRC = Path(__file__).parent.resolve()
 BLD = SRC.parent / "bld"
 
+N_SIMULATION_PROCESSES = 4
+"""int: Number of processes which simulate the seeds of one scenario in parallel.
+
+Every process needs as much memory as one simulation.
+
+"""
+
 
 POPULATION_GERMANY = 83_000_000
 
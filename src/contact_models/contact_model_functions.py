@@ -1,10 +1,19 @@
+import threading
+import weakref
+
 import numba as nb
 import numpy as np
 import pandas as pd
-from sid.shared import boolean_choices
 from sid.time import get_date
 
+from src.shared import create_rng
 from src.shared import from_epochs_to_timestamps
+from src.shared import get_integer_codes
+from src.shared import get_params_slice
+from src.shared import get_params_value
+from src.shared import get_params_view
+from src.shared import get_period_mask
+from src.shared import map_with_integer_codes
 
 
 IS_POSITIVE_CASE = (
@@ -21,9 +30,16 @@ The individual either ...
 
 """
 
+CONDITION_MULTIPLIERS = ("symptomatic_multiplier", "positive_test_multiplier")
+"""tuple: Names of the params entries by which contacts are reduced on a condition.
+
+The order is the order of the columns of the conditions in the context of a period.
+
+"""
+
 
 def go_to_weekly_meeting(
-    states, params, group_col_name, day_of_week, seed  # noqa: U100
+    states, params, group_col_name, day_of_week, seed, context_cache=None  # noqa: U100
 ):
     """Return who participates in a weekly meeting.
 
@@ -34,33 +50,29 @@ def go_to_weekly_meeting(
         group_col_name (str): name of the column identifying this contact model's
             group column.
         day_of_week (str): day of the week on which this model takes place.
+        context_cache (dict, optional): cache that is shared between all contact
+            models. See :func:`get_contact_model_context`.
 
     Returns:
         attends_meeting (pandas.Series): same index as states. 1 for workers that
             go to the weekly meeting today.
 
     """
-    date = get_date(states)
-    day = date.day_name()
-    if day != day_of_week:
+    context = get_contact_model_context(states, context_cache)
+    if context["day"] != day_of_week:
         attends_meeting = pd.Series(data=False, index=states.index)
     else:
         attends_meeting = states[group_col_name] != -1
-        for params_entry, condition in [
-            ("symptomatic_multiplier", states["symptomatic"]),
-            ("positive_test_multiplier", states["knows_currently_infected"]),
-        ]:
-            attends_meeting = reduce_contacts_on_condition(
-                attends_meeting,
-                states,
-                params.loc[(params_entry, params_entry), "value"],
-                condition,
-                is_recurrent=True,
-            )
+        attends_meeting = _reduce_contacts_with_context(
+            contacts=attends_meeting,
+            context=context,
+            multipliers=_get_multipliers(params),
+            is_recurrent=True,
+        )
     return attends_meeting
 
 
-def go_to_daily_work_meeting(states, params, seed):  # noqa: U100
+def go_to_daily_work_meeting(states, params, seed, context_cache=None):  # noqa: U100
     """Return which people go to work.
 
     Args:
@@ -68,53 +80,50 @@ def go_to_daily_work_meeting(states, params, seed):  # noqa: U100
         params (pandas.DataFrame): DataFrame with two index levels,
             subcategory and name. has a "value" column that contains the probabilities
             to the number of possible columns in the "name" index level.
+        context_cache (dict, optional): cache that is shared between all contact
+            models. See :func:`get_contact_model_context`.
 
     Returns:
         attends_work (pandas.Series): same index as states. 1 for workers that go to
             work this period, 0 for everyone else.
 
     """
-    date = get_date(states)
-    day = date.day_name()
+    context = get_contact_model_context(states, context_cache)
+    day = context["day"]
 
     attends_work = (states["occupation"] == "working") & (
         states["work_daily_group_id"] != -1
     )
 
-    if day in ["Saturday", "Sunday"]:
+    if context["is_weekend"]:
         attends_work = attends_work & states[f"work_{day.lower()}"]
     else:
-        for params_entry, condition in [
-            ("symptomatic_multiplier", states["symptomatic"]),
-            ("positive_test_multiplier", states["knows_currently_infected"]),
-        ]:
-            attends_work = reduce_contacts_on_condition(
-                attends_work,
-                states,
-                params.loc[(params_entry, params_entry), "value"],
-                condition,
-                is_recurrent=True,
-            )
+        attends_work = _reduce_contacts_with_context(
+            contacts=attends_work,
+            context=context,
+            multipliers=_get_multipliers(params),
+            is_recurrent=True,
+        )
     return attends_work
 
 
-def meet_daily_other_contacts(states, params, group_col_name, seed):  # noqa: U100
+def meet_daily_other_contacts(
+    states, params, group_col_name, seed, context_cache=None  # noqa: U100
+):
+    context = get_contact_model_context(states, context_cache)
     attends_meeting = states[group_col_name] != -1
-    for params_entry, condition in [
-        ("symptomatic_multiplier", states["symptomatic"]),
-        ("positive_test_multiplier", states["knows_currently_infected"]),
-    ]:
-        attends_meeting = reduce_contacts_on_condition(
-            attends_meeting,
-            states,
-            params.loc[(params_entry, params_entry), "value"],
-            condition,
-            is_recurrent=True,
-        )
+    attends_meeting = _reduce_contacts_with_context(
+        contacts=attends_meeting,
+        context=context,
+        multipliers=_get_multipliers(params),
+        is_recurrent=True,
+    )
     return attends_meeting
 
 
-def attends_educational_facility(states, params, id_column, seed):  # noqa: U100
+def attends_educational_facility(
+    states, params, id_column, seed, context_cache=None  # noqa: U100
+):
     """Indicate which children go to an educational facility.
 
     Children go to an educational facility on weekdays.
@@ -127,6 +136,8 @@ def attends_educational_facility(states, params, id_column, seed):  # noqa: U100
         params (pandas.DataFrame): DataFrame with three category levels,
         id_column (str): name of the column in *states* that identifies
             which pupils and adults belong to a group.
+        context_cache (dict, optional): cache that is shared between all contact
+            models. See :func:`get_contact_model_context`.
 
     Returns:
         attends_facility (pandas.Series): It is a series with the same index as states.
@@ -137,30 +148,24 @@ def attends_educational_facility(states, params, id_column, seed):  # noqa: U100
     facility, _, _, digit = id_column.split("_")
     model_name = f"educ_{facility}_{digit}"
 
-    date = get_date(states)
-    day = date.day_name()
-    if day in ["Saturday", "Sunday"]:
+    context = get_contact_model_context(states, context_cache)
+    if context["is_weekend"]:
         attends_facility = pd.Series(data=False, index=states.index)
     else:
         attends_facility = states[id_column] != -1
         attends_facility = _pupils_having_vacations_do_not_attend(
-            attends_facility, states, params
+            attends_facility, states, params, context
+        )
+        attends_facility = _reduce_contacts_with_context(
+            contacts=attends_facility,
+            context=context,
+            multipliers=_get_multipliers(params, model_name),
+            is_recurrent=True,
         )
-        for params_entry, condition in [
-            ("symptomatic_multiplier", states["symptomatic"]),
-            ("positive_test_multiplier", states["knows_currently_infected"]),
-        ]:
-            attends_facility = reduce_contacts_on_condition(
-                attends_facility,
-                states,
-                params.loc[(model_name, params_entry, params_entry), "value"],
-                condition,
-                is_recurrent=True,
-            )
     return attends_facility
 
 
-def meet_hh_members(states, params, seed):  # noqa: U100
+def meet_hh_members(states, params, seed, context_cache=None):  # noqa: U100
     """Meet household members.
 
     As single person households have unique household ids, everyone meets their
@@ -172,42 +177,41 @@ def meet_hh_members(states, params, seed):  # noqa: U100
         params (pandas.DataFrame): DataFrame with two index levels,
             subcategory and name. has a "value" column that contains the probabilities
             to the number of possible columns in the "name" index level.
+        context_cache (dict, optional): cache that is shared between all contact
+            models. See :func:`get_contact_model_context`.
 
     """
+    context = get_contact_model_context(states, context_cache)
     meet_hh = states["hh_model_group_id"] != -1
-    for params_entry, condition in [
-        ("symptomatic_multiplier", states["symptomatic"]),
-        ("positive_test_multiplier", states["knows_currently_infected"]),
-    ]:
-        meet_hh = reduce_contacts_on_condition(
-            meet_hh,
-            states,
-            params.loc[(params_entry, params_entry), "value"],
-            condition,
-            is_recurrent=True,
-        )
+    meet_hh = _reduce_contacts_with_context(
+        contacts=meet_hh,
+        context=context,
+        multipliers=_get_multipliers(params),
+        is_recurrent=True,
+    )
     return meet_hh
 
 
-def meet_other_non_recurrent_contacts(states, params, seed):
+def meet_other_non_recurrent_contacts(states, params, seed, context_cache=None):
     """Meet other non recurrent contacts.
 
     Individuals in households with educ_workers, retired and children have
     additional contacts during vacations.
 
     """
+    context = get_contact_model_context(states, context_cache)
     contacts = calculate_non_recurrent_contacts_from_empirical_distribution(
         states=states,
-        params=params.loc["other_non_recurrent"],
+        params=get_params_slice(params, "other_non_recurrent"),
         seed=seed,
         on_weekends=True,
         query=None,
         reduce_on_condition=False,
+        context_cache=context_cache,
     )
     affected_in_case_of_vacation = _identify_ppl_affected_by_vacation(states)
 
-    date = get_date(states)
-    state_to_vacation = get_states_w_vacations(date, params)
+    state_to_vacation = _get_states_w_vacations_from_context(context, params)
     potential_vacation_contacts = _draw_potential_vacation_contacts(
         states, params, state_to_vacation, seed
     )
@@ -216,17 +220,12 @@ def meet_other_non_recurrent_contacts(states, params, seed):
     )
     contacts = contacts + vacation_contacts
 
-    for params_entry, condition in [
-        ("symptomatic_multiplier", states["symptomatic"]),
-        ("positive_test_multiplier", states["knows_currently_infected"]),
-    ]:
-        contacts = reduce_contacts_on_condition(
-            contacts,
-            states,
-            params.loc[("other_non_recurrent", params_entry, params_entry), "value"],
-            condition,
-            is_recurrent=False,
-        )
+    contacts = _reduce_contacts_with_context(
+        contacts=contacts,
+        context=context,
+        multipliers=_get_multipliers(params, "other_non_recurrent"),
+        is_recurrent=False,
+    )
 
     contacts = contacts.astype(int)
     return contacts
@@ -243,19 +242,25 @@ def _identify_ppl_affected_by_vacation(states):
 
 
 def _draw_potential_vacation_contacts(states, params, state_to_vacation, seed):
-    np.random.seed(seed)
-    fed_state_to_p_contact = {fed_state: 0 for fed_state in states["state"].unique()}
+    rng = create_rng(seed)
+    fed_state_to_p_contact = {}
     for fed_state, vacation in state_to_vacation.items():
         loc = ("additional_other_vacation_contact", "probability", vacation)
-        fed_state_to_p_contact[fed_state] = params.loc[loc, "value"]
-    p_contact = states["state"].map(fed_state_to_p_contact.get)
-    vacation_contact = pd.Series(boolean_choices(p_contact), index=states.index)
-    vacation_contact = vacation_contact.astype(int)
+        fed_state_to_p_contact[fed_state] = get_params_value(params, loc)
+    p_contact = map_with_integer_codes(states, "state", fed_state_to_p_contact, 0.0)
+    vacation_contact = rng.random(len(states)) < p_contact
+    vacation_contact = pd.Series(vacation_contact, index=states.index).astype(int)
     return vacation_contact
 
 
 def calculate_non_recurrent_contacts_from_empirical_distribution(
-    states, params, on_weekends, seed, query=None, reduce_on_condition=True
+    states,
+    params,
+    on_weekends,
+    seed,
+    query=None,
+    reduce_on_condition=True,
+    context_cache=None,
 ):
     """Draw how many non recurrent contacts each person will have today.
 
@@ -270,29 +275,36 @@ def calculate_non_recurrent_contacts_from_empirical_distribution(
             "{on_weekends}_saturday" and "{on_weekends}_sunday" must be in states.
         query (str): query string to identify the subset of individuals to which this
             contact model applies.
+        context_cache (dict, optional): cache that is shared between all contact
+            models. See :func:`get_contact_model_context`.
 
     Returns:
         contacts (pandas.Series): index is the same as states. values is the number of
             contacts.
 
     """
-    date = get_date(states)
-    day = date.day_name()
+    context = get_contact_model_context(states, context_cache)
+    day = context["day"]
     contacts = pd.Series(0, index=states.index)
 
-    if not on_weekends and day in ["Saturday", "Sunday"]:
+    if not on_weekends and context["is_weekend"]:
         pass
     else:
-        if isinstance(on_weekends, str) and day in ["Saturday", "Sunday"]:
+        if isinstance(on_weekends, str) and context["is_weekend"]:
             participating_today = states[f"{on_weekends}_{day.lower()}"]
-            is_participating = states.eval(query) & participating_today
+            is_participating = (
+                pd.Series(get_period_mask(states, query), index=states.index)
+                & participating_today
+            )
         else:
             if query is not None:
-                is_participating = states.eval(query)
+                is_participating = pd.Series(
+                    get_period_mask(states, query), index=states.index
+                )
             else:
                 is_participating = pd.Series(True, index=states.index)
 
-        distribution = params.query("~subcategory.str.contains('multiplier')")["value"]
+        distribution = _get_contact_distribution(params)
         contacts[is_participating] = _draw_nr_of_contacts(
             distribution=distribution,
             is_participating=is_participating,
@@ -301,17 +313,12 @@ def calculate_non_recurrent_contacts_from_empirical_distribution(
         )
 
         if reduce_on_condition:
-            for params_entry, condition in [
-                ("symptomatic_multiplier", states["symptomatic"]),
-                ("positive_test_multiplier", states["knows_currently_infected"]),
-            ]:
-                contacts = reduce_contacts_on_condition(
-                    contacts,
-                    states,
-                    params.loc[(params_entry, params_entry), "value"],
-                    condition,
-                    is_recurrent=False,
-                )
+            contacts = _reduce_contacts_with_context(
+                contacts=contacts,
+                context=context,
+                multipliers=_get_multipliers(params),
+                is_recurrent=False,
+            )
     contacts = contacts.astype(float)
     return contacts
 
@@ -338,59 +345,295 @@ def _draw_nr_of_contacts(distribution, is_participating, states, seed):
     is_age_varying = distribution.index.get_level_values("subcategory").nunique() > 1
 
     if is_age_varying:
-        age_labels = [f"{i}-{i + 9}" for i in range(0, 71, 10)] + ["80-100"]
-        age_dtype = pd.CategoricalDtype(categories=age_labels, ordered=True)
-        age_group = states["age_group"].astype(age_dtype)
-        age_codes = age_group.cat.codes.to_numpy()
+        codes, age_labels = get_integer_codes(states, "age_group")
 
         probs_df = distribution.unstack().reindex(age_labels).fillna(0)
         support = probs_df.columns.to_numpy().astype(int)
         probs = probs_df.to_numpy()
-        cum_probs = probs.cumsum(axis=1)
-
-        nr_of_contacts_arr = _draw_age_varying_nr_of_contacts_numba(
-            support=support,
-            cum_probs=cum_probs,
-            age_codes=age_codes,
-            is_participating=is_participating.to_numpy(),
-            seed=seed,
-        )
-
     else:
-        np.random.seed(seed)
-        support = distribution.index.get_level_values("name").to_numpy()
-        probs = distribution.to_numpy()
-        nr_of_contacts_arr = np.where(
-            is_participating.to_numpy(),
-            np.random.choice(support, p=probs, size=len(states)),
-            0,
-        )
+        codes = np.zeros(len(states), dtype=np.int8)
+        support = distribution.index.get_level_values("name").to_numpy().astype(float)
+        probs = distribution.to_numpy().reshape(1, -1)
+
+    # The thread pool of numba must only be used from the main thread. In the threads
+    # of concurrently evaluated contact models, the chunks are processed serially.
+    if threading.current_thread() is threading.main_thread():
+        draw_nr_of_contacts = _draw_nr_of_contacts_parallel
+    else:
+        draw_nr_of_contacts = _draw_nr_of_contacts_serial
+
+    nr_of_contacts_arr = draw_nr_of_contacts(
+        support=support,
+        cum_probs=probs.cumsum(axis=1),
+        codes=codes,
+        is_participating=is_participating.to_numpy(),
+        chunk_seeds=_get_chunk_seeds(seed, len(states)),
+        chunk_size=CHUNK_SIZE,
+    )
 
     return pd.Series(nr_of_contacts_arr, index=states.index)
 
 
-@nb.njit
-def _draw_age_varying_nr_of_contacts_numba(
-    support, cum_probs, age_codes, is_participating, seed
+CHUNK_SIZE = 100_000
+"""int: Number of individuals for whom random numbers are drawn from one stream.
+
+The population is split into chunks of this size which are processed in parallel.
+Every chunk has its own seed so that the results do not depend on the number of
+threads.
+
+"""
+
+
+def _get_chunk_seeds(seed, n_obs):
+    n_chunks = max(1, int(np.ceil(n_obs / CHUNK_SIZE)))
+    return np.random.SeedSequence(seed).generate_state(n_chunks)
+
+
+def _draw_nr_of_contacts_numba(
+    support, cum_probs, codes, is_participating, chunk_seeds, chunk_size
 ):
-    np.random.seed(seed)
-    n_obs = len(age_codes)
+    """Draw the number of contacts with a binary search on the cumulative probabilities.
+
+    Args:
+        support (numpy.ndarray): The possible numbers of contacts.
+        cum_probs (numpy.ndarray): 2d array with the cumulative probabilities. There is
+            one row per group and one column per entry in support.
+        codes (numpy.ndarray): The row in cum_probs of each individual.
+        is_participating (numpy.ndarray): boolean array which is True for individuals
+            for whom the number of contacts is drawn.
+        chunk_seeds (numpy.ndarray): one seed per chunk of individuals.
+        chunk_size (int): number of individuals per chunk.
+
+    Returns:
+        out (numpy.ndarray): The number of contacts of each individual.
+
+    """
+    n_obs = len(codes)
+    highest_i = cum_probs.shape[1] - 1
     out = np.zeros(n_obs)
-    for i in range(n_obs):
-        if is_participating[i]:
-            out[i] = _fast_choice(support, cum_probs[age_codes[i]])
+    for chunk in nb.prange(len(chunk_seeds)):
+        # Each chunk is processed by one thread whose random state is reseeded.
+        np.random.seed(chunk_seeds[chunk])
+        for i in range(chunk * chunk_size, min((chunk + 1) * chunk_size, n_obs)):
+            if is_participating[i]:
+                u = np.random.uniform(0, 1)
+                j = min(np.searchsorted(cum_probs[codes[i]], u), highest_i)
+                out[i] = support[j]
     return out
 
 
-@nb.njit
-def _fast_choice(arr, cdf):
-    u = np.random.uniform(0, 1)
-    i = 0
-    highest_i = len(cdf) - 1
+_draw_nr_of_contacts_parallel = nb.njit(parallel=True)(_draw_nr_of_contacts_numba)
+_draw_nr_of_contacts_serial = nb.njit(nogil=True)(_draw_nr_of_contacts_numba)
+
+
+# -------------------------------------------------------------------------------------
 
-    while cdf[i] < u and i < highest_i:
-        i += 1
-    return arr[i]
+
+def get_contact_model_context(states, context_cache=None):
+    """Get the inputs that all contact models of one period share.
+
+    Every contact model needs the date, the weekday and who reduces their contacts
+    because of symptoms or a positive test. Creating those inputs once per period
+    instead of once per contact model saves many full scans over the states.
+
+    Args:
+        states (pandas.DataFrame): sid states DataFrame.
+        context_cache (dict, optional): dictionary that is shared between all contact
+            models. If given, the context is only created for the first contact model
+            that is evaluated on the states of a period and reused by all others.
+
+    Returns:
+        context (dict): Dictionary with the following entries:
+            - "date" (pandas.Timestamp): the current date.
+            - "day" (str): the name of the current weekday.
+            - "is_weekend" (bool): whether the current date is a Saturday or Sunday.
+            - "conditions" (numpy.ndarray): 2d boolean array with one column per
+              entry in :data:`CONDITION_MULTIPLIERS` that indicates for whom the
+              condition is fulfilled.
+            - "quarantine_compliance" (numpy.ndarray)
+            - "stays_home" (dict): cache for the boolean arrays that indicate who
+              reduces their contacts for a given combination of multipliers.
+
+    """
+    # sid always adds the date but contact models that do not depend on it
+    # can also be evaluated on states without a date column.
+    date = get_date(states) if "date" in states else None
+    if context_cache is None:
+        context_cache = {}
+    states_ref, current_date, context = context_cache.get(
+        "current", (lambda: None, None, None)
+    )
+    if states_ref() is not states or current_date != date:
+        day = None if date is None else date.day_name()
+        context = {
+            "date": date,
+            "day": day,
+            "is_weekend": day in ["Saturday", "Sunday"],
+            "conditions": np.column_stack(
+                [
+                    states["symptomatic"].to_numpy(dtype=bool),
+                    states["knows_currently_infected"].to_numpy(dtype=bool),
+                ]
+            ),
+            "quarantine_compliance": states["quarantine_compliance"].to_numpy(
+                dtype=float
+            ),
+            "stays_home": {},
+        }
+        # the states, the date and the context are replaced together such that
+        # concurrently evaluated contact models never see the context of another period.
+        context_cache["current"] = (weakref.ref(states), date, context)
+    return context
+
+
+def _get_contact_distribution(params):
+    """Get the distribution of the number of contacts of a contact model."""
+    derived = get_params_view(params)["derived"]
+    if "contact_distribution" not in derived:
+        sr = params["value"] if isinstance(params, pd.DataFrame) else params
+        subcategories = sr.index.get_level_values("subcategory")
+        derived["contact_distribution"] = sr[~subcategories.str.contains("multiplier")]
+    return derived["contact_distribution"]
+
+
+def _get_multipliers(params, *prefix):
+    """Get the symptomatic and positive test multiplier of one contact model.
+
+    Args:
+        params (pandas.DataFrame or pandas.Series): The params.
+        *prefix: The first index levels of the multipliers, e.g., the name of the
+            contact model if params contains the params of several models.
+
+    """
+    multipliers = {
+        params_entry: get_params_value(params, (*prefix, params_entry, params_entry))
+        for params_entry in CONDITION_MULTIPLIERS
+    }
+    return multipliers
+
+
+def _reduce_contacts_with_context(contacts, context, multipliers, is_recurrent):
+    """Reduce contacts of individuals who stay home because of a condition.
+
+    This is equivalent to calling :func:`reduce_contacts_on_condition` once for each
+    condition but the masks are taken from the context of the current period.
+
+    Args:
+        contacts (pandas.Series): The series with contacts.
+        context (dict): The context of the current period. See
+            :func:`get_contact_model_context`.
+        multipliers (dict): maps the names of the conditions in the context to the
+            share of people who maintain their contacts despite the condition.
+        is_recurrent (bool): whether the contacts are recurrent, i.e. boolean.
+
+    Returns:
+        reduced (pandas.Series): same index as contacts.
+
+    """
+    stays_home = _get_stays_home_mask(context, multipliers)
+    if is_recurrent:
+        reduced = contacts.to_numpy() & ~stays_home
+    else:
+        reduced = np.where(stays_home, 0, contacts.to_numpy())
+    return pd.Series(reduced, index=contacts.index)
+
+
+def _get_stays_home_mask(context, multipliers):
+    """Get who stays home given the multipliers of one contact model.
+
+    The masks are cached in the context because most contact models share the same
+    multipliers.
+
+    """
+    key = tuple(sorted(multipliers.items()))
+    cache = context["stays_home"]
+    if key not in cache:
+        multiplier_matrix = np.array(
+            [[multipliers[entry] for entry in CONDITION_MULTIPLIERS]], dtype=float
+        )
+        cache[key] = _get_stays_home_numba(
+            context["conditions"], context["quarantine_compliance"], multiplier_matrix
+        )[:, 0]
+    return cache[key]
+
+
+def reduce_contacts_on_conditions(
+    contacts, conditions, quarantine_compliance, multipliers
+):
+    """Reduce the contacts of several contact models on several conditions at once.
+
+    An individual stays home in a contact model if any condition is fulfilled for her
+    and her quarantine compliance is above the multiplier of the contact model for
+    this condition. The masks of all contact models are computed in one pass over the
+    population.
+
+    Args:
+        contacts (pandas.DataFrame or numpy.ndarray): 2d array with one row per
+            individual and one column per contact model. Boolean columns are treated
+            as recurrent contacts and set to False, all other columns to 0.
+        conditions (numpy.ndarray or pandas.DataFrame): 2d boolean array with one
+            row per individual and one column per condition.
+        quarantine_compliance (numpy.ndarray or pandas.Series): The quarantine
+            compliance of each individual.
+        multipliers (numpy.ndarray or pandas.DataFrame): 2d array with one row per
+            contact model and one column per condition. The entries are the share of
+            people who maintain their contacts despite the condition.
+
+    Returns:
+        reduced (pandas.DataFrame or numpy.ndarray): The reduced contacts with the
+            same type, shape and dtypes as contacts.
+
+    """
+    stays_home = _get_stays_home_numba(
+        np.asarray(conditions, dtype=bool).reshape(len(quarantine_compliance), -1),
+        np.asarray(quarantine_compliance, dtype=float),
+        np.atleast_2d(np.asarray(multipliers, dtype=float)),
+    )
+
+    if isinstance(contacts, pd.DataFrame):
+        reduced = pd.DataFrame(
+            {
+                col: _set_contacts_to_zero(contacts[col].to_numpy(), stays_home[:, i])
+                for i, col in enumerate(contacts.columns)
+            },
+            index=contacts.index,
+        )
+    else:
+        reduced = _set_contacts_to_zero(np.asarray(contacts), stays_home)
+    return reduced
+
+
+def _set_contacts_to_zero(contacts, stays_home):
+    if contacts.dtype == bool:
+        reduced = contacts & ~stays_home
+    else:
+        reduced = np.where(stays_home, 0, contacts).astype(contacts.dtype)
+    return reduced
+
+
+@nb.njit(nogil=True)
+def _get_stays_home_numba(conditions, quarantine_compliance, multipliers):
+    """Get who stays home in each contact model.
+
+    Args:
+        conditions (numpy.ndarray): boolean array of shape (n_obs, n_conditions).
+        quarantine_compliance (numpy.ndarray): array of shape (n_obs,).
+        multipliers (numpy.ndarray): array of shape (n_models, n_conditions).
+
+    Returns:
+        stays_home (numpy.ndarray): boolean array of shape (n_obs, n_models).
+
+    """
+    n_obs, n_conditions = conditions.shape
+    n_models = multipliers.shape[0]
+    stays_home = np.zeros((n_obs, n_models), dtype=np.bool_)
+    for i in range(n_obs):
+        for j in range(n_conditions):
+            if conditions[i, j]:
+                for m in range(n_models):
+                    if quarantine_compliance[i] > multipliers[m, j]:
+                        stays_home[i, m] = True
+    return stays_home
 
 
 # -------------------------------------------------------------------------------------
@@ -399,9 +642,8 @@ def _fast_choice(arr, cdf):
 def reduce_contacts_on_condition(contacts, states, multiplier, condition, is_recurrent):
     """Reduce contacts for share of population for which condition is fulfilled.
 
-    The subset of contacts for which contacts are reduced is specified by the condition
-    and whoever has a positive number of contacts. Then, a share of individuals in the
-    subset is sampled and the contacts are set to 0.
+    Individuals for whom the condition is fulfilled and whose quarantine compliance is
+    above the multiplier stay home and their contacts are set to 0.
 
     Args:
         contacts (pandas.Series): The series with contacts.
@@ -411,11 +653,14 @@ def reduce_contacts_on_condition(contacts, states, multiplier, condition, is_rec
         condition (str, numpy.ndarray or pandas.Series): Condition or boolean array
             or Series which defines the subset of individuals who potentially reduce
             their contacts.
-        seed (int)
+        is_recurrent (bool): whether the contacts are recurrent, i.e. boolean.
+
+    Returns:
+        reduced (pandas.Series): same index and name as contacts.
 
     """
     if isinstance(condition, str):
-        is_condition_true = states.eval(condition)
+        is_condition_true = get_period_mask(states, condition)
     elif isinstance(condition, pd.Series):
         is_condition_true = condition.to_numpy()
     elif isinstance(condition, np.ndarray):
@@ -423,53 +668,147 @@ def reduce_contacts_on_condition(contacts, states, multiplier, condition, is_rec
     else:
         raise ValueError
 
-    refuser = states["quarantine_compliance"] <= multiplier
-    no_change = refuser | ~is_condition_true
-
+    reduced = reduce_contacts_on_conditions(
+        contacts=contacts.to_numpy()[:, None],
+        conditions=np.asarray(is_condition_true, dtype=bool),
+        quarantine_compliance=states["quarantine_compliance"],
+        multipliers=[[multiplier]],
+    )[:, 0]
     if is_recurrent:
-        reduced = contacts.where(cond=no_change, other=False)
-    else:
-        reduced = contacts.where(cond=no_change, other=0)
+        reduced = reduced.astype(bool)
 
-    return reduced
+    return pd.Series(reduced, index=contacts.index, name=contacts.name)
 
 
 # =============================================================================
 
 
-def _pupils_having_vacations_do_not_attend(attends_facility, states, params):
+def _pupils_having_vacations_do_not_attend(
+    attends_facility, states, params, context=None
+):
     """Make pupils stay away from school if their state has vacations."""
     attends_facility = attends_facility.copy(deep=True)
-    date = get_date(states)
-    states_w_vacations = get_states_w_vacations(date, params).keys()
-    has_vacation = states.state.isin(states_w_vacations)
-    attends_facility.loc[attends_facility & has_vacation] = False
+    if context is None:
+        context = get_contact_model_context(states)
+    if "has_vacation" not in context:
+        state_to_vacation = _get_states_w_vacations_from_context(context, params)
+        context["has_vacation"] = _has_vacation(states, state_to_vacation)
+    attends_facility.loc[attends_facility & context["has_vacation"]] = False
 
     return attends_facility
 
 
+def _get_states_w_vacations_from_context(context, params):
+    if "state_to_vacation" not in context:
+        context["state_to_vacation"] = get_states_w_vacations(context["date"], params)
+    return context["state_to_vacation"]
+
+
+def _has_vacation(states, state_to_vacation):
+    """Indicate who lives in a state with vacations by a gather on the state codes."""
+    state_has_vacation = {state: True for state in state_to_vacation}
+    has_vacation = map_with_integer_codes(states, "state", state_has_vacation, False)
+    return has_vacation.astype(bool)
+
+
 def get_states_w_vacations(date: pd.Timestamp, params: pd.DataFrame) -> dict:
     """Get states which currently have vacations for pupils.
 
+    The vacation dates are looked up in the calendar which is built once for each
+    set of vacations in the params. See :func:`get_vacation_calendar`.
+
     Returns:
         state_to_vacation_name (dict): keys are the states that have vacations
             on the current date. Values are the names of the vacation.
 
     """
-    vacations = params.filter(like="ferien", axis=0).copy()
+    calendar = get_vacation_calendar(params)
+    latest_vacation_date = calendar["last_date"]
+    assert (
+        date <= latest_vacation_date
+    ), f"Vacations are only known until {latest_vacation_date}"
+
+    day = (date - calendar["first_date"]).days
+    if day < 0:
+        state_to_vacation = {}
+    else:
+        state_to_vacation = {
+            state: calendar["vacations"][code]
+            for state, code in zip(calendar["states"], calendar["codes"][day])
+            if code != -1
+        }
+    return state_to_vacation
+
+
+_VACATION_CALENDARS = {}
+"""dict: Cache of :func:`get_vacation_calendar` keyed by the vacations in params."""
+
+
+def get_vacation_calendar(params):
+    """Get a date by state lookup table of vacations from the params.
+
+    Since the vacations never change during a simulation, the calendar is only built
+    once for every distinct set of vacations in the params.
+
+    Args:
+        params (pandas.DataFrame): The params DataFrame. Vacations are identified by
+            "ferien" in the index. The first index level is the name of the vacation,
+            the second the state and the third is "start" or "end". The dates are
+            stored as epochs.
+
+    Returns:
+        calendar (dict): Dictionary with the following entries:
+            - "first_date" (pandas.Timestamp): the start of the earliest vacation.
+            - "last_date" (pandas.Timestamp): the end of the latest vacation.
+            - "states" (list): the states.
+            - "vacations" (list): the names of the vacations.
+            - "codes" (numpy.ndarray): integer array with one row per date between
+              the first and the last date and one column per state. The entries
+              are the positions of the current vacations in "vacations" and -1
+              if the state has no vacations.
+
+    """
+    vacations = params.filter(like="ferien", axis=0)
     if vacations.empty:
         raise ValueError("'params' does not contain any information about vacations.")
 
+    key = pd.util.hash_pandas_object(vacations["value"]).to_numpy().tobytes()
+    if key not in _VACATION_CALENDARS:
+        # Only a handful of different vacation params exist, e.g., in tests.
+        if len(_VACATION_CALENDARS) >= 16:
+            _VACATION_CALENDARS.clear()
+        _VACATION_CALENDARS[key] = _build_vacation_calendar(vacations)
+    return _VACATION_CALENDARS[key]
+
+
+def _build_vacation_calendar(vacations):
+    vacations = vacations.copy()
     # Dates are stored as epochs so that value can be a numeric column.
     vacations["value"] = from_epochs_to_timestamps(vacations["value"])
     vacations = vacations.groupby(vacations.index.names)["value"].first().unstack()
-    latest_vacation_date = vacations["end"].max()
-    assert (
-        date <= latest_vacation_date
-    ), f"Vacations are only known until {latest_vacation_date}"
 
-    has_vacations = (vacations["start"] <= date) & (date <= vacations["end"])
-    state_to_vacation = {
-        state: name for name, state in has_vacations[has_vacations].index
+    first_date = vacations["start"].min()
+    last_date = vacations["end"].max()
+    vacation_names = sorted(vacations.index.unique(level=0))
+    states = sorted(vacations.index.unique(level=1))
+
+    n_days = (last_date - first_date).days + 1
+    codes = np.full((n_days, len(states)), -1)
+    # Later vacations overwrite earlier ones to match the order of the index.
+    for (name, state), start, end in zip(
+        vacations.index, vacations["start"], vacations["end"]
+    ):
+        if start <= end:
+            codes[
+                (start - first_date).days : (end - first_date).days + 1,
+                states.index(state),
+            ] = vacation_names.index(name)
+
+    calendar = {
+        "first_date": first_date,
+        "last_date": last_date,
+        "states": states,
+        "vacations": vacation_names,
+        "codes": codes,
     }
-    return state_to_vacation
+    return calendar
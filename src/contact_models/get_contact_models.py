@@ -1,7 +1,24 @@
+import atexit
+import os
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
 
+import numpy as np
+from sid.time import get_date
+
 from src.contact_models import contact_model_functions as cm_funcs
 from src.policies.policy_tools import combine_dictionaries
+from src.policies.policy_tools import update_dictionary
+from src.shared import get_params_view
+
+_EXECUTORS = {}
+"""dict: The thread pools which evaluate contact models concurrently.
+
+The keys are the process id and the number of threads. The pools are created lazily
+such that forked processes create their own pools and all simulations of a process
+share one pool.
+
+"""
 
 
 def get_all_contact_models():
@@ -28,9 +45,134 @@ def get_all_contact_models():
         get_other_weekly_contact_models(),
     ]
     contact_models = combine_dictionaries(to_combine)
+    contact_models = _share_context_cache(contact_models)
     return contact_models
 
 
+def _share_context_cache(contact_models):
+    """Let all contact models share one cache for the inputs they have in common.
+
+    See :func:`src.contact_models.contact_model_functions.get_contact_model_context`
+    for the inputs that are only created once per period.
+
+    """
+    context_cache = {}
+    shared = {}
+    for name, model in contact_models.items():
+        shared[name] = update_dictionary(
+            model, {"model": partial(model["model"], context_cache=context_cache)}
+        )
+    return shared
+
+
+def evaluate_contact_models_concurrently(contact_models, n_threads):
+    """Evaluate the contact models of each period concurrently in a thread pool.
+
+    sid evaluates the contact models one after another. The returned contact models
+    submit all contact models to a thread pool when the first of them is called in a
+    period. All others only collect their results. The numba kernels of the contact
+    models release the GIL such that the models run in parallel.
+
+    The seed of each contact model is derived from the seed which sid passes to the
+    first contact model and from the position of the contact model. Thus, results are
+    reproducible but differ from the results of a sequential evaluation.
+
+    Each model needs its own slice of the params, but the first contact model of a
+    period submits all models. Therefore, the "loc" of every model is replaced by a
+    slice of all params which sid applies without copying them. The slices of the
+    models are created once per params and shared by all periods. The contact models
+    must not modify their params.
+
+    A period starts when a contact model is called with other states or another date
+    than the running period. The running period holds a reference to its states such
+    that the states of another simulation are never mistaken for them. The period ends
+    when all contact models collected their results.
+
+    Args:
+        contact_models (dict): sid contact model dictionary.
+        n_threads (int): number of threads in the thread pool.
+
+    Returns:
+        concurrent_contact_models (dict): sid contact model dictionary.
+
+    """
+    period = {}
+    concurrent_contact_models = {}
+    for name, model in contact_models.items():
+        func = partial(
+            _get_result_of_concurrent_contact_model,
+            name=name,
+            contact_models=contact_models,
+            period=period,
+            n_threads=n_threads,
+        )
+        concurrent_model = update_dictionary(model, {"model": func})
+        concurrent_model["loc"] = slice(None)
+        concurrent_contact_models[name] = concurrent_model
+    return concurrent_contact_models
+
+
+def _get_result_of_concurrent_contact_model(
+    states, params, seed, name, contact_models, period, n_threads
+):
+    date = get_date(states)
+    is_running = period.get("states") is states and period.get("date") == date
+    if not is_running or name not in period["futures"]:
+        executor = _get_executor(n_threads)
+        model_params = _get_params_of_contact_models(params, contact_models)
+        seeds = np.random.SeedSequence(seed).generate_state(len(contact_models))
+        period["states"] = states
+        period["date"] = date
+        period["futures"] = {
+            model_name: executor.submit(
+                model["model"],
+                states=states,
+                params=model_params.get(model_name, params),
+                seed=int(model_seed),
+            )
+            for (model_name, model), model_seed in zip(contact_models.items(), seeds)
+        }
+
+    result = period["futures"].pop(name).result()
+    if not period["futures"]:
+        period.clear()
+    return result
+
+
+def _get_params_of_contact_models(params, contact_models):
+    """Get the params of the contact models which have a "loc".
+
+    The slices only depend on the params and the "loc" entries. Thus, they are cached
+    in the view of the params.
+
+    """
+    locs = tuple(
+        (name, model["loc"]) for name, model in contact_models.items() if "loc" in model
+    )
+    derived = get_params_view(params)["derived"]
+    key = ("contact_model_params", locs)
+    if key not in derived:
+        derived[key] = {name: params.loc[loc] for name, loc in locs}
+    return derived[key]
+
+
+def _get_executor(n_threads):
+    key = (os.getpid(), n_threads)
+    if key not in _EXECUTORS:
+        _EXECUTORS[key] = ThreadPoolExecutor(max_workers=n_threads)
+    return _EXECUTORS[key]
+
+
+def _shutdown_executors():
+    """Shut down the thread pools of this process."""
+    pid = os.getpid()
+    for key in [key for key in _EXECUTORS if key[0] == pid]:
+        _EXECUTORS.pop(key).shutdown()
+
+
+atexit.register(_shutdown_executors)
+
+
 def get_household_contact_model():
     household_contact_model = {
         "households": {
@@ -1,5 +1,8 @@
+import hashlib
 import itertools as it
+import os
 import warnings
+from pathlib import Path
 
 import pandas as pd
 
@@ -9,6 +12,14 @@ from src.create_initial_states.create_initial_infections import (
     create_initial_infections,
 )
 
+MAX_CACHED_INITIAL_CONDITIONS = 8
+"""int: Maximum number of initial conditions in a cache directory.
+
+Each entry can have hundreds of megabytes. If there are more entries, the least recently
+used entries are deleted.
+
+"""
+
 
 def create_initial_conditions(
     start,
@@ -22,9 +33,16 @@ def create_initial_conditions(
     overall_share_known_cases=None,
     group_share_known_cases=None,
     group_weights=None,
+    cache_dir=None,
 ):
     """Create the initial conditions, initial_infections and initial_immunity.
 
+    The initial conditions only depend on the arguments. If a ``cache_dir`` is given,
+    they are stored in a file named after a hash of the arguments and of the code which
+    creates them. Later calls with the same arguments load the file. Initial conditions
+    with a ``group_share_known_cases`` are never cached because the group share known
+    cases come from other simulations and rarely repeat.
+
     Args:
         start (str or pd.Timestamp): Start date for collection of initial
             infections.
@@ -46,12 +64,40 @@ def create_initial_conditions(
         group_share_known_cases (pandas.Series): Series with age_groups in the index.
             The values are interpreted as share of known cases for each age group.
         group_weights (pandas.Series): Series with sizes or weights of age groups.
+        cache_dir (pathlib.Path, optional): Directory with the cached initial
+            conditions. By default, nothing is cached.
 
     Returns:
         initial_conditions (dict): dictionary containing the initial infections and
             initial immunity.
 
     """
+    if group_share_known_cases is not None:
+        cache_dir = None
+
+    if cache_dir is not None:
+        key = _get_initial_conditions_key(
+            start=start,
+            end=end,
+            seed=seed,
+            virus_shares=virus_shares,
+            reporting_delay=reporting_delay,
+            synthetic_data=synthetic_data,
+            empirical_infections=empirical_infections,
+            population_size=population_size,
+            overall_share_known_cases=overall_share_known_cases,
+            group_share_known_cases=group_share_known_cases,
+            group_weights=group_weights,
+        )
+        path = Path(cache_dir) / f"{key}.pkl"
+        try:
+            initial_conditions = pd.read_pickle(path)
+            # mark the entry as recently used.
+            os.utime(path)
+            return initial_conditions
+        except FileNotFoundError:
+            pass
+
     seed = it.count(seed)
     upscaled_empirical_infections = _scale_up_empirical_new_infections(
         empirical_infections=empirical_infections,
@@ -80,12 +126,80 @@ def create_initial_conditions(
         seed=next(seed),
         population_size=population_size,
     )
-    return {
+    initial_conditions = {
         "initial_infections": initial_infections,
         "initial_immunity": initial_immunity,
         # virus shares are already inside the initial infections so not included here.
     }
 
+    if cache_dir is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # write to a temporary file first such that processes which run concurrently
+        # never load an incomplete file.
+        temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        pd.to_pickle(initial_conditions, temp_path)
+        os.replace(temp_path, path)
+        _prune_cache(cache_dir, MAX_CACHED_INITIAL_CONDITIONS)
+
+    return initial_conditions
+
+
+def _prune_cache(cache_dir, max_entries):
+    """Delete the least recently used entries of a cache directory."""
+    mtimes = {}
+    for path in Path(cache_dir).glob("*.pkl"):
+        try:
+            mtimes[path] = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            pass
+
+    to_delete = sorted(mtimes, key=mtimes.get)[: max(0, len(mtimes) - max_entries)]
+    for path in to_delete:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _get_initial_conditions_key(**kwargs):
+    """Hash the arguments of :func:`create_initial_conditions` and its code.
+
+    pandas objects are hashed by their values, index, columns and dtypes. Other
+    arguments are hashed by their string representation.
+
+    """
+    hasher = hashlib.sha256()
+    for module in [
+        "create_initial_conditions.py",
+        "create_initial_infections.py",
+        "create_initial_immunity.py",
+    ]:
+        hasher.update((Path(__file__).parent / module).read_bytes())
+
+    for name, value in sorted(kwargs.items()):
+        hasher.update(name.encode())
+        if isinstance(value, dict):
+            for key, sr in sorted(value.items()):
+                hasher.update(key.encode())
+                hasher.update(_hash_pandas_object(sr))
+        elif isinstance(value, (pd.Series, pd.DataFrame)):
+            hasher.update(_hash_pandas_object(value))
+        elif name in ["start", "end"]:
+            hasher.update(str(pd.Timestamp(value)).encode())
+        else:
+            hasher.update(repr(value).encode())
+    return hasher.hexdigest()
+
+
+def _hash_pandas_object(obj):
+    meta = [obj.index.names, obj.index.dtype if obj.index.nlevels == 1 else None]
+    if isinstance(obj, pd.DataFrame):
+        meta += [list(obj.columns), obj.dtypes.tolist()]
+    else:
+        meta += [obj.name, obj.dtype]
+    values = pd.util.hash_pandas_object(obj, index=True).to_numpy()
+    return repr(meta).encode() + values.tobytes()
+
 
 def _scale_up_empirical_new_infections(
     empirical_infections,
@@ -85,8 +85,10 @@ def create_initial_infections(
     )
 
     if virus_shares is not None:
-        for sr in virus_shares.values():
-            sr.index = sr.index - reporting_delay
+        virus_shares = {
+            name: sr.set_axis(sr.index - reporting_delay)
+            for name, sr in virus_shares.items()
+        }
         initially_infected = _add_variant_info_to_infections(
             initially_infected, virus_shares
         )
@@ -1,6 +1,8 @@
+import atexit
 import functools
 import os
 import shutil
+import tempfile
 
 import numpy as np
 import pandas as pd
@@ -11,12 +13,38 @@ from sid.plotting import prepare_data_for_infection_rates_by_contact_models
 
 from src.calculate_moments import aggregate_and_smooth_period_outcome_sim
 from src.calculate_moments import calculate_period_outcome_sim
+from src.calculate_moments import period_output_to_pandas
 from src.calculate_moments import smoothed_outcome_per_hundred_thousand_rki
 from src.config import BLD
+from src.create_initial_states.create_initial_conditions import (
+    create_initial_conditions,
+)
 from src.manfred.shared import hash_array
+from src.manfred.shared import load_evaluation
+from src.manfred.shared import save_evaluation
 from src.simulation.load_simulation_inputs import calculate_period_virus_share
+from src.simulation.load_simulation_inputs import get_simulation_dependencies
+from src.simulation.load_simulation_inputs import load_initial_conditions_inputs
 from src.simulation.load_simulation_inputs import load_simulation_inputs
 
+_MSM_INPUTS = {}
+"""dict: The inputs of the msm criterion which do not depend on the params.
+
+The keys are the start date, end date, the debug flag of a season and whether the
+criterion runs in memory.
+
+"""
+
+_MEMORY_DIRECTORY = "/dev/shm" if os.path.isdir("/dev/shm") else None
+"""str or None: A memory file system for temporary directories if there is one."""
+
+_OUTPUT_DIRECTORIES = {}
+"""dict: Maps process ids to the output directory of simulations in the in-memory mode.
+
+Each process creates its directory once and passes it to all its simulations.
+
+"""
+
 
 def get_parallelizable_msm_criterion(
     prefix,
@@ -26,8 +54,21 @@ def get_parallelizable_msm_criterion(
     spring_end_date,
     mode,
     debug,
+    evaluation_store=None,
+    in_memory=False,
 ):
-    """Get a parallelizable msm criterion function."""
+    """Get a parallelizable msm criterion function.
+
+    If an ``evaluation_store`` directory is given, every evaluation is stored there by
+    the hash of the params, the seed, the mode and the dates. Later evaluations with the
+    same inputs, e.g. of a restarted estimation, load the result instead of simulating.
+
+    If ``in_memory`` is True, the fall season passes the share of known cases directly
+    to the spring season instead of through a pickle file, the initial conditions are
+    never cached on disk and each process reuses one output directory for all its
+    simulations. The directory is created in memory if there is a memory file system.
+
+    """
     pmsm = functools.partial(
         _build_and_evaluate_msm_func,
         prefix=prefix,
@@ -37,6 +78,8 @@ def get_parallelizable_msm_criterion(
         spring_end_date=spring_end_date,
         mode=mode,
         debug=debug,
+        evaluation_store=evaluation_store,
+        in_memory=in_memory,
     )
     return pmsm
 
@@ -67,10 +110,27 @@ def _build_and_evaluate_msm_func(
     spring_end_date,
     mode,
     debug,
+    evaluation_store=None,
+    in_memory=False,
 ):
     """ """
     params_hash = hash_array(params["value"].to_numpy())
+    key = (
+        params_hash,
+        seed,
+        mode,
+        debug,
+        str(fall_start_date),
+        str(fall_end_date),
+        str(spring_start_date),
+        str(spring_end_date),
+    )
+    res = load_evaluation(evaluation_store, key)
+    if res is not None:
+        return res
+
     share_known_path = BLD / "exploration" / f"share_known_{params_hash}_{seed}.pkl"
+    group_share_known_cases = None
     if mode in ["fall", "combined"]:
         res_fall = _build_and_evaluate_msm_func_one_season(
             params=params,
@@ -79,10 +139,16 @@ def _build_and_evaluate_msm_func(
             start_date=fall_start_date,
             end_date=fall_end_date,
             debug=debug,
+            in_memory=in_memory,
         )
-        res_fall["share_known_cases"].to_pickle(share_known_path)
+        if in_memory:
+            group_share_known_cases = res_fall["share_known_cases"]
+        else:
+            res_fall["share_known_cases"].to_pickle(share_known_path)
 
     if mode in ["spring", "combined"]:
+        if group_share_known_cases is None:
+            group_share_known_cases = pd.read_pickle(share_known_path)
         res_spring = _build_and_evaluate_msm_func_one_season(
             params=params,
             seed=seed + 84587,
@@ -90,7 +156,8 @@ def _build_and_evaluate_msm_func(
             start_date=spring_start_date,
             end_date=spring_end_date,
             debug=debug,
-            group_share_known_case_path=share_known_path,
+            group_share_known_cases=group_share_known_cases,
+            in_memory=in_memory,
         )
     if mode == "fall":
         res = res_fall
@@ -107,6 +174,7 @@ def _build_and_evaluate_msm_func(
         weights = raw_weights / raw_weights.sum()
         res = _combine_results(results, weights)
 
+    save_evaluation(evaluation_store, key, res)
     return res
 
 
@@ -140,39 +208,101 @@ def _build_and_evaluate_msm_func_one_season(
     start_date,
     end_date,
     debug,
-    group_share_known_case_path=None,
+    group_share_known_cases=None,
+    in_memory=False,
 ):
     """Build and evaluate a msm criterion function.
 
     Building the criterion function freshly for each run is necessary for it to be
-    parallelizable.
+    parallelizable. Only the inputs which depend on the params are created for each
+    run. All other inputs are loaded once per process.
 
     """
-    simulate_kwargs = load_simulation_inputs(
-        "baseline",
-        start_date=start_date,
-        end_date=end_date,
-        group_share_known_case_path=group_share_known_case_path,
-        debug=debug,
-        return_last_states=False,
-    )
-    params_hash = hash_array(params["value"].to_numpy())
-    path = BLD / "exploration" / f"{prefix}_{params_hash}_{os.getpid()}"
+    msm_inputs = _get_msm_inputs(start_date, end_date, debug, in_memory)
+    simulate_kwargs = msm_inputs["simulate_kwargs"]
+    if group_share_known_cases is not None:
+        initial_conditions = create_initial_conditions(
+            **msm_inputs["initial_conditions_inputs"],
+            group_share_known_cases=group_share_known_cases,
+        )
+        simulate_kwargs = {**simulate_kwargs, "initial_conditions": initial_conditions}
 
-    sim_start = simulate_kwargs["duration"]["start"]
-    sim_end = simulate_kwargs["duration"]["end"]
-    period_outputs = _get_period_outputs_for_simulate()
+    if in_memory:
+        path = _get_output_directory()
+        return _evaluate_msm_func(params, seed, path, simulate_kwargs, msm_inputs)
+    else:
+        params_hash = hash_array(params["value"].to_numpy())
+        path = BLD / "exploration" / f"{prefix}_{params_hash}_{os.getpid()}"
+        res = _evaluate_msm_func(params, seed, path, simulate_kwargs, msm_inputs)
+        shutil.rmtree(path)
+        return res
 
+
+def _evaluate_msm_func(params, seed, path, simulate_kwargs, msm_inputs):
     simulate = get_simulate_func(
         **simulate_kwargs,
         params=params,
         path=path,
         seed=seed,
-        period_outputs=period_outputs,
+        period_outputs=msm_inputs["period_outputs"],
         return_time_series=False,
     )
 
-    calc_moments = _get_calc_moments()
+    msm_func = get_msm_func(
+        simulate=simulate,
+        calc_moments=msm_inputs["calc_moments"],
+        empirical_moments=msm_inputs["empirical_moments"],
+        replace_nans=lambda x: x * 1,
+        weighting_matrix=msm_inputs["weighting_matrix"],
+        additional_outputs=msm_inputs["additional_outputs"],
+    )
+
+    return msm_func(params)
+
+
+def _get_output_directory():
+    """Get the output directory of the simulations of this process in memory mode.
+
+    sid removes and recreates the output directory for every simulation even if it does
+    not store any data. Thus, the directory is created once per process and reused.
+
+    """
+    pid = os.getpid()
+    if pid not in _OUTPUT_DIRECTORIES:
+        path = tempfile.mkdtemp(prefix=f"msm_{pid}_", dir=_MEMORY_DIRECTORY)
+        atexit.register(shutil.rmtree, path, ignore_errors=True)
+        _OUTPUT_DIRECTORIES[pid] = path
+    return _OUTPUT_DIRECTORIES[pid]
+
+
+def _get_msm_inputs(start_date, end_date, debug, in_memory=False):
+    """Get the inputs of the msm criterion which do not depend on the params.
+
+    The inputs are loaded once per process and season and reused by all later
+    evaluations.
+
+    """
+    key = (pd.Timestamp(start_date), pd.Timestamp(end_date), debug, in_memory)
+    if key not in _MSM_INPUTS:
+        _MSM_INPUTS[key] = _load_msm_inputs(*key)
+    return _MSM_INPUTS[key]
+
+
+def _load_msm_inputs(start_date, end_date, debug, in_memory):
+    simulate_kwargs = load_simulation_inputs(
+        "baseline",
+        start_date=start_date,
+        end_date=end_date,
+        debug=debug,
+        return_last_states=False,
+        cache_initial_conditions=not in_memory,
+    )
+    initial_conditions_inputs = load_initial_conditions_inputs(
+        initial_states=simulate_kwargs["initial_states"],
+        start_date=start_date,
+        paths=get_simulation_dependencies(debug=debug, is_resumed=False),
+    )
+
     rki_data = pd.read_pickle(BLD / "data" / "processed_time_series" / "rki.pkl")
 
     age_group_info = pd.read_pickle(
@@ -188,8 +318,8 @@ def _build_and_evaluate_msm_func_one_season(
         rki_data,
         age_group_sizes=age_group_info["n"],
         state_sizes=state_sizes,
-        start_date=sim_start,
-        end_date=sim_end,
+        start_date=simulate_kwargs["duration"]["start"],
+        end_date=simulate_kwargs["duration"]["end"],
     )
 
     weight_mat = _get_weighting_matrix(
@@ -203,23 +333,21 @@ def _build_and_evaluate_msm_func_one_season(
         "share_known_cases": _calculate_share_known_cases,
     }
 
-    msm_func = get_msm_func(
-        simulate=simulate,
-        calc_moments=calc_moments,
-        empirical_moments=empirical_moments,
-        replace_nans=lambda x: x * 1,
-        weighting_matrix=weight_mat,
-        additional_outputs=additional_outputs,
-    )
-
-    res = msm_func(params)
-    shutil.rmtree(path)
-    return res
+    return {
+        "simulate_kwargs": simulate_kwargs,
+        "initial_conditions_inputs": initial_conditions_inputs,
+        "period_outputs": _get_period_outputs_for_simulate(),
+        "calc_moments": _get_calc_moments(),
+        "empirical_moments": empirical_moments,
+        "weighting_matrix": weight_mat,
+        "additional_outputs": additional_outputs,
+    }
 
 
 def _aggregate_infection_channels(simulate_result):
     """Aggregate the infection channel data that was calculated in each period."""
-    return pd.concat(simulate_result["period_outputs"]["infection_channels"])
+    infection_channels = simulate_result["period_outputs"]["infection_channels"]
+    return period_output_to_pandas(infection_channels)
 
 
 def _get_period_outputs_for_simulate():
@@ -338,13 +466,17 @@ def _calculate_share_known_cases(sim_out):
 
 
 def _aggregate_period_virus_share(sim_out, strain):
-    sr = pd.concat(sim_out["period_outputs"][f"aggregated_{strain}_share"])
+    period_output = sim_out["period_outputs"][f"aggregated_{strain}_share"]
+    sr = period_output_to_pandas(period_output)
     smoothed = sr.rolling(window=7, min_periods=1, center=False).mean()
     return smoothed
 
 
 def _get_empirical_moments(df, age_group_sizes, state_sizes, start_date, end_date):
     """Construct the ``empirical_moments`` argument for ``get_msm_func``."""
+    virus_shares = pd.read_pickle(
+        BLD / "data" / "virus_strains" / "virus_shares_dict.pkl"
+    )
     long_empirical_moments = {
         "infections_by_age_group": smoothed_outcome_per_hundred_thousand_rki(
             df=df,
@@ -375,12 +507,8 @@ def _get_empirical_moments(df, age_group_sizes, state_sizes, start_date, end_dat
             outcome="newly_infected",
             take_logs=True,
         ),
-        "aggregated_b117_share": pd.read_pickle(
-            BLD / "data" / "virus_strains" / "virus_shares_dict.pkl"
-        )["b117"],
-        "aggregated_delta_share": pd.read_pickle(
-            BLD / "data" / "virus_strains" / "virus_shares_dict.pkl"
-        )["delta"],
+        "aggregated_b117_share": virus_shares["b117"],
+        "aggregated_delta_share": virus_shares["delta"],
     }
     empirical_moments = {}
     for key, moment in long_empirical_moments.items():
@@ -1,18 +1,13 @@
-import warnings
-
-import numpy as np
 import pandas as pd
 from sid.time import get_date
 
+from src.shared import create_rng
+from src.shared import get_params_slice
 from src.testing.testing_models import get_piecewise_linear_interpolation_for_one_day
 
 
 def introduce_delta(states, params, seed):
-    with warnings.catch_warnings():
-        warnings.filterwarnings("ignore", message="indexing past lexsort depth")
-        params = params.loc[("events", "delta_cases_per_100_000"), "value"].copy(
-            deep=True
-        )
+    params = get_params_slice(params, ("events", "delta_cases_per_100_000"))
 
     out = (
         pd.Series(index=states.index, dtype=float)
@@ -25,11 +20,7 @@ def introduce_delta(states, params, seed):
 
 
 def introduce_b117(states, params, seed):
-    with warnings.catch_warnings():
-        warnings.filterwarnings("ignore", message="indexing past lexsort depth")
-        params = params.loc[("events", "b117_cases_per_100_000"), "value"].copy(
-            deep=True
-        )
+    params = get_params_slice(params, ("events", "b117_cases_per_100_000"))
 
     out = (
         pd.Series(index=states.index, dtype=float)
@@ -42,7 +33,7 @@ def introduce_b117(states, params, seed):
 
 
 def _sample_imported_infections(states, params, seed):
-    np.random.seed(seed)
+    rng = create_rng(seed)
     date = get_date(states)
     start_date = pd.Timestamp(params.index.min())
     end_date = pd.Timestamp(params.index.max())
@@ -52,7 +43,7 @@ def _sample_imported_infections(states, params, seed):
         )
         n_cases = int(n_cases_per_hundred_thousand * len(states) / 100_000)
         pool = states.index[~states["immune"]]
-        sampled = np.random.choice(pool, size=n_cases, replace=False)
+        sampled = rng.choice(pool, size=n_cases, replace=False)
     else:
         sampled = pd.Series(False, index=states.index)
     return sampled
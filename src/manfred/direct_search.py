@@ -5,6 +5,7 @@ import numpy as np
 from src.manfred.shared import do_evaluations
 from src.manfred.shared import hash_array
 from src.manfred.shared import is_in_bounds
+from src.manfred.shared import submit_evaluations
 
 
 def do_manfred_direct_search(
@@ -56,6 +57,24 @@ def do_manfred_direct_search(
     return next_x, state
 
 
+def submit_manfred_direct_search(
+    func, current_x, step_size, state, direction_window, bounds, n_evaluations_per_x
+):
+    """Submit the evaluations of a fast direct search without waiting for them.
+
+    This is used to start the most likely evaluations of the next iteration while
+    other evaluations are still running. Requires an executor in the state.
+
+    """
+    search_strategies = _determine_search_strategies(
+        current_x, state, direction_window, "fast"
+    )
+    x_sample = _get_direct_search_sample(
+        current_x, step_size, search_strategies, bounds
+    )
+    return submit_evaluations(func, x_sample, state, n_evaluations_per_x)
+
+
 def _determine_search_strategies(current_x, state, direction_window, mode):
     if mode == "fast":
         resid_strats = _determine_strategies_from_residuals(current_x, state)
@@ -4,10 +4,12 @@ import numpy as np
 from estimagic.batch_evaluators import joblib_batch_evaluator
 
 from src.manfred.direct_search import do_manfred_direct_search
+from src.manfred.direct_search import submit_manfred_direct_search
 from src.manfred.linesearch import do_manfred_linesearch
 from src.manfred.search_direction import calculate_manfred_direction
 from src.manfred.shared import aggregate_evaluations
 from src.manfred.shared import do_evaluations
+from src.manfred.shared import finish_pending_evaluations
 from src.manfred.shared import hash_array
 from src.manfred.shared import is_in_bounds
 
@@ -32,6 +34,11 @@ def minimize_manfred(
     momentum=0.05,
     batch_evaluator=joblib_batch_evaluator,
     batch_evaluator_options=None,
+    evaluation_store=None,
+    evaluation_store_key=None,
+    common_random_numbers=False,
+    executor=None,
+    acceptance_share=0.5,
 ):
     """MANFRED algorithm.
 
@@ -121,6 +128,33 @@ def minimize_manfred(
             at each parameter vector in order to average out noise.
         batch_evaluator (callable): An estimagic batch evaluator.
         batch_evaluator_options (dict): Keyword arguments for the batch evaluator.
+        evaluation_store (pathlib.Path, optional): Directory in which all evaluations
+            are stored by the hash of the parameter vector, the seed and the
+            ``evaluation_store_key``. Restarted or
+            concurrent runs which use the same directory reuse the evaluations instead
+            of recomputing them.
+        evaluation_store_key (optional): Identifies the criterion function in the
+            evaluation store such that runs with different criterion functions can
+            share one directory. Its representation must not change between runs.
+        common_random_numbers (bool): If True, the k-th evaluation of every parameter
+            vector uses the same seed. Thus, the noise is the same for all parameter
+            vectors and differences between nearby parameter vectors are mostly due to
+            the parameters. Fewer evaluations per parameter vector are needed to
+            compare them. If False, every evaluation gets a new seed.
+        executor (concurrent.futures.Executor, optional): If given, evaluations are
+            submitted to the executor instead of the batch evaluator and MANFRED does
+            not wait for the slowest evaluations of a sample. A search step stops as
+            soon as ``acceptance_share`` of its parameter vectors are evaluated and one
+            of them is an improvement. The remaining evaluations keep running and are
+            used when they finish. While the line search runs, the evaluations of the
+            next direct search are started. The results are not reproducible because
+            they depend on the order in which evaluations finish. At the end,
+            evaluations which have not started are cancelled and running evaluations
+            are awaited. The caller owns the executor and is responsible for shutting
+            it down.
+        acceptance_share (float): Share of the parameter vectors of a search step which
+            must be evaluated before an improvement is accepted if an ``executor`` is
+            used. 1 means that all evaluations of a step are awaited.
 
     """
     if batch_evaluator_options is None:
@@ -146,6 +180,12 @@ def minimize_manfred(
         "x_history": [hash_array(x)],
         "direction_history": [],
         "seed": itertools.count(seed),
+        "common_seed": seed if common_random_numbers else None,
+        "evaluation_store": evaluation_store,
+        "evaluation_store_key": evaluation_store_key,
+        "executor": executor,
+        "acceptance_share": acceptance_share,
+        "pending": {},
     }
 
     do_evaluations(
@@ -204,6 +244,16 @@ def minimize_manfred(
                 break
 
             if use_ls and (state["iter_counter"] % ls_freq) == 0:
+                if executor is not None:
+                    state = submit_manfred_direct_search(
+                        func=func,
+                        current_x=current_x,
+                        step_size=step_size,
+                        state=state,
+                        direction_window=direction_window,
+                        bounds=bounds,
+                        n_evaluations_per_x=n_evals,
+                    )
                 current_x, state = do_manfred_linesearch(
                     func=func,
                     current_x=current_x,
@@ -257,6 +307,9 @@ def minimize_manfred(
                 break
             last_iteration_x = current_x
 
+    if executor is not None:
+        state = finish_pending_evaluations(state)
+
     out_history = {"criterion": [], "x": []}
     for x_hash in state["x_history"]:
         cache_entry = state["cache"][x_hash]
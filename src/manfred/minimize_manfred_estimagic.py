@@ -24,8 +24,11 @@ def minimize_manfred_estimagic(
     linesearch_n_points=5,
     noise_seed=0,
     noise_n_evaluations_per_x=1,
+    noise_common_random_numbers=False,
     batch_evaluator=joblib_batch_evaluator,
     batch_evaluator_options=None,
+    evaluation_store=None,
+    evaluation_store_key=None,
 ):
     """MANFRED algorithm with internal estimagic optimizer interface.
 
@@ -110,8 +113,15 @@ def minimize_manfred_estimagic(
         noise_seed (int): Starting point of a seed sequence.
         noise_n_evaluations_per_x (int): How often the criterion function is evaluated
             at each parameter vector in order to average out noise.
+        noise_common_random_numbers (bool): Whether the k-th evaluation of every
+            parameter vector uses the same seed. See
+            :func:`src.manfred.minimize_manfred.minimize_manfred`.
         batch_evaluator (callable): An estimagic batch evaluator.
         batch_evaluator_options (dict): Keyword arguments for the batch evaluator.
+        evaluation_store (pathlib.Path, optional): Directory in which all evaluations
+            are stored. See :func:`src.manfred.minimize_manfred.minimize_manfred`.
+        evaluation_store_key (optional): Identifies the criterion function in the
+            evaluation store. See :func:`src.manfred.minimize_manfred.minimize_manfred`.
 
     """
     algo_info = {
@@ -140,10 +150,13 @@ def minimize_manfred_estimagic(
         "max_step_sizes": max_step_sizes,
         "n_evaluations_per_x": noise_n_evaluations_per_x,
         "seed": noise_seed,
+        "common_random_numbers": noise_common_random_numbers,
         "gradient_weight": gradient_weight,
         "momentum": momentum,
         "batch_evaluator": batch_evaluator,
         "batch_evaluator_options": batch_evaluator_options,
+        "evaluation_store": evaluation_store,
+        "evaluation_store_key": evaluation_store_key,
     }
 
     unit_x = _x_to_unit_cube(x, lower_bounds, upper_bounds)
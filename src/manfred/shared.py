@@ -1,4 +1,9 @@
+import collections
+import concurrent.futures
 import hashlib
+import os
+import pickle
+from pathlib import Path
 
 import numpy as np
 
@@ -12,38 +17,246 @@ def do_evaluations(
     batch_evaluator,
     batch_evaluator_options,
 ):
+    if state.get("executor") is not None:
+        return _do_evaluations_asynchronously(
+            func, x_sample, state, n_evaluations_per_x, return_type
+        )
+
     cache = state["cache"]
     x_hashes = [hash_array(x) for x in x_sample]
-    need_to_evaluate = []
-    for x, x_hash in zip(x_sample, x_hashes):
-        n_evals = n_evaluations_per_x
-        if x_hash in cache:
-            n_evals = max(0, n_evals - len(cache[x_hash]["evals"]))
-
-        need_to_evaluate += [x] * n_evals
+    arguments = _get_arguments(x_sample, x_hashes, state, n_evaluations_per_x)
 
-    arguments = [{"x": x, "seed": next(state["seed"])} for x in need_to_evaluate]
+    store = state.get("evaluation_store")
+    keys = [get_evaluation_key(arg["x"], arg["seed"], state) for arg in arguments]
+    new_evaluations = [load_evaluation(store, key) for key in keys]
+    missing = [i for i, evaluation in enumerate(new_evaluations) if evaluation is None]
 
-    new_evaluations = batch_evaluator(
-        func=func,
-        arguments=arguments,
-        unpack_symbol="**",
-        **batch_evaluator_options,
-    )
+    if missing:
+        missing_evaluations = batch_evaluator(
+            func=func,
+            arguments=[arguments[i] for i in missing],
+            unpack_symbol="**",
+            **batch_evaluator_options,
+        )
+        for i, evaluation in zip(missing, missing_evaluations):
+            save_evaluation(store, keys[i], evaluation)
+            new_evaluations[i] = evaluation
 
-    for x, evaluation in zip(need_to_evaluate, new_evaluations):
-        cache = add_to_cache(x, evaluation, cache)
+    for arg, evaluation in zip(arguments, new_evaluations):
+        cache = add_to_cache(arg["x"], evaluation, cache)
 
     all_results = [cache[x_hash]["evals"] for x_hash in x_hashes]
 
     if return_type == "aggregated":
         all_results = [aggregate_evaluations(res) for res in all_results]
 
-    state["func_counter"] = state["func_counter"] + len(need_to_evaluate)
+    state["func_counter"] = state["func_counter"] + len(arguments)
 
     return all_results, state
 
 
+def submit_evaluations(func, x_sample, state, n_evaluations_per_x):
+    """Submit evaluations to the executor of the state without waiting for them.
+
+    Evaluations which are already running count as evaluations of their parameter
+    vector. Thus, later calls of :func:`do_evaluations` wait for them instead of
+    submitting new evaluations.
+
+    Args:
+        func (callable): The criterion function.
+        x_sample (list): List of parameter vectors.
+        state (dict): The state of the optimization. Must contain an "executor".
+        n_evaluations_per_x (int): Number of evaluations of each parameter vector.
+
+    Returns:
+        dict: The updated state.
+
+    """
+    x_hashes = [hash_array(x) for x in x_sample]
+    arguments = _get_arguments(x_sample, x_hashes, state, n_evaluations_per_x)
+    for arg in arguments:
+        key = get_evaluation_key(arg["x"], arg["seed"], state)
+        evaluation = load_evaluation(state.get("evaluation_store"), key)
+        if evaluation is None:
+            future = state["executor"].submit(func, **arg)
+            state["pending"][future] = (arg["x"], key)
+        else:
+            add_to_cache(arg["x"], evaluation, state["cache"])
+
+    state["func_counter"] = state["func_counter"] + len(arguments)
+    return state
+
+
+def _do_evaluations_asynchronously(
+    func, x_sample, state, n_evaluations_per_x, return_type
+):
+    """Evaluate a sample with the executor of the state.
+
+    The function returns as soon as all evaluations of the sample are finished or as
+    soon as the share of finished parameter vectors reaches the acceptance share of the
+    state and one of them improves upon the best parameter vector which was finished
+    before. If no parameter vector of the sample was finished before, any finished
+    parameter vector is an improvement.
+    Parameter vectors whose evaluations are still running are never chosen. They are
+    aggregated to infinity and have no evaluations if the evaluations are not
+    aggregated. Their evaluations are collected later.
+
+    """
+    cache = state["cache"]
+    x_hashes = [hash_array(x) for x in x_sample]
+    unique_hashes = set(x_hashes)
+
+    def _is_finished(x_hash):
+        return x_hash in cache and len(cache[x_hash]["evals"]) >= n_evaluations_per_x
+
+    best_before = min(
+        (
+            aggregate_evaluations(cache[x_hash]["evals"])
+            for x_hash in unique_hashes
+            if _is_finished(x_hash)
+        ),
+        default=None,
+    )
+
+    state = submit_evaluations(func, x_sample, state, n_evaluations_per_x)
+
+    while True:
+        state = collect_finished_evaluations(state)
+        running = [
+            future
+            for future, (_, key) in state["pending"].items()
+            if key[0] in unique_hashes
+        ]
+        if not running:
+            break
+
+        finished = [x_hash for x_hash in unique_hashes if _is_finished(x_hash)]
+        if finished:
+            share = len(finished) / len(unique_hashes)
+            best = min(aggregate_evaluations(cache[h]["evals"]) for h in finished)
+            is_improvement = best_before is None or best < best_before
+            if share >= state["acceptance_share"] and is_improvement:
+                break
+
+        concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+
+    all_results = [
+        cache[x_hash]["evals"] if _is_finished(x_hash) else [] for x_hash in x_hashes
+    ]
+    if return_type == "aggregated":
+        all_results = [
+            aggregate_evaluations(res) if res else np.inf for res in all_results
+        ]
+
+    return all_results, state
+
+
+def collect_finished_evaluations(state):
+    """Add the finished evaluations of the executor to the cache.
+
+    Args:
+        state (dict): The state of the optimization.
+
+    Returns:
+        dict: The updated state.
+
+    """
+    finished = [future for future in state["pending"] if future.done()]
+    for future in finished:
+        x, key = state["pending"].pop(future)
+        evaluation = future.result()
+        save_evaluation(state.get("evaluation_store"), key, evaluation)
+        state["cache"] = add_to_cache(x, evaluation, state["cache"])
+    return state
+
+
+def finish_pending_evaluations(state):
+    """Cancel the evaluations which have not started and wait for the running ones.
+
+    Cancelled evaluations are no longer counted as evaluations. The running evaluations
+    are collected such that they are stored and cached like all other evaluations.
+
+    Args:
+        state (dict): The state of the optimization.
+
+    Returns:
+        dict: The updated state.
+
+    """
+    cancelled = [future for future in state["pending"] if future.cancel()]
+    for future in cancelled:
+        del state["pending"][future]
+    state["func_counter"] = state["func_counter"] - len(cancelled)
+
+    concurrent.futures.wait(list(state["pending"]))
+    return collect_finished_evaluations(state)
+
+
+def _get_arguments(x_sample, x_hashes, state, n_evaluations_per_x):
+    """Get the arguments of the evaluations which are missing for a sample."""
+    cache = state["cache"]
+    common_seed = state.get("common_seed")
+    n_running = collections.Counter(
+        key[0] for _, key in state.get("pending", {}).values()
+    )
+
+    need_to_evaluate = []
+    seeds = []
+    n_planned = {}
+    for x, x_hash in zip(x_sample, x_hashes):
+        n_existing = len(cache[x_hash]["evals"]) if x_hash in cache else 0
+        n_existing += n_running[x_hash]
+        if common_seed is not None:
+            # the k-th evaluation of every x uses the same seed. Thus, duplicates in
+            # the sample are only evaluated once.
+            n_existing += n_planned.get(x_hash, 0)
+        n_evals = max(0, n_evaluations_per_x - n_existing)
+
+        need_to_evaluate += [x] * n_evals
+        if common_seed is not None:
+            seeds += get_common_seeds(common_seed, n_existing, n_evals)
+            n_planned[x_hash] = n_planned.get(x_hash, 0) + n_evals
+
+    if common_seed is None:
+        seeds = [next(state["seed"]) for _ in need_to_evaluate]
+    return [{"x": x, "seed": seed} for x, seed in zip(need_to_evaluate, seeds)]
+
+
+def get_evaluation_key(x, seed, state):
+    """Get the key of an evaluation in the evaluation store.
+
+    The key contains the "evaluation_store_key" of the state such that several
+    criterion functions can share one evaluation store.
+
+    Args:
+        x (numpy.ndarray): The parameter vector.
+        seed (int): The seed of the evaluation.
+        state (dict): The state of the optimization.
+
+    Returns:
+        tuple: The hash of the parameter vector, the seed and the evaluation store key.
+
+    """
+    return hash_array(x), seed, state.get("evaluation_store_key")
+
+
+def get_common_seeds(common_seed, start, n_seeds):
+    """Get the seeds of evaluations with common random numbers.
+
+    The seeds are far apart because each simulation draws many consecutive seeds.
+
+    Args:
+        common_seed (int): The seed of the first evaluation of every parameter vector.
+        start (int): The number of the first evaluation.
+        n_seeds (int): The number of seeds.
+
+    Returns:
+        list: The seeds of the evaluations ``start`` to ``start + n_seeds - 1``.
+
+    """
+    return [common_seed + 100_000 * k for k in range(start, start + n_seeds)]
+
+
 def aggregate_evaluations(evaluations):
     res = np.mean([evaluation["value"] for evaluation in evaluations])
     return res
@@ -65,5 +278,57 @@ def hash_array(arr):
     return hashlib.sha1(arr.tobytes()).hexdigest()
 
 
+def load_evaluation(store, key):
+    """Load an evaluation from an evaluation store.
+
+    An evaluation store is a directory with one pickle file per evaluation. It outlives
+    the process such that restarted or concurrent optimizations can reuse evaluations.
+
+    Args:
+        store (pathlib.Path or None): Directory of the evaluation store. If None,
+            nothing is loaded.
+        key (tuple): Identifies the evaluation, e.g. the hash of the parameters and the
+            seed. The representation of the elements must not change between runs.
+
+    Returns:
+        The stored evaluation or None if the evaluation is not in the store.
+
+    """
+    if store is None:
+        return None
+    path = _get_evaluation_path(store, key)
+    if not path.exists():
+        return None
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def save_evaluation(store, key, evaluation):
+    """Save an evaluation to an evaluation store.
+
+    Args:
+        store (pathlib.Path or None): Directory of the evaluation store. If None,
+            nothing is saved.
+        key (tuple): See :func:`load_evaluation`.
+        evaluation: A picklable evaluation.
+
+    """
+    if store is None:
+        return
+    path = _get_evaluation_path(store, key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # write to a temporary file first such that concurrent optimizations never load an
+    # incomplete file.
+    temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with open(temp_path, "wb") as f:
+        pickle.dump(evaluation, f)
+    os.replace(temp_path, path)
+
+
+def _get_evaluation_path(store, key):
+    key_hash = hashlib.sha1(repr(key).encode()).hexdigest()
+    return Path(store) / f"{key_hash}.pkl"
+
+
 def is_in_bounds(x, bounds):
     return (x >= bounds["lower"]).all() and (x <= bounds["upper"]).all()
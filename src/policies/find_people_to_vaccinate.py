@@ -1,8 +1,12 @@
 import warnings
+import weakref
 
+import numpy as np
 import pandas as pd
 from sid import get_date
 
+from src.shared import get_params_value
+
 
 def find_people_to_vaccinate(
     receives_vaccine,  # noqa: U100
@@ -19,6 +23,11 @@ def find_people_to_vaccinate(
     and the burn in period is four weeks this does not lead to jumps in the
     simulation period.
 
+    The cutoffs are computed once for every combination of vaccination shares and
+    init_start. As the vaccination ranks do not change during a simulation, the
+    positions of the individuals sorted by their rank are computed once, too. The
+    vaccinees of each day are a contiguous slice of these positions.
+
     Args:
         states (pandas.DataFrame): States DataFrame that must contain the
             column vaccination_rank. This column is a float with values
@@ -37,28 +46,95 @@ def find_people_to_vaccinate(
 
     """
     date = get_date(states)
-    no_vaccination_share = params.loc[
-        ("vaccinations", "share_refuser", "share_refuser"), "value"
-    ]
-
-    if not (vaccination_shares < 0.05).all():
-        warnings.warn(
-            "The vaccination shares imply that >=5% of people get vaccinated per day. "
-            "If this was intended, simply ignore the warning.",
-        )
-
-    cutoffs = vaccination_shares.sort_index().cumsum()
-    # set all cutoffs before the init_start to 0.
-    # that way on the init_start date everyone who should have been vaccinated
-    # until that day gets vaccinated.
-    cutoffs[: init_start - pd.Timedelta(days=1)] = 0
+    no_vaccination_share = get_params_value(
+        params, ("vaccinations", "share_refuser", "share_refuser")
+    )
 
+    cutoffs = _get_vaccination_cutoffs(vaccination_shares, init_start)
     lower_candidate = cutoffs[date - pd.Timedelta(days=1)]
     upper_candidate = cutoffs[date]
     lower = min(lower_candidate, 1 - no_vaccination_share)
     upper = min(upper_candidate, 1 - no_vaccination_share)
 
-    to_vaccinate = (lower <= states["vaccination_rank"]) & (
-        states["vaccination_rank"] < upper
+    positions, sorted_ranks = _get_positions_sorted_by_rank(states)
+    start, end = np.searchsorted(sorted_ranks, [lower, upper])
+
+    to_vaccinate = np.zeros(len(states), dtype=bool)
+    to_vaccinate[positions[start:end]] = True
+    return pd.Series(to_vaccinate, index=states.index)
+
+
+_VACCINATION_CUTOFFS = {}
+"""dict: Cache of the cutoffs keyed by the vaccination shares and the init_start."""
+
+
+def _get_vaccination_cutoffs(vaccination_shares, init_start):
+    """Get the share of people who are vaccinated at the end of each day.
+
+    Returns:
+        cutoffs (dict): Maps dates to the cumulative vaccination shares.
+
+    """
+    key = (
+        vaccination_shares.index.to_numpy().tobytes(),
+        vaccination_shares.to_numpy().tobytes(),
+        init_start,
     )
-    return to_vaccinate
+    if key not in _VACCINATION_CUTOFFS:
+        if len(_VACCINATION_CUTOFFS) >= 64:
+            _VACCINATION_CUTOFFS.clear()
+
+        if not (vaccination_shares < 0.05).all():
+            warnings.warn(
+                "The vaccination shares imply that >=5% of people get vaccinated per "
+                "day. If this was intended, simply ignore the warning.",
+            )
+
+        cutoffs = vaccination_shares.sort_index().cumsum()
+        # set all cutoffs before the init_start to 0.
+        # that way on the init_start date everyone who should have been vaccinated
+        # until that day gets vaccinated.
+        cutoffs[: init_start - pd.Timedelta(days=1)] = 0
+        _VACCINATION_CUTOFFS[key] = dict(cutoffs.items())
+    return _VACCINATION_CUTOFFS[key]
+
+
+MAX_SORTED_VACCINATION_RANKS = 4
+"""int: Maximum number of rank arrays whose sorted positions are cached."""
+
+_SORTED_VACCINATION_RANKS = {}
+"""dict: Cache of the positions of individuals sorted by their vaccination rank.
+
+The keys identify the memory of a rank array. The entries hold a weak reference to the
+array which owns the memory, the positions and the sorted ranks.
+
+"""
+
+
+def _get_positions_sorted_by_rank(states):
+    """Get the positions of the individuals sorted by their rank and the sorted ranks.
+
+    The ranks are drawn once for the initial states and are never changed. Thus, the
+    positions are cached by the identity of the memory of the ranks. The entry is valid
+    as long as the array which owns the memory is alive.
+
+    """
+    ranks = states["vaccination_rank"].to_numpy()
+    owner = ranks
+    while isinstance(owner.base, np.ndarray):
+        owner = owner.base
+    key = (id(owner), ranks.__array_interface__["data"][0], ranks.shape, ranks.strides)
+
+    cached = _SORTED_VACCINATION_RANKS.get(key)
+    if cached is None or cached["owner"]() is not owner:
+        positions = np.argsort(ranks, kind="stable")
+        cached = {
+            "owner": weakref.ref(owner),
+            "positions": positions,
+            "sorted_ranks": ranks[positions],
+        }
+        _SORTED_VACCINATION_RANKS.pop(key, None)
+        _SORTED_VACCINATION_RANKS[key] = cached
+        while len(_SORTED_VACCINATION_RANKS) > MAX_SORTED_VACCINATION_RANKS:
+            del _SORTED_VACCINATION_RANKS[next(iter(_SORTED_VACCINATION_RANKS))]
+    return cached["positions"], cached["sorted_ranks"]
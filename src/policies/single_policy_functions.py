@@ -15,9 +15,12 @@ All other arguments must be documented.
 import numpy as np
 import pandas as pd
 from scipy.interpolate import interp1d
-from sid.shared import boolean_choices
 from sid.time import get_date
 
+from src.shared import create_rng
+from src.shared import get_period_mask
+from src.shared import map_with_integer_codes
+
 
 def shut_down_model(states, contacts, seed, is_recurrent, params=None):  # noqa: U100
     """Set all contacts to zero independent of incoming contacts."""
@@ -48,13 +51,13 @@ def reduce_recurrent_model(
             already had a False there, the smaller the effect.
 
     """
-    np.random.seed(seed)
+    rng = create_rng(seed)
     if isinstance(multiplier, pd.Series):
         date = get_date(states)
         multiplier = multiplier[date]
 
     contacts = contacts.to_numpy()
-    resampled_contacts = boolean_choices(np.full(len(states), multiplier))
+    resampled_contacts = rng.random(len(states)) < multiplier
 
     reduced = np.where(contacts, resampled_contacts, contacts)
     return pd.Series(reduced, index=states.index)
@@ -89,12 +92,12 @@ def reduce_work_model(
 
     threshold = 1 - attend_multiplier
     if isinstance(threshold, pd.Series):
-        threshold = states["state"].map(threshold.get).astype(float)
+        threshold = map_with_integer_codes(states, "state", threshold).astype(float)
         # this assert could be skipped because we check in
         # task_check_initial_states that the federal state names overlap.
-        assert threshold.notnull().all()
+        assert not np.isnan(threshold).any()
 
-    above_threshold = states["work_contact_priority"] > threshold
+    above_threshold = states["work_contact_priority"].to_numpy() > threshold
     if is_recurrent:
         reduced_contacts = contacts.where(above_threshold, False)
         if hygiene_multiplier < 1:
@@ -235,10 +238,11 @@ def mixed_educ_policy(
             not attending on a daily basis.
 
     """
-    np.random.seed(seed)
     contacts = contacts.copy(deep=True)
 
-    attends_always = states["educ_worker"] | states.eval(always_attend_query)
+    attends_always = states["educ_worker"] | get_period_mask(
+        states, always_attend_query
+    )
     attends_because_of_a_b_schooling = _identify_who_attends_because_of_a_b_schooling(
         states=states,
         a_b_query=a_b_query,
@@ -246,7 +250,9 @@ def mixed_educ_policy(
     )
     attends_for_any_reason = attends_always | attends_because_of_a_b_schooling
     if non_a_b_attend:
-        attends_for_any_reason = attends_for_any_reason | ~states.eval(a_b_query)
+        attends_for_any_reason = attends_for_any_reason | ~get_period_mask(
+            states, a_b_query
+        )
 
     staying_home = ~attends_for_any_reason
     contacts[staying_home] = False
@@ -276,7 +282,7 @@ def _identify_who_attends_because_of_a_b_schooling(states, a_b_query, a_b_rhythm
         attends_because_of_a_b_schooling = pd.Series(a_b_query, index=states.index)
     elif isinstance(a_b_query, str):
         date = get_date(states)
-        a_b_eligible = states.eval(a_b_query)
+        a_b_eligible = pd.Series(get_period_mask(states, a_b_query), index=states.index)
         if a_b_rhythm == "weekly":
             in_attend_group = states["educ_a_b_identifier"] == (date.week % 2 == 1)
         elif a_b_rhythm == "daily":
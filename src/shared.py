@@ -1,4 +1,5 @@
 import itertools
+import weakref
 
 import numpy as np
 import pandas as pd
@@ -178,10 +179,16 @@ def draw_from_distribution_for_subset(states, distribution, query, outside_val,
     return contacts
 
 
+AGE_GROUPS = [f"{i}-{i + 9}" for i in range(0, 71, 10)] + ["80-100"]
+"""list: Labels of the age groups created by :func:`create_age_groups`."""
+
+AGE_GROUPS_RKI = ["0-4", "5-14", "15-34", "35-59", "60-79", "80-100"]
+"""list: Labels of the age groups created by :func:`create_age_groups_rki`."""
+
+
 def create_age_groups(age_sr):
     bins = list(range(0, 81, 10)) + [100]
-    labels = [f"{i}-{i + 9}" for i in range(0, 71, 10)] + ["80-100"]
-    return pd.cut(age_sr, bins=bins, right=False, labels=labels)
+    return pd.cut(age_sr, bins=bins, right=False, labels=AGE_GROUPS)
 
 
 def create_age_groups_rki(df):
@@ -201,6 +208,339 @@ def relabel_age_groups_rki_for_parquet(sr):
     return new_sr
 
 
+# ---------------------------------- Random Numbers ----------------------------------
+
+
+def create_rng(seed, stream=0):
+    """Create a random number generator with its own stream of random numbers.
+
+    sid passes a different seed to every model on every day. Each seed is expanded
+    with a :class:`numpy.random.SeedSequence` into a statistically independent stream.
+    As no model touches the global random state, models can be evaluated concurrently
+    without changing their results.
+
+    Args:
+        seed (int): The seed passed by sid.
+        stream (int): Identifies one of several independent streams which are needed
+            for the same seed.
+
+    Returns:
+        rng (numpy.random.Generator): The random number generator.
+
+    """
+    seed_sequence = np.random.SeedSequence(seed, spawn_key=(stream,))
+    return np.random.default_rng(seed_sequence)
+
+
+# ---------------------------------- Params Access -----------------------------------
+
+MAX_PARAMS_VIEWS = 256
+"""int: Maximum number of cached params views.
+
+Many slices of the same params are cached, but only few params. If there are more
+views, the least recently used views are evicted.
+
+"""
+
+_PARAMS_VIEWS = {}
+"""dict: Cache of params views keyed by the content of the params.
+
+The views are ordered from the least to the most recently used.
+
+"""
+
+_PARAMS_KEYS = {}
+"""dict: Maps the ids of params to a weak reference to them, their index and their key.
+
+sid passes the same params object to many models. Their key is looked up by their id
+instead of being rebuilt from their index.
+
+"""
+
+
+def get_params_view(params):
+    """Get a read-only view of the params which allows fast repeated access.
+
+    sid passes a new copy or slice of the params to every model on every day. Looking
+    up values with a MultiIndex on these objects is slow and, as the index is not
+    sorted, needs to silence warnings about the lexsort depth. The view is built once
+    for every distinct params and then shared by all calls which receive params with
+    the same index and values. Thus, it is built once per simulation.
+
+    The view must not be modified.
+
+    Args:
+        params (pandas.DataFrame or pandas.Series): The params DataFrame, a slice of it
+            or the "value" column of either.
+
+    Returns:
+        view (dict): A dictionary with the following entries:
+
+        - "values": dict mapping the full index tuples to the values.
+        - "sorted": the values as a series with a sorted index.
+        - "slices": dict which caches the slices returned by
+          :func:`get_params_slice`.
+        - "derived": dict in which functions can cache other objects which only depend
+          on the params.
+
+    """
+    sr = params["value"] if isinstance(params, pd.DataFrame) else params
+    key = _get_params_key(sr)
+    if key in _PARAMS_VIEWS:
+        _PARAMS_VIEWS[key] = _PARAMS_VIEWS.pop(key)
+    else:
+        _PARAMS_VIEWS[key] = {
+            "values": dict(zip(sr.index, sr.to_numpy())),
+            "sorted": sr.sort_index(),
+            "slices": {},
+            "derived": {},
+        }
+        _evict_least_recently_used(_PARAMS_VIEWS, MAX_PARAMS_VIEWS)
+    return _PARAMS_VIEWS[key]
+
+
+def _get_params_key(sr):
+    """Get a hashable key which identifies the index and the values of the params.
+
+    Params which were seen before are recognized by their id. Since the index is
+    immutable, only the values need to be compared.
+
+    """
+    values = sr.to_numpy().tobytes()
+    known = _PARAMS_KEYS.pop(id(sr), None)
+    if (
+        known is not None
+        and known["ref"]() is sr
+        and known["index"] is sr.index
+        and known["key"][1] == values
+    ):
+        key = known["key"]
+    else:
+        key = _build_params_key(sr.index), values
+        known = {"ref": weakref.ref(sr), "index": sr.index, "key": key}
+
+    _PARAMS_KEYS[id(sr)] = known
+    _evict_least_recently_used(_PARAMS_KEYS, MAX_PARAMS_VIEWS)
+    return key
+
+
+def _build_params_key(index):
+    """Get a hashable key of the index of the params.
+
+    The levels and codes of a MultiIndex are much faster to convert than its tuples.
+
+    """
+    if isinstance(index, pd.MultiIndex):
+        index_key = tuple(
+            (tuple(level), codes.tobytes())
+            for level, codes in zip(index.levels, index.codes)
+        )
+    else:
+        index_key = tuple(index)
+    return index_key
+
+
+def _evict_least_recently_used(cache, max_entries):
+    """Remove the first entries of a cache which is ordered by the last use."""
+    while len(cache) > max_entries:
+        del cache[next(iter(cache))]
+
+
+def get_params_value(params, loc):
+    """Get a single value from the params.
+
+    Args:
+        params (pandas.DataFrame or pandas.Series): The params.
+        loc (tuple): The full index of the value.
+
+    Returns:
+        value: The value.
+
+    """
+    return get_params_view(params)["values"][loc]
+
+
+def get_params_slice(params, loc):
+    """Get the values of all entries of the params which start with a partial index.
+
+    Args:
+        params (pandas.DataFrame or pandas.Series): The params.
+        loc (tuple or str): A partial index.
+
+    Returns:
+        params_slice (pandas.Series): The values with the remaining index levels. The
+            series is shared between calls and must not be modified.
+
+    """
+    view = get_params_view(params)
+    if loc not in view["slices"]:
+        view["slices"][loc] = view["sorted"].loc[loc]
+    return view["slices"][loc]
+
+
+# ---------------------------------- Period Masks ------------------------------------
+
+MASK_STAGES = ("start", "after_rapid_tests", "end")
+"""tuple: Stages of a period between which sid changes the states.
+
+- "start": Before rapid tests are performed. Contact models, contact policies and
+  rapid test demand models see the states of this stage.
+- "after_rapid_tests": After rapid tests are performed. Rapid test reactions and
+  testing demand models see the states of this stage.
+- "end": After the states are updated. Period outputs see the states of this stage.
+
+"""
+
+_PERIOD_MASKS = {"current": (lambda: None, None, {})}
+"""dict: Holds a weak reference to the states, the key and the boolean masks of the
+current period and stage. They are replaced together, so that concurrently evaluated
+models never see masks of another period."""
+
+
+def get_period_mask(states, expression, stage="start"):
+    """Get a boolean mask of the states which is evaluated once per period and stage.
+
+    Many models of one period evaluate the same expressions on the states, for example,
+    the queries of the contact models and of the educ policies. The masks are stored
+    in a registry which is shared by all models and replaced as soon as a mask of
+    another period or stage is requested.
+
+    States without a date column are not simulated by sid and the expression is
+    evaluated without the registry.
+
+    Args:
+        states (pandas.DataFrame): sid states DataFrame.
+        expression (str): An expression which can be evaluated with
+            :meth:`pandas.DataFrame.eval` and returns booleans.
+        stage (str): One of :data:`MASK_STAGES`.
+
+    Returns:
+        mask (numpy.ndarray): A read-only boolean array with one entry per
+            individual.
+
+    """
+    if stage not in MASK_STAGES:
+        raise ValueError(f"stage must be one of {MASK_STAGES}, not {stage}.")
+    if "date" not in states:
+        return _evaluate_mask(states, expression)
+
+    key = (states["date"].iloc[0], stage)
+    states_ref, current_key, masks = _PERIOD_MASKS["current"]
+    if states_ref() is not states or current_key != key:
+        masks = {}
+        _PERIOD_MASKS["current"] = (weakref.ref(states), key, masks)
+
+    if expression not in masks:
+        mask = _evaluate_mask(states, expression)
+        mask.flags.writeable = False
+        masks[expression] = mask
+    return masks[expression]
+
+
+def _evaluate_mask(states, expression):
+    """Evaluate an expression which might also be a constant like "True"."""
+    evaluated = states.eval(expression)
+    if isinstance(evaluated, pd.Series):
+        mask = evaluated.to_numpy(dtype=bool)
+    else:
+        mask = np.full(len(states), evaluated, dtype=bool)
+    return mask
+
+
+# ---------------------------------- Integer Codes -----------------------------------
+
+CODED_COLUMNS = {
+    "state": None,
+    "county": None,
+    "age_group": AGE_GROUPS,
+    "age_group_rki": AGE_GROUPS_RKI,
+}
+"""dict: Columns of the states which get an integer code column.
+
+The values are the categories. If they are None, the sorted unique values of the
+column are used.
+
+"""
+
+
+def add_integer_codes(states):
+    """Add integer codes for the columns in :data:`CODED_COLUMNS` to the states.
+
+    The columns are converted to categoricals with stable categories and the codes are
+    stored in a column with the suffix "_code". Functions that are evaluated every
+    period can then map the values of these columns with a gather on a small lookup
+    table instead of mapping strings for millions of individuals.
+
+    Args:
+        states (pandas.DataFrame): The initial states.
+
+    Returns:
+        states (pandas.DataFrame): The initial states with the code columns.
+
+    """
+    states = states.copy()
+    for column, categories in CODED_COLUMNS.items():
+        if column in states:
+            if categories is None:
+                categories = sorted(states[column].dropna().unique())
+            states[column] = pd.Categorical(states[column], categories=categories)
+            code_dtype = np.min_scalar_type(-len(categories))
+            states[f"{column}_code"] = states[column].cat.codes.astype(code_dtype)
+    return states
+
+
+def get_integer_codes(states, column):
+    """Get the integer codes of a column and the categories they refer to.
+
+    If the code column created by :func:`add_integer_codes` is missing, the codes are
+    computed from the column.
+
+    Args:
+        states (pandas.DataFrame): sid states DataFrame.
+        column (str): name of the column.
+
+    Returns:
+        codes (numpy.ndarray): The codes. Missing values have the code -1.
+        categories (pandas.Index): The categories.
+
+    """
+    sr = states[column]
+    code_column = f"{column}_code"
+    if isinstance(sr.dtype, pd.CategoricalDtype):
+        categories = sr.cat.categories
+        if code_column in states:
+            codes = states[code_column].to_numpy()
+        else:
+            codes = sr.cat.codes.to_numpy()
+    else:
+        categories = CODED_COLUMNS.get(column) or sorted(sr.dropna().unique())
+        categorical = pd.Categorical(sr, categories=categories)
+        categories = categorical.categories
+        codes = categorical.codes
+    return codes, categories
+
+
+def map_with_integer_codes(states, column, mapping, default=np.nan):
+    """Map the values of a column with a gather on its integer codes.
+
+    Args:
+        states (pandas.DataFrame): sid states DataFrame.
+        column (str): name of the column whose values are mapped.
+        mapping (dict or pandas.Series): maps the values of the column to new
+            values.
+        default: value for missing values and values which are not in mapping.
+
+    Returns:
+        mapped (numpy.ndarray): The mapped values with one entry per individual.
+
+    """
+    codes, categories = get_integer_codes(states, column)
+    # The last entry is the value for the code -1 of missing values.
+    lookup = np.array([mapping.get(category, default) for category in categories])
+    lookup = np.append(lookup, default)
+    return lookup[codes]
+
+
 def from_timestamps_to_epochs(timestamps):
     """Convert timestamps to epochs.
 
@@ -1,4 +1,7 @@
-import warnings
+import pandas as pd
+
+from src.shared import get_params_slice
+from src.shared import map_with_integer_codes
 
 
 def calculate_susceptibility(states, params, seed):  # noqa: U100
@@ -23,12 +26,11 @@ def calculate_susceptibility(states, params, seed):  # noqa: U100
             in the params.
 
     """
-    with warnings.catch_warnings():
-        warnings.filterwarnings(
-            "ignore", message="indexing past lexsort depth may impact performance."
-        )
-        factors = params.loc[("susceptibility", "susceptibility"), "value"]
-
-    susceptibility = states["age_group"].replace(factors)
-    susceptibility.name = "susceptibility"
+    factors = get_params_slice(params, ("susceptibility", "susceptibility"))
+
+    susceptibility = pd.Series(
+        map_with_integer_codes(states, "age_group", factors),
+        index=states.index,
+        name="susceptibility",
+    )
     return susceptibility
@@ -1,13 +1,17 @@
 import warnings
+import weakref
 from functools import partial
 
 import pandas as pd
 from sid.statistics import calculate_r_effective
 
-from src.calculate_moments import calculate_period_outcome_sim
+from src.calculate_moments import calculate_period_outcomes_sim
 from src.config import BLD
 from src.config import SID_DEPENDENCIES
 from src.config import SRC
+from src.contact_models.get_contact_models import (
+    evaluate_contact_models_concurrently,
+)
 from src.contact_models.get_contact_models import get_all_contact_models
 from src.create_initial_states.create_initial_conditions import (
     create_initial_conditions,
@@ -15,6 +19,8 @@ from src.create_initial_states.create_initial_conditions import (
 from src.events.events import introduce_b117
 from src.events.events import introduce_delta
 from src.policies.policy_tools import combine_dictionaries
+from src.shared import add_integer_codes
+from src.shared import get_period_mask
 from src.simulation import scenario_simulation_inputs
 from src.simulation.calculate_susceptibility import calculate_susceptibility
 from src.simulation.seasonality import seasonality_model
@@ -35,6 +41,8 @@ def load_simulation_inputs(
     initial_states_path=None,
     is_resumed=False,
     rapid_test_statistics_path=None,
+    n_contact_model_threads=None,
+    cache_initial_conditions=True,
 ):
     """Load the simulation inputs.
 
@@ -60,7 +68,11 @@ def load_simulation_inputs(
             that case no initial conditions are created
         rapid_test_statistics_path (Path, optional): where to save rapid test
             statistics.
-
+        n_contact_model_threads (int, optional): if given, the contact models of each
+            period are evaluated concurrently in a thread pool with this many threads.
+        cache_initial_conditions (bool, optional): whether the initial conditions are
+            cached under ``BLD / "simulations" / "initial_conditions"``. Default is
+            True.
 
     Returns:
         dict: Dictionary with most arguments of get_simulate_func. Keys are:
@@ -108,14 +120,18 @@ def load_simulation_inputs(
     if initial_states_path.suffix == ".pkl":
         initial_states = pd.read_pickle(initial_states_path)
     elif initial_states_path.suffix == ".parquet":
-        initial_states = pd.read_parquet(paths["initial_states"])
+        initial_states = pd.read_parquet(initial_states_path, engine="fastparquet")
+    initial_states = add_integer_codes(initial_states)
 
     contact_models = get_all_contact_models()
+    if n_contact_model_threads is not None:
+        contact_models = evaluate_contact_models_concurrently(
+            contact_models, n_contact_model_threads
+        )
 
     # process dates
     one_day = pd.Timedelta(1, unit="D")
     init_start = start_date - pd.Timedelta(31, unit="D")
-    init_end = start_date - one_day
     duration = {"start": start_date, "end": end_date}
 
     # testing models
@@ -166,34 +182,20 @@ def load_simulation_inputs(
     }
 
     if not is_resumed:
-        virus_shares = pd.read_pickle(paths["virus_shares"])
-        rki_infections = pd.read_pickle(paths["rki"])
-
-        group_weights = pd.read_pickle(paths["rki_age_groups"])["weight"]
         if group_share_known_case_path is not None:
             group_share_known_cases = pd.read_pickle(group_share_known_case_path)
         else:
             group_share_known_cases = None
 
-        params = pd.read_pickle(paths["params"])
-        with warnings.catch_warnings():
-            warnings.filterwarnings(
-                "ignore", message="indexing past lexsort depth may impact performance."
-            )
-            params_slice = params.loc[("share_known_cases", "share_known_cases")]
-        overall_share_known_cases = get_piecewise_linear_interpolation(params_slice)
+        if cache_initial_conditions:
+            cache_dir = BLD / "simulations" / "initial_conditions"
+        else:
+            cache_dir = None
 
         initial_conditions = create_initial_conditions(
-            start=init_start,
-            end=init_end,
-            seed=3930,
-            reporting_delay=5,
-            synthetic_data=initial_states[["county", "age_group_rki"]],
-            empirical_infections=rki_infections,
-            virus_shares=virus_shares,
-            overall_share_known_cases=overall_share_known_cases,
+            **load_initial_conditions_inputs(initial_states, start_date, paths),
             group_share_known_cases=group_share_known_cases,
-            group_weights=group_weights,
+            cache_dir=cache_dir,
         )
     else:
         initial_conditions = None
@@ -242,6 +244,41 @@ def load_simulation_inputs(
     return simulation_inputs
 
 
+def load_initial_conditions_inputs(initial_states, start_date, paths):
+    """Load the inputs of the initial conditions which do not change between runs.
+
+    Args:
+        initial_states (pandas.DataFrame): The initial states.
+        start_date (pandas.Timestamp): The start date of the simulation.
+        paths (dict): The dependencies of the simulation. See
+            :func:`get_simulation_dependencies`.
+
+    Returns:
+        dict: Keyword arguments of ``create_initial_conditions`` except for the group
+            share known cases.
+
+    """
+    one_day = pd.Timedelta(1, unit="D")
+    params = pd.read_pickle(paths["params"])
+    with warnings.catch_warnings():
+        warnings.filterwarnings(
+            "ignore", message="indexing past lexsort depth may impact performance."
+        )
+        params_slice = params.loc[("share_known_cases", "share_known_cases")]
+
+    return {
+        "start": start_date - pd.Timedelta(31, unit="D"),
+        "end": start_date - one_day,
+        "seed": 3930,
+        "reporting_delay": 5,
+        "synthetic_data": initial_states[["county", "age_group_rki"]],
+        "empirical_infections": pd.read_pickle(paths["rki"]),
+        "virus_shares": pd.read_pickle(paths["virus_shares"]),
+        "overall_share_known_cases": get_piecewise_linear_interpolation(params_slice),
+        "group_weights": pd.read_pickle(paths["rki_age_groups"])["weight"],
+    }
+
+
 def get_simulation_dependencies(debug, is_resumed):
     """Collect paths on which the simulation depends.
 
@@ -312,6 +349,8 @@ def get_simulation_dependencies(debug, is_resumed):
         "create_rapid_test_statistics": SRC
         / "testing"
         / "create_rapid_test_statistics.py",
+        "simulation_outputs.py": SRC / "simulation" / "simulation_outputs.py",
+        "scenario_runner.py": SRC / "simulation" / "scenario_runner.py",
     }
 
     if not is_resumed:
@@ -323,26 +362,46 @@ def get_simulation_dependencies(debug, is_resumed):
     return out
 
 
+INCIDENCE_OUTCOMES = [
+    "newly_infected",
+    "new_known_case",
+    "newly_deceased",
+    "currently_infected",  # only used for share known cases
+    "knows_currently_infected",  # only used for share known cases
+    "ever_vaccinated",
+]
+"""list: Outcomes whose mean is a period output for every group."""
+
+RAPID_TEST_OUTCOMES = {
+    "share_ever_rapid_test": (
+        "ever_had_a_rapid_test",
+        # -9999 is the start value of sid's countdowns.
+        "(cd_received_rapid_test >= -9998) & (cd_received_rapid_test <= 0)",
+    ),
+    "share_rapid_test_in_last_week": (
+        "last_rapid_test_in_the_last_week",
+        "(cd_received_rapid_test >= -6) & (cd_received_rapid_test <= 0)",
+    ),
+    "share_doing_rapid_test_today": (
+        "did_rapid_test_today",
+        # has to be -1 because period outputs are done after countdowns are updated.
+        "cd_received_rapid_test == -1",
+    ),
+}
+"""dict: Maps the names of the rapid test period outputs to the name of the outcome
+and the expression which identifies individuals with the outcome."""
+
+
 def create_period_outputs():
     period_outputs = {}
 
-    incidence_outcomes = [
-        "newly_infected",
-        "new_known_case",
-        "newly_deceased",
-        "currently_infected",  # only used for share known cases
-        "knows_currently_infected",  # only used for share known cases
-        "ever_vaccinated",
-    ]
     groupbys = ["state", "age_group_rki", None]
 
-    for outcome in incidence_outcomes:
+    for outcome in INCIDENCE_OUTCOMES:
         for groupby in groupbys:
             gb_str = f"_by_{groupby}" if groupby is not None else ""
             period_outputs[outcome + gb_str] = partial(
-                calculate_period_outcome_sim,
-                outcome=outcome,
-                groupby=groupby,
+                get_fused_period_output, outcome=outcome, groupby=groupby
             )
 
     period_outputs["r_effective"] = partial(calculate_r_effective, window_length=7)
@@ -353,68 +412,57 @@ def create_period_outputs():
 
     for groupby in groupbys:
         gb_str = f"_by_{groupby}" if groupby is not None else ""
-        period_outputs["share_ever_rapid_test" + gb_str] = partial(
-            _calculate_share_ever_rapid_test, groupby=groupby
-        )
-        period_outputs["share_rapid_test_in_last_week" + gb_str] = partial(
-            _calculate_share_rapid_test_in_last_week, groupby=groupby
-        )
-        period_outputs["share_doing_rapid_test_today" + gb_str] = partial(
-            _calculate_share_doing_rapid_test, groupby=groupby
-        )
+        for output_name, (outcome, _) in RAPID_TEST_OUTCOMES.items():
+            period_outputs[output_name + gb_str] = partial(
+                get_fused_period_output, outcome=outcome, groupby=groupby
+            )
 
     return period_outputs
 
 
-def _calculate_share_ever_rapid_test(df, groupby):
-    sid_start_value = -9999
-    ever_tested_share_per_group = _calculate_share_rapid_test_countdown_between(
-        df=df,
-        groupby=groupby,
-        lower=sid_start_value + 1,
-        upper=0,
-        name="ever_had_a_rapid_test",
-    )
-    return ever_tested_share_per_group
-
+_FUSED_PERIOD_OUTPUTS = {"current": (lambda: None, None, {})}
+"""dict: Holds a weak reference to the states, the date and the period outputs of
+the current period by groupby."""
 
-def _calculate_share_rapid_test_in_last_week(df, groupby):
-    tested_last_week = _calculate_share_rapid_test_countdown_between(
-        df=df,
-        groupby=groupby,
-        lower=-6,
-        upper=0,
-        name="last_rapid_test_in_the_last_week",
-    )
-    return tested_last_week
 
+def get_fused_period_output(df, outcome, groupby):
+    """Get one outcome of the period outputs which are computed together.
 
-def _calculate_share_rapid_test_countdown_between(df, groupby, lower, upper, name):
-    """Share by groupby with their last rapid test between lower and upper (inclusively).
+    sid calls every period output separately. The first call in a period computes
+    all outcomes of :data:`INCIDENCE_OUTCOMES` and :data:`RAPID_TEST_OUTCOMES` for
+    the groupby in one pass and the following calls only select their outcome.
 
     Args:
-        df (pandas.DataFrame): states DataFrame
-        groupby (str or None): groupby column
-        lower (int): lower bound (individuals with this value are included)
-        upper (int): upper bound (individuals with this value are included)
-        name (str): name of the Series to be returned
-
-    """
-    if groupby is None:
-        groupby = []
-    elif isinstance(groupby, str):
-        groupby = [groupby]
-
-    within_interval = df["cd_received_rapid_test"].between(lower, upper, inclusive=True)
-    within_interval = within_interval.to_frame(name=name)
-    within_interval["date"] = df["date"]
-    if groupby:
-        within_interval[groupby] = df[groupby]
+        df (pandas.DataFrame): The states at the end of a period.
+        outcome (str): Name of the outcome.
+        groupby (str or None): Defines the subgroups for which the outcome is
+            calculated.
 
-    grouper = [pd.Grouper(key="date", freq="D")] + groupby
-    within_interval_share_per_group = within_interval.groupby(grouper)[name].mean()
+    Returns:
+        pd.Series: Series with the outcome for one day. The first index level is
+            date. If groupby is specified, there is a second index level.
 
-    return within_interval_share_per_group
+    """
+    date = df["date"].iloc[0]
+    states_ref, current_date, outputs = _FUSED_PERIOD_OUTPUTS["current"]
+    if states_ref() is not df or current_date != date:
+        outputs = {}
+        _FUSED_PERIOD_OUTPUTS["current"] = (weakref.ref(df), date, outputs)
+    if groupby not in outputs:
+        outputs[groupby] = _calculate_fused_period_outputs(df, groupby)
+    return outputs[groupby][outcome]
+
+
+def _calculate_fused_period_outputs(df, groupby):
+    outcomes = {outcome: outcome for outcome in INCIDENCE_OUTCOMES}
+    for outcome, expression in RAPID_TEST_OUTCOMES.values():
+        outcomes[outcome] = get_period_mask(df, expression, stage="end")
+
+    out = calculate_period_outcomes_sim(df, outcomes, groupby)
+    # Shares of rapid tests in groups without members stay missing.
+    for outcome in INCIDENCE_OUTCOMES + ["did_rapid_test_today"]:
+        out[outcome] = out[outcome].fillna(0)
+    return out
 
 
 def calculate_period_virus_share(df, strain):
@@ -424,21 +472,3 @@ def calculate_period_virus_share(df, strain):
 
     out = df.groupby([pd.Grouper(key="date", freq="D")])[strain].mean().fillna(0)
     return out
-
-
-def _calculate_share_doing_rapid_test(df, groupby):
-    if groupby is None:
-        groupby = []
-    elif isinstance(groupby, str):
-        groupby = [groupby]
-
-    df = df[["date", "cd_received_rapid_test"] + groupby].copy(deep=True)
-    # has to be -1 because period outputs are done after countdowns are updated.
-    df["did_rapid_test_today"] = df["cd_received_rapid_test"] == -1
-
-    out = (
-        df.groupby([pd.Grouper(key="date", freq="D")] + groupby)["did_rapid_test_today"]
-        .mean()
-        .fillna(0)
-    )
-    return out
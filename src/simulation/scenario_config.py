@@ -25,19 +25,21 @@ NON_INCIDENCE_OUTCOMES = [
 
 
 def create_path_to_last_states_of_simulation(name, seed):
-    path = BLD / "simulations" / "last_states" / f"{FAST_FLAG}_{name}_{seed}.pkl"
+    file_name = f"{FAST_FLAG}_{name}_{seed}.parquet"
+    path = BLD / "simulations" / "last_states" / file_name
     return path
 
 
 def create_path_to_raw_rapid_test_statistics(name, seed):
-    csv_name = f"{FAST_FLAG}_{name}_{seed}.csv"
-    path = BLD / "simulations" / "period_outputs" / "rapid_test_statistics" / csv_name
+    file_name = f"{FAST_FLAG}_{name}_{seed}.parquet"
+    path = BLD / "simulations" / "period_outputs" / "rapid_test_statistics" / file_name
     return path
 
 
 def create_path_to_period_outputs_of_simulation(name, seed):
     """Return the path to the simulation results with the period outcomes."""
-    path = BLD / "simulations" / "period_outputs" / f"{FAST_FLAG}_{name}_{seed}.pkl"
+    file_name = f"{FAST_FLAG}_{name}_{seed}.parquet"
+    path = BLD / "simulations" / "period_outputs" / file_name
     return path
 
 
@@ -0,0 +1,241 @@
+"""Simulate all seeds of one scenario.
+
+The simulation inputs of a scenario are loaded once. Then, the seeds are simulated in a
+pool of forked processes which share the inputs copy-on-write. After a seed is
+finished, a checkpoint is written next to its outputs such that a rerun of an
+interrupted scenario only simulates the missing seeds.
+
+"""
+import hashlib
+import json
+import multiprocessing
+from functools import partial
+from pathlib import Path
+
+from sid import get_simulate_func
+
+from src.config import BLD
+from src.simulation.load_params import load_params
+from src.simulation.load_simulation_inputs import load_simulation_inputs
+from src.simulation.simulation_outputs import save_period_outputs
+from src.testing.create_rapid_test_statistics import flush_rapid_test_statistics
+
+_SHARED_INPUTS = {}
+"""dict: The simulation inputs and params which are shared by all seeds of a scenario.
+
+The inputs are stored before the processes are forked. Thus, the processes inherit them
+without loading or pickling them again.
+
+"""
+
+
+def run_scenario(scenario, seeds, depends_on, n_processes):
+    """Simulate all seeds of a scenario which are not checkpointed yet.
+
+    Args:
+        scenario (dict): Contains the keys "sim_input_scenario", "params_scenario",
+            "start_date", "end_date", "save_last_states", "is_resumed" and "debug".
+        seeds (dict): Maps the seeds to dictionaries with the paths "period_outputs",
+            "last_states", "rapid_test_statistics" and "initial_states". The paths to
+            the last states and rapid test statistics may be None.
+        depends_on (dict): The dependencies of the simulation. Changes to them
+            invalidate the checkpoints.
+        n_processes (int): Maximum number of processes which simulate seeds.
+
+    """
+    to_simulate = {}
+    for seed, paths in seeds.items():
+        fingerprint = get_fingerprint(scenario, seed, paths, depends_on)
+        if not is_checkpointed(paths, fingerprint):
+            to_simulate[seed] = (paths, fingerprint)
+
+    if not to_simulate:
+        return
+
+    all_paths = [paths for paths, _ in to_simulate.values()]
+    initial_states_paths = {paths["initial_states"] for paths in all_paths}
+    # only resumed scenarios have different initial states for each seed.
+    if len(initial_states_paths) == 1:
+        _SHARED_INPUTS["current"] = _load_inputs(
+            scenario, initial_states_paths.pop(), all_paths[0]["rapid_test_statistics"]
+        )
+
+    tasks = [
+        partial(_simulate_seed, seed, paths, fingerprint, scenario)
+        for seed, (paths, fingerprint) in to_simulate.items()
+    ]
+    n_processes = min(n_processes, len(tasks))
+    try:
+        if n_processes > 1 and "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+            # Every process simulates only one seed and exits such that seeds never
+            # see objects which were modified by another seed.
+            with context.Pool(n_processes, maxtasksperchild=1) as pool:
+                for _ in pool.imap_unordered(_call, tasks):
+                    pass
+        else:
+            for task in tasks:
+                task()
+    finally:
+        _SHARED_INPUTS.clear()
+
+
+def get_fingerprint(scenario, seed, paths, depends_on):
+    """Create the fingerprint of a seed of a scenario.
+
+    The fingerprint changes with the specification of the scenario, the seed, the
+    output paths and the modification times and sizes of the dependencies.
+
+    Args:
+        scenario (dict): See :func:`run_scenario`.
+        seed (int): The seed of the simulation.
+        paths (dict): See :func:`run_scenario`.
+        depends_on (dict): See :func:`run_scenario`.
+
+    Returns:
+        str: The fingerprint.
+
+    """
+    dependencies = {**depends_on, "initial_states": paths["initial_states"]}
+    stats = {}
+    for name, path in sorted(dependencies.items()):
+        path = Path(path)
+        if path.exists():
+            stat = path.stat()
+            stats[name] = [str(path), stat.st_mtime_ns, stat.st_size]
+        else:
+            stats[name] = [str(path), None, None]
+
+    content = {
+        "scenario": {key: str(value) for key, value in sorted(scenario.items())},
+        "seed": seed,
+        "paths": {key: str(value) for key, value in sorted(paths.items())},
+        "dependencies": stats,
+    }
+    return hashlib.sha256(json.dumps(content).encode()).hexdigest()
+
+
+def is_checkpointed(paths, fingerprint):
+    """Check whether a seed was simulated with the same fingerprint before.
+
+    Args:
+        paths (dict): See :func:`run_scenario`.
+        fingerprint (str): The fingerprint of the seed.
+
+    Returns:
+        bool: True if the checkpoint matches the fingerprint and all outputs exist.
+
+    """
+    checkpoint = _get_checkpoint_path(paths)
+    outputs = [
+        paths[name]
+        for name in ["period_outputs", "last_states", "rapid_test_statistics"]
+        if paths[name] is not None
+    ]
+    return (
+        checkpoint.exists()
+        and checkpoint.read_text() == fingerprint
+        and all(Path(path).exists() for path in outputs)
+    )
+
+
+def write_checkpoint(paths, fingerprint):
+    """Mark a seed as simulated.
+
+    Args:
+        paths (dict): See :func:`run_scenario`.
+        fingerprint (str): The fingerprint of the seed.
+
+    """
+    _get_checkpoint_path(paths).write_text(fingerprint)
+
+
+def set_rapid_test_statistics_path(simulation_kwargs, path):
+    """Let the rapid test models save their statistics to another path.
+
+    The path is bound to the rapid test models when the inputs are loaded. Rebinding it
+    allows the seeds of a scenario to share the inputs and save their statistics
+    separately.
+
+    Args:
+        simulation_kwargs (dict): The simulation inputs. See
+            :func:`src.simulation.load_simulation_inputs.load_simulation_inputs`.
+        path (pathlib.Path or None): The path to the rapid test statistics.
+
+    Returns:
+        dict: The simulation inputs whose rapid test models save to ``path``.
+
+    """
+    rapid_test_models = {}
+    for name, model in (simulation_kwargs.get("rapid_test_models") or {}).items():
+        func = model["model"]
+        if isinstance(func, partial) and "save_path" in func.keywords:
+            keywords = {**func.keywords, "save_path": path}
+            func = partial(func.func, *func.args, **keywords)
+            model = {**model, "model": func}
+        rapid_test_models[name] = model
+
+    if not rapid_test_models:
+        return simulation_kwargs
+    return {**simulation_kwargs, "rapid_test_models": rapid_test_models}
+
+
+def _get_checkpoint_path(paths):
+    return Path(paths["period_outputs"]).with_suffix(".checkpoint")
+
+
+def _call(func):
+    return func()
+
+
+def _load_inputs(scenario, initial_states_path, rapid_test_statistics_path):
+    simulation_kwargs = load_simulation_inputs(
+        scenario=scenario["sim_input_scenario"],
+        start_date=scenario["start_date"],
+        end_date=scenario["end_date"],
+        return_last_states=scenario["save_last_states"],
+        debug=scenario["debug"],
+        period_outputs=True,
+        initial_states_path=initial_states_path,
+        is_resumed=scenario["is_resumed"],
+        rapid_test_statistics_path=rapid_test_statistics_path,
+    )
+    params = load_params(scenario["params_scenario"])
+    return simulation_kwargs, params
+
+
+def _simulate_seed(seed, paths, fingerprint, scenario):
+    rapid_test_statistics_path = paths["rapid_test_statistics"]
+    if "current" in _SHARED_INPUTS:
+        simulation_kwargs, params = _SHARED_INPUTS["current"]
+        simulation_kwargs = set_rapid_test_statistics_path(
+            simulation_kwargs, rapid_test_statistics_path
+        )
+    else:
+        simulation_kwargs, params = _load_inputs(
+            scenario, paths["initial_states"], rapid_test_statistics_path
+        )
+
+    # since the statistics are appended to this file we need to delete the present
+    # file with every run
+    if rapid_test_statistics_path is not None and rapid_test_statistics_path.exists():
+        rapid_test_statistics_path.unlink()
+
+    temp_path = BLD / "simulations" / "temp" / paths["period_outputs"].stem
+    temp_path.mkdir(parents=True, exist_ok=True)
+
+    simulate = get_simulate_func(
+        params=params, path=temp_path, seed=seed, **simulation_kwargs
+    )
+    res = simulate(params)
+    if rapid_test_statistics_path is not None:
+        flush_rapid_test_statistics(rapid_test_statistics_path)
+
+    if scenario["save_last_states"]:
+        last_states = res.pop("last_states")
+        path = paths["last_states"]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        last_states.to_parquet(path, engine="fastparquet")
+
+    save_period_outputs(res["period_outputs"], paths["period_outputs"])
+    write_checkpoint(paths, fingerprint)
@@ -0,0 +1,148 @@
+"""Store the outputs of simulations in columnar files.
+
+The period outputs of a simulation are stored in one Parquet file per seed. Every row
+is a date and every period output has one column per group. Thus, single outcomes can
+be loaded without reading the whole file. Period outputs which do not have the same
+groups on every day are pickled into the metadata of the file.
+
+"""
+import base64
+import json
+import pickle
+
+import fastparquet
+import numpy as np
+import pandas as pd
+
+from src.calculate_moments import compress_period_outputs
+
+GROUP_SEPARATOR = "::"
+"""str: Separates the name of a period output and the group in the column names."""
+
+
+def save_period_outputs(period_outputs, path):
+    """Save the period outputs of one simulation to a Parquet file.
+
+    Args:
+        period_outputs (dict): Maps the names of the period outputs to lists with the
+            output of every period or to period outputs compressed by
+            :func:`src.calculate_moments.compress_period_outputs`.
+        path (pathlib.Path): Path to the Parquet file.
+
+    """
+    compressed = compress_period_outputs(period_outputs)
+
+    columns = {}
+    metadata = {}
+    dates = None
+    for name, output in compressed.items():
+        if not _is_columnar(output):
+            metadata[name] = {
+                "pickle": base64.b64encode(pickle.dumps(output)).decode("ascii")
+            }
+            continue
+
+        if dates is None:
+            dates = output["dates"]
+        elif len(dates) != len(output["dates"]):
+            raise ValueError("All period outputs must have the same dates.")
+        else:
+            # days on which an output is empty have the date NaT.
+            known = dates.notna() & output["dates"].notna()
+            if not (dates[known] == output["dates"][known]).all():
+                raise ValueError("All period outputs must have the same dates.")
+            dates = dates.where(dates.notna(), output["dates"])
+
+        groups = output["groups"]
+        if groups is None:
+            columns[name] = output["values"][:, 0]
+        else:
+            for i, group in enumerate(groups):
+                columns[f"{name}{GROUP_SEPARATOR}{group}"] = output["values"][:, i]
+
+        metadata[name] = {
+            "name": output["name"],
+            "date_name": output["dates"].name,
+            "dtype": str(output["dtype"]),
+            "has_freq": output["has_freq"],
+            "groups": None if groups is None else groups.tolist(),
+            "group_name": None if groups is None else groups.name,
+            "ordered": getattr(groups, "ordered", None),
+            "empty_days": np.flatnonzero(output["dates"].isna()).tolist(),
+        }
+
+    df = pd.DataFrame(columns)
+    df.insert(0, "date", np.asarray([] if dates is None else dates))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fastparquet.write(
+        str(path),
+        df,
+        write_index=False,
+        custom_metadata={"period_outputs": json.dumps(metadata)},
+    )
+
+
+def _is_columnar(output):
+    return (
+        isinstance(output, dict)
+        and (output["groups"] is None or output["groups"].nlevels == 1)
+        and pd.api.types.is_datetime64_any_dtype(output["dates"])
+    )
+
+
+def load_period_outputs(path, outputs=None):
+    """Load period outputs saved by :func:`save_period_outputs`.
+
+    Args:
+        path (pathlib.Path): Path to the Parquet file.
+        outputs (list, optional): Names of the period outputs to load. By default, all
+            period outputs are loaded.
+
+    Returns:
+        dict: Maps the names of the period outputs to compressed period outputs. Use
+            :func:`src.calculate_moments.period_output_to_pandas` to convert them.
+
+    """
+    parquet_file = fastparquet.ParquetFile(str(path))
+    metadata = json.loads(parquet_file.key_value_metadata["period_outputs"])
+    outputs = list(metadata) if outputs is None else outputs
+
+    columnar = [name for name in outputs if "pickle" not in metadata[name]]
+    columns_by_output = {
+        name: [name]
+        if metadata[name]["groups"] is None
+        else [f"{name}{GROUP_SEPARATOR}{group}" for group in metadata[name]["groups"]]
+        for name in columnar
+    }
+    columns = [column for names in columns_by_output.values() for column in names]
+    df = parquet_file.to_pandas(columns=["date"] + columns)
+
+    out = {}
+    for name in outputs:
+        meta = metadata[name]
+        if "pickle" in meta:
+            out[name] = pickle.loads(base64.b64decode(meta["pickle"]))
+            continue
+
+        dates = df["date"].to_numpy().copy()
+        dates[meta["empty_days"]] = np.datetime64("NaT")
+        if meta["groups"] is None:
+            groups = None
+        elif meta["ordered"] is None:
+            groups = pd.Index(meta["groups"], name=meta["group_name"])
+        else:
+            groups = pd.CategoricalIndex(
+                meta["groups"],
+                categories=meta["groups"],
+                ordered=meta["ordered"],
+                name=meta["group_name"],
+            )
+        out[name] = {
+            "name": meta["name"],
+            "dates": pd.Index(dates, name=meta["date_name"]),
+            "groups": groups,
+            "values": df[columns_by_output[name]].to_numpy(dtype=float),
+            "dtype": np.dtype(meta["dtype"]),
+            "has_freq": meta["has_freq"],
+        }
+    return out
@@ -9,6 +9,8 @@ from src.simulation.scenario_config import (
 )
 from src.simulation.scenario_config import create_path_to_raw_rapid_test_statistics
 from src.simulation.scenario_config import get_named_scenarios
+from src.testing.create_rapid_test_statistics import get_rapid_test_statistics_columns
+from src.testing.create_rapid_test_statistics import load_rapid_test_statistics
 
 _N_SEEDS = get_named_scenarios()["spring_baseline"]["n_seeds"]
 
@@ -43,13 +45,13 @@ _SINGLE_COL_PARAMETRIZATION = [
 @pytask.mark.parametrize("column, produces", _SINGLE_COL_PARAMETRIZATION)
 def task_process_rapid_test_statistics(depends_on, column, produces):
     dfs = {
-        seed: pd.read_csv(path, parse_dates=["date"], index_col="date")
+        seed: load_rapid_test_statistics(path, columns=[column])
         for seed, path in depends_on.items()
     }
     for df in dfs.values():
         assert not df.index.duplicated().any(), (
             "Duplicates in a rapid test statistic DataFrame's index. "
-            "The csv file must be deleted before every run."
+            "The parquet file must be deleted before every run."
         )
     df = pd.concat({seed: df[column] for seed, df in dfs.items()}, axis=1)
     df[column] = df.mean(axis=1).rolling(window=7, min_periods=1, center=False).mean()
@@ -165,8 +167,8 @@ def task_create_nice_rapid_test_statistic_table_for_lookup(produces):
 
 @pytask.mark.depends_on(_DEPENDENCIES)
 def task_check_that_a_table_was_created_for_each_rapid_test_statistic(depends_on):
-    statistics_saved_by_sid = pd.read_csv(depends_on[0]).columns
-    to_skip = ["date", "n_individuals", "Unnamed: 0"]
+    statistics_saved_by_sid = get_rapid_test_statistics_columns(depends_on[0])
+    to_skip = ["date", "n_individuals"]
     should_have_a_table = [x for x in statistics_saved_by_sid if x not in to_skip]
     assert set(should_have_a_table) == set(
         RAPID_TEST_STATISTICS
@@ -13,12 +13,14 @@ from src.simulation.scenario_config import get_available_scenarios
 from src.simulation.scenario_config import get_named_scenarios
 from src.simulation.scenario_config import INCIDENCE_OUTCOMES
 from src.simulation.scenario_config import NON_INCIDENCE_OUTCOMES
+from src.simulation.simulation_outputs import load_period_outputs
 
 
 _MODULE_DEPENDENCIES = {
     "calculate_moments.py": SRC / "calculate_moments.py",
     "load_simulation_inputs.py": SRC / "simulation" / "load_simulation_inputs.py",
     "scenario_config.py": SRC / "simulation" / "scenario_config.py",
+    "simulation_outputs.py": SRC / "simulation" / "simulation_outputs.py",
 }
 
 
@@ -50,7 +52,10 @@ _SIGNATURE, _PARAMETRIZATION = _create_incidence_parametrization()
 @pytask.mark.parametrize(_SIGNATURE, _PARAMETRIZATION)
 def task_create_weekly_outcome_for_scenario(depends_on, produces):
     seed_keys = [seed for seed in depends_on if isinstance(seed, int)]
-    results = {str(seed): pd.read_pickle(depends_on[seed]) for seed in seed_keys}
+    results = {
+        str(seed): {"period_outputs": load_period_outputs(depends_on[seed])}
+        for seed in seed_keys
+    }
     for entry, path in produces.items():
         outcome_and_groupby = entry.split("_by_")
         if len(outcome_and_groupby) == 1:
@@ -1,14 +1,21 @@
+import atexit
 import itertools
+from pathlib import Path
 
+import fastparquet
 import numpy as np
 import pandas as pd
 from sid.rapid_tests import _sample_test_outcome
 
 from src.config import POPULATION_GERMANY
 from src.policies.policy_tools import combine_dictionaries
+from src.shared import get_params_slice
+from src.shared import get_params_value
 
 
-def create_rapid_test_statistics(demand_by_channel, states, date, params):
+def create_rapid_test_statistics(
+    demand_by_channel, states, date, params, mode="expected"
+):
     """Calculate the rapid test statistics.
 
     Args:
@@ -18,6 +25,10 @@ def create_rapid_test_statistics(demand_by_channel, states, date, params):
         date (pandas.Timestamp or str): date
         params (pandas.DataFrame): parameter DataFrame that contains the sensitivity
             and specificity of the rapid tests
+        mode (str): One of "expected" and "sampled". If "expected", the statistics
+            are the expected values given the sensitivity and specificity of the rapid
+            tests. If "sampled", the test outcomes are sampled once for everyone who
+            demands a test.
 
     Returns:
         statistics (pandas.DataFrame): DataFrame with just one column named 0. The
@@ -33,30 +44,117 @@ def create_rapid_test_statistics(demand_by_channel, states, date, params):
     demand_by_channel = demand_by_channel.copy()
     demand_by_channel["overall"] = demand_by_channel.any(axis=1)
 
-    for channel in demand_by_channel.columns:
+    if mode == "expected":
+        channel_statistics = _calculate_expected_rapid_test_statistics(
+            states=states, demand_by_channel=demand_by_channel, params=params
+        )
+        statistics = combine_dictionaries([statistics, channel_statistics])
+    elif mode == "sampled":
         # because we don't know the seed with which sample_test_outcome will be called
         # with, these results will not be exactly equal to the test outcomes in sid but
         # most channels easily exceed the number of tests for randomness to be relevant
         rapid_test_results = _sample_test_outcome(
             states=states,
-            receives_rapid_test=demand_by_channel[channel],
+            receives_rapid_test=demand_by_channel["overall"],
             params=params,
             seed=itertools.count(93894),
         )
-
-        channel_statistics = _calculate_rapid_test_statistics_by_channel(
-            states=states,
-            rapid_test_results=rapid_test_results,
-            receives_rapid_test=demand_by_channel[channel],
-            channel_name=channel,
-        )
-        statistics = combine_dictionaries([statistics, channel_statistics])
+        for channel in demand_by_channel.columns:
+            channel_statistics = _calculate_rapid_test_statistics_by_channel(
+                states=states,
+                rapid_test_results=rapid_test_results,
+                receives_rapid_test=demand_by_channel[channel],
+                channel_name=channel,
+            )
+            statistics = combine_dictionaries([statistics, channel_statistics])
+    else:
+        raise ValueError(f"mode must be 'expected' or 'sampled', not {mode}.")
 
     statistics = pd.Series(statistics).to_frame()
     statistics.index.name = "index"
     return statistics
 
 
+def _calculate_expected_rapid_test_statistics(states, demand_by_channel, params):
+    """Calculate the expected rapid test statistics for all channels at once.
+
+    The probability of a positive test is the sensitivity for infected and one minus
+    the specificity for uninfected individuals as in sid. The expected number of each
+    outcome in a channel is the sum of the outcome probabilities over the individuals
+    who demand a test through the channel.
+
+    Args:
+        states (pandas.DataFrame): sid states DataFrame.
+        demand_by_channel (pandas.DataFrame): same index as states. Each column is one
+            channel through which rapid tests can be demanded.
+        params (pandas.DataFrame): parameter DataFrame that contains the sensitivity
+            and specificity of the rapid tests
+
+    Returns:
+        dict
+
+    """
+    p_positive = _get_probability_of_positive_rapid_test(states, params)
+    p_negative = 1 - p_positive
+    currently_infected = states["currently_infected"].to_numpy()
+
+    outcome_weights = pd.DataFrame(
+        {
+            "tested": np.ones(len(states)),
+            "tested_positive": p_positive,
+            "tested_negative": p_negative,
+            "true_positive": p_positive * currently_infected,
+            "true_negative": p_negative * ~currently_infected,
+            "false_positive": p_positive * ~currently_infected,
+            "false_negative": p_negative * currently_infected,
+        }
+    )
+    demand = demand_by_channel.to_numpy(dtype=float)
+    expected_counts = pd.DataFrame(
+        demand.T @ outcome_weights.to_numpy(),
+        index=demand_by_channel.columns,
+        columns=outcome_weights.columns,
+    )
+
+    n_obs = len(states)
+    statistics = {}
+    for channel, counts in expected_counts.iterrows():
+        n_tested = counts["tested"] if counts["tested"] != 0 else np.nan
+        for name, count in counts.items():
+            statistics[f"number_{name}_by_{channel}"] = (
+                POPULATION_GERMANY * count / n_obs
+            )
+            statistics[f"popshare_{name}_by_{channel}"] = count / n_obs
+            statistics[f"testshare_{name}_by_{channel}"] = count / n_tested
+    return statistics
+
+
+def _get_probability_of_positive_rapid_test(states, params):
+    """Get the probability of a positive rapid test for each individual.
+
+    This mirrors the sensitivity and specificity in sid's ``_sample_test_outcome``.
+
+    """
+    sensitivity_params = get_params_slice(params, ("rapid_test", "sensitivity"))
+    specificity = get_params_value(params, ("rapid_test", "specificity", "specificity"))
+
+    cd_infectious_true = states["cd_infectious_true"].to_numpy()
+    infectious = states["infectious"].to_numpy()
+
+    sensitivity = np.full(len(states), np.nan)
+    sensitivity[cd_infectious_true > 0] = sensitivity_params.loc["pre-infectious"]
+    sensitivity[infectious] = sensitivity_params.loc["while_infectious"]
+    sensitivity[cd_infectious_true == 0] = sensitivity_params.loc["start_infectious"]
+    within_10_days = (-10 <= cd_infectious_true) & (cd_infectious_true <= 0)
+    sensitivity[~infectious & within_10_days] = sensitivity_params.loc[
+        "after_infectious"
+    ]
+
+    infected = cd_infectious_true >= -10
+    p_positive = np.where(infected, sensitivity, 1 - specificity)
+    return p_positive
+
+
 def _calculate_rapid_test_statistics_by_channel(
     states,
     rapid_test_results,
@@ -113,3 +211,78 @@ def _calculate_rapid_test_statistics_by_channel(
         statistics[f"testshare_{name}_by_{channel_name}"] = sr.sum() / n_tested
 
     return statistics
+
+
+FLUSH_EVERY = 30
+"""int: Number of days after which buffered rapid test statistics are written."""
+
+_BUFFERS = {}
+"""dict: Maps paths to the buffered rows of rapid test statistics."""
+
+
+def save_rapid_test_statistics(statistics, path, flush_every=FLUSH_EVERY):
+    """Buffer the rapid test statistics of one day and write them in batches.
+
+    The rows are kept in memory and appended to a Parquet file once **flush_every**
+    rows are collected. Call :func:`flush_rapid_test_statistics` after the simulation
+    to write the remaining rows. Remaining rows are also written when the interpreter
+    exits.
+
+    Args:
+        statistics (pandas.DataFrame): the output of
+            :func:`create_rapid_test_statistics`.
+        path (pathlib.Path or str): path to the Parquet file.
+        flush_every (int): number of rows which are written at once.
+
+    """
+    path = Path(path)
+    buffer = _BUFFERS.setdefault(path, [])
+    buffer.append(statistics.iloc[:, 0].to_dict())
+    if len(buffer) >= flush_every:
+        flush_rapid_test_statistics(path)
+
+
+def flush_rapid_test_statistics(path=None):
+    """Append the buffered rapid test statistics to their Parquet files.
+
+    Args:
+        path (pathlib.Path or str, optional): only flush the buffer of this path. By
+            default, all buffers are flushed.
+
+    """
+    paths = list(_BUFFERS) if path is None else [Path(path)]
+    for path in paths:
+        rows = _BUFFERS.pop(path, [])
+        if rows:
+            df = pd.DataFrame(rows)
+            df["date"] = pd.to_datetime(df["date"])
+            statistic_columns = df.columns.drop("date")
+            df[statistic_columns] = df[statistic_columns].astype(float)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fastparquet.write(str(path), df, write_index=False, append=path.exists())
+
+
+atexit.register(flush_rapid_test_statistics)
+
+
+def load_rapid_test_statistics(path, columns=None):
+    """Load rapid test statistics saved by :func:`save_rapid_test_statistics`.
+
+    Args:
+        path (pathlib.Path or str): path to the Parquet file.
+        columns (list, optional): statistics to load. By default, all are loaded.
+
+    Returns:
+        statistics (pandas.DataFrame): one row per date and one column per statistic.
+
+    """
+    if columns is not None:
+        columns = ["date"] + list(columns)
+    statistics = pd.read_parquet(path, engine="fastparquet", columns=columns)
+    return statistics.set_index("date")
+
+
+def get_rapid_test_statistics_columns(path):
+    """Get the names of the statistics in a Parquet file without loading them."""
+    columns = fastparquet.ParquetFile(str(path)).columns
+    return [column for column in columns if column != "date"]
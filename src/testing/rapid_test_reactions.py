@@ -1,32 +1,38 @@
-from pandas.api.types import is_bool_dtype
+import numpy as np
+
+from src.contact_models.contact_model_functions import reduce_contacts_on_conditions
+from src.shared import get_params_value
+from src.shared import get_period_mask
 
 
 def rapid_test_reactions(states, contacts, params, seed):  # noqa: U100
-    """Make people react to a positive rapid tests by reducing their contacts."""
-    contacts = contacts.copy(deep=True)
+    """Make people react to a positive rapid tests by reducing their contacts.
+
+    The staying-home masks of all contact models are computed in one pass over the
+    population and applied to all columns at once. Household contacts and all other
+    contacts have different multipliers.
 
+    """
     # we assume that if you haven't received PCR confirmation within 7 days
     # you go back to having contacts.
-    received_rapid_test = states["cd_received_rapid_test"].between(
-        -5, 0, inclusive=True
+    quarantine_pool = get_period_mask(
+        states,
+        "is_tested_positive_by_rapid_test & (cd_received_rapid_test >= -5) "
+        "& (cd_received_rapid_test <= 0)",
+        stage="after_rapid_tests",
     )
-    pos_rapid_test = states["is_tested_positive_by_rapid_test"]
-    quarantine_pool = received_rapid_test & pos_rapid_test
-
-    for col in contacts:
-        loc = ("rapid_test_demand", "reaction")
-        if col == "households":
-            multiplier = params.loc[(*loc, "hh_contacts_multiplier"), "value"]
-        else:
-            multiplier = params.loc[(*loc, "not_hh_contacts_multiplier"), "value"]
-        refuser = states["quarantine_compliance"] <= multiplier
-        not_staying_home = refuser | ~quarantine_pool
-        # no need to worry about dtypes because post_process_contacts happens
-        # after this function is called.
 
-        if is_bool_dtype(contacts[col]):
-            contacts[col] = contacts[col].where(cond=not_staying_home, other=False)
-        else:
-            contacts[col] = contacts[col].where(cond=not_staying_home, other=0)
+    loc = ("rapid_test_demand", "reaction")
+    hh_multiplier = get_params_value(params, (*loc, "hh_contacts_multiplier"))
+    not_hh_multiplier = get_params_value(params, (*loc, "not_hh_contacts_multiplier"))
+    multipliers = np.where(
+        contacts.columns == "households", hh_multiplier, not_hh_multiplier
+    )
 
+    contacts = reduce_contacts_on_conditions(
+        contacts=contacts,
+        conditions=quarantine_pool[:, None],
+        quarantine_compliance=states["quarantine_compliance"],
+        multipliers=multipliers[:, None],
+    )
     return contacts
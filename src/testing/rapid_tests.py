@@ -1,11 +1,13 @@
 """Functions for rapid tests."""
-import warnings
-
 import numpy as np
 import pandas as pd
 from sid.time import get_date
 
+from src.shared import create_rng
+from src.shared import get_params_slice
+from src.shared import get_params_value
 from src.testing.create_rapid_test_statistics import create_rapid_test_statistics
+from src.testing.create_rapid_test_statistics import save_rapid_test_statistics
 from src.testing.shared import get_piecewise_linear_interpolation_for_one_day
 
 
@@ -36,19 +38,19 @@ def rapid_test_demand(
     date = get_date(states)
 
     # get params subsets
-    with warnings.catch_warnings():
-        warnings.filterwarnings(
-            "ignore", message="indexing past lexsort depth may impact performance."
-        )
-        work_offer_params = params.loc[
-            ("rapid_test_demand", "share_workers_receiving_offer")
-        ]
-        work_accept_params = params.loc[
-            ("rapid_test_demand", "share_accepting_work_offer")
-        ]
-        educ_workers_params = params.loc[("rapid_test_demand", "educ_worker_shares")]
-        students_params = params.loc[("rapid_test_demand", "student_shares")]
-        private_demand_params = params.loc[("rapid_test_demand", "private_demand")]
+    work_offer_params = get_params_slice(
+        params, ("rapid_test_demand", "share_workers_receiving_offer")
+    )
+    work_accept_params = get_params_slice(
+        params, ("rapid_test_demand", "share_accepting_work_offer")
+    )
+    educ_workers_params = get_params_slice(
+        params, ("rapid_test_demand", "educ_worker_shares")
+    )
+    students_params = get_params_slice(params, ("rapid_test_demand", "student_shares"))
+    private_demand_params = get_params_slice(
+        params, ("rapid_test_demand", "private_demand")
+    )
 
     # get work demand inputs
     share_of_workers_with_offer = get_piecewise_linear_interpolation_for_one_day(
@@ -72,7 +74,7 @@ def rapid_test_demand(
         freq_tup = ("rapid_test_demand", "educ_frequency", "before_easter")
     else:
         freq_tup = ("rapid_test_demand", "educ_frequency", "after_easter")
-    educ_frequency = params.loc[freq_tup, "value"]
+    educ_frequency = get_params_value(params, freq_tup)
 
     # get household member inputs
     private_demand_share = get_piecewise_linear_interpolation_for_one_day(
@@ -137,12 +139,7 @@ def rapid_test_demand(
             demand_by_channel=demand_by_channel, states=states, date=date, params=params
         )
 
-        if not save_path.exists():  # want to save with columns
-            to_add = shares.T.to_csv()
-        else:  # want to save without columns
-            to_add = shares.T.to_csv().split("\n", 1)[1]
-        with open(save_path, "a") as f:
-            f.write(to_add)
+        save_rapid_test_statistics(shares, save_path)
 
     return rapid_test_demand
 
@@ -309,11 +306,11 @@ def _determine_if_hh_had_event(states):
 
 
 def _randomize_rapid_tests(states, target_share_to_be_tested, share_refuser, seed):
-    np.random.seed(seed)
+    rng = create_rng(seed)
     # upscale the rapid_test_share to reach the target despite refusers
     willing_to_be_tested = states[states["rapid_test_compliance"] >= share_refuser]
     test_share_among_compliers = target_share_to_be_tested / (1 - share_refuser)
-    to_be_tested = np.random.choice(
+    to_be_tested = rng.choice(
         a=[True, False],
         size=len(willing_to_be_tested),
         p=[
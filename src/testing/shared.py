@@ -46,6 +46,10 @@ def convert_weekly_to_daily(df, divide_by_7_cols):
 def get_piecewise_linear_interpolation_for_one_day(date, params_slice):
     """Get a linearly interpolated share known cases for one day.
 
+    The interpolation is computed once for every distinct params slice and the value
+    is then looked up by its position in the interpolated array. Changed params result
+    in a new interpolation.
+
     Args:
         date (pandas.Timestamp): Date at which the function is evaluated.
         params_slice (pandas.Series): Series with DateIndex. The values are
@@ -57,16 +61,36 @@ def get_piecewise_linear_interpolation_for_one_day(date, params_slice):
 
     """
     date = pd.Timestamp(date)
-    s = get_piecewise_linear_interpolation(params_slice)
-    value = s.loc[date]
-    return value
+    start_date, values = _get_interpolation_table(params_slice)
+    position = (date - start_date).days
+    if not 0 <= position < len(values):
+        raise KeyError(date)
+    return values[position]
+
+
+_INTERPOLATION_TABLES = {}
+"""dict: Cache of interpolated values keyed by the content of the params slice."""
+
+
+def _get_interpolation_table(params_slice):
+    """Get the start date and the daily interpolated values of a params slice."""
+    if isinstance(params_slice, pd.DataFrame):
+        params_slice = params_slice["value"]
+    key = (tuple(params_slice.index), params_slice.to_numpy(dtype=float).tobytes())
+    if key not in _INTERPOLATION_TABLES:
+        # The number of distinct slices is small unless params change very often.
+        if len(_INTERPOLATION_TABLES) >= 256:
+            _INTERPOLATION_TABLES.clear()
+        interpolated = get_piecewise_linear_interpolation(params_slice)
+        _INTERPOLATION_TABLES[key] = (interpolated.index[0], interpolated.to_numpy())
+    return _INTERPOLATION_TABLES[key]
 
 
 def get_piecewise_linear_interpolation(params_slice):
     """Get a linearly interpolated share known cases series."""
     if isinstance(params_slice, pd.DataFrame):
         params_slice = params_slice["value"]
-    params_slice.index = pd.DatetimeIndex(params_slice.index)
+    params_slice = params_slice.set_axis(pd.DatetimeIndex(params_slice.index))
     start_date = params_slice.index.min()
     end_date = params_slice.index.max()
     out = params_slice.reindex(pd.date_range(start_date, end_date)).interpolate()
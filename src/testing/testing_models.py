@@ -5,6 +5,10 @@ import numpy as np
 import pandas as pd
 from sid.time import get_date
 
+from src.shared import create_rng
+from src.shared import get_params_slice
+from src.shared import get_params_value
+from src.shared import get_period_mask
 from src.testing.shared import get_piecewise_linear_interpolation_for_one_day
 
 
@@ -32,18 +36,13 @@ def demand_test(
             which contains the probability for each individual demanding a test.
 
     """
-    np.random.seed(seed)
+    rng = create_rng(seed)
     date = get_date(states)
 
-    with warnings.catch_warnings():
-        warnings.filterwarnings(
-            "ignore", message="indexing past lexsort depth may impact performance."
-        )
+    loc = ("test_demand", "shares", "share_w_positive_rapid_test_requesting_test")
+    share_requesting_confirmation = get_params_value(params, loc)
 
-        loc = ("test_demand", "shares", "share_w_positive_rapid_test_requesting_test")
-        share_requesting_confirmation = params.loc[loc, "value"]
-
-        params_slice = params.loc[("share_known_cases", "share_known_cases")]
+    params_slice = get_params_slice(params, ("share_known_cases", "share_known_cases"))
 
     share_known_cases = get_piecewise_linear_interpolation_for_one_day(
         date, params_slice
@@ -55,10 +54,11 @@ def demand_test(
         states=states,
         share_known_cases=share_known_cases,
         share_of_tests_for_symptomatics=share_of_tests_for_symptomatics,
+        rng=rng,
     )
 
     test_demand_from_rapid_tests = _calculate_test_demand_from_rapid_tests(
-        states, share_requesting_confirmation
+        states, share_requesting_confirmation, rng
     )
 
     demanded = test_demand_from_share_known_cases | test_demand_from_rapid_tests
@@ -67,7 +67,7 @@ def demand_test(
 
 
 def _calculate_test_demand_from_share_known_cases(
-    states, share_known_cases, share_of_tests_for_symptomatics
+    states, share_known_cases, share_of_tests_for_symptomatics, rng
 ):
     """Calculate test demand governed by share known cases.
 
@@ -83,6 +83,7 @@ def _calculate_test_demand_from_share_known_cases(
         share_known_cases (float): The share of cases that is detected via PCR tests.
         share_of_tests_for_symptomatics (float): The share of positive tests
             that discovered a symptomatic case.
+        rng (numpy.random.Generator): The random number generator.
 
     Returns:
         pd.Series: Boolean Series that is True for people who demand a test.
@@ -90,42 +91,40 @@ def _calculate_test_demand_from_share_known_cases(
     """
     n_newly_infected = states["newly_infected"].sum()
     n_pos_tests = n_newly_infected * share_known_cases
-    untested = ~states["knows_immune"] & ~states["pending_test"]
+    untested = get_period_mask(
+        states, "~knows_immune & ~pending_test", stage="after_rapid_tests"
+    )
+    symptomatic = states["symptomatic"].to_numpy()
 
-    symptomatic_untested = states["symptomatic"] & untested
-    n_symptomatic_untested = symptomatic_untested.sum()
+    symptomatic_pool = np.flatnonzero(symptomatic & untested)
 
     desired_n_tests_symptomatic = n_pos_tests * share_of_tests_for_symptomatics
-    n_tests_symptomatic = int(min(desired_n_tests_symptomatic, n_symptomatic_untested))
+    n_tests_symptomatic = int(min(desired_n_tests_symptomatic, len(symptomatic_pool)))
 
     n_tests_remaining = int(n_pos_tests - n_tests_symptomatic)
 
-    symptomatic_pool = states.index[symptomatic_untested]
-    symptomatic_sampled = np.random.choice(
-        symptomatic_pool, size=n_tests_symptomatic, replace=False
-    )
+    symptomatic_sampled = _sample_positions(symptomatic_pool, n_tests_symptomatic, rng)
 
     is_remaining_candidate = (
-        states["currently_infected"] & ~states["symptomatic"] & untested
+        states["currently_infected"].to_numpy() & ~symptomatic & untested
     )
-    remaining_pool = states.index[is_remaining_candidate]
+    remaining_pool = np.flatnonzero(is_remaining_candidate)
     if len(remaining_pool) < n_tests_remaining:
         n_tests_remaining = len(remaining_pool)
         warnings.warn("Implied share_known_cases is larger than one.")
 
-    remaining_sampled = np.random.choice(
-        remaining_pool, size=n_tests_remaining, replace=False
-    )
-
-    demand = pd.Series(False, index=states.index)
+    remaining_sampled = _sample_positions(remaining_pool, n_tests_remaining, rng)
 
-    for loc in [symptomatic_sampled, remaining_sampled]:
-        demand[loc] = True
+    demand = np.zeros(len(states), dtype=bool)
+    demand[symptomatic_sampled] = True
+    demand[remaining_sampled] = True
 
-    return demand
+    return pd.Series(demand, index=states.index)
 
 
-def _calculate_test_demand_from_rapid_tests(states, share_requesting_confirmation):
+def _calculate_test_demand_from_rapid_tests(
+    states, share_requesting_confirmation, rng
+):
     """Calculate test demand for the confirmation of rapid tests.
 
     People demand a pcr confirmation of a rapid test on the first day after receiving it
@@ -135,25 +134,43 @@ def _calculate_test_demand_from_rapid_tests(states, share_requesting_confirmatio
         states (pandas.DataFrame): sid states DataFrame.
         share_requesting_confirmation (float): The share of people that requests a PCR
             test after a positive rapid test.
+        rng (numpy.random.Generator): The random number generator.
 
     Returns:
         pd.Series: Boolean Series that is True for people who demand a test.
 
     """
-    received_rapid_test = states["cd_received_rapid_test"] == 0
-    pos_rapid_test = states["is_tested_positive_by_rapid_test"]
-    pool = states[received_rapid_test & pos_rapid_test].index
-    n_to_draw = int(share_requesting_confirmation * len(pool))
-    sampled = np.random.choice(
-        a=pool,
-        size=n_to_draw,
-        replace=False,
+    received_positive_rapid_test = get_period_mask(
+        states,
+        "(cd_received_rapid_test == 0) & is_tested_positive_by_rapid_test",
+        stage="after_rapid_tests",
     )
+    pool = np.flatnonzero(received_positive_rapid_test)
+    n_to_draw = int(share_requesting_confirmation * len(pool))
+    sampled = _sample_positions(pool, n_to_draw, rng)
 
-    demands_test = pd.Series(False, index=states.index)
+    demands_test = np.zeros(len(states), dtype=bool)
     demands_test[sampled] = True
-    demands_positive_test = states["currently_infected"] & demands_test
-    return demands_positive_test
+    demands_positive_test = states["currently_infected"].to_numpy() & demands_test
+    return pd.Series(demands_positive_test, index=states.index)
+
+
+def _sample_positions(pool, size, rng):
+    """Sample positions from a pool without replacement.
+
+    Only integers up to the size of the pool are sampled, so that the generator does
+    not need to permute the whole pool when few positions are drawn.
+
+    Args:
+        pool (numpy.ndarray): The positions of the candidates.
+        size (int): The number of positions to draw.
+        rng (numpy.random.Generator): The random number generator.
+
+    Returns:
+        numpy.ndarray: The sampled positions.
+
+    """
+    return pool[rng.choice(len(pool), size=size, replace=False)]
 
 
 def allocate_tests(n_allocated_tests, demands_test, states, params, seed):  # noqa: U100
@@ -0,0 +1,288 @@
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from numpy.testing import assert_array_almost_equal
+
+from src.manfred.minimize_manfred import minimize_manfred
+from src.manfred.shared import do_evaluations
+from src.manfred.shared import finish_pending_evaluations
+from src.manfred.shared import load_evaluation
+from src.manfred.shared import save_evaluation
+from src.manfred.shared import submit_evaluations
+
+
+def _sequential_batch_evaluator(func, arguments, unpack_symbol):  # noqa: U100
+    return [func(**kwargs) for kwargs in arguments]
+
+
+def test_load_and_save_evaluation(tmp_path):
+    assert load_evaluation(tmp_path, ("abc", 0)) is None
+    save_evaluation(tmp_path, ("abc", 0), {"value": 1.5})
+    assert load_evaluation(tmp_path, ("abc", 0)) == {"value": 1.5}
+    assert load_evaluation(tmp_path, ("abc", 1)) is None
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+def test_do_evaluations_reuses_stored_evaluations(tmp_path):
+    calls = []
+
+    def func(x, seed):
+        calls.append(seed)
+        return {"value": x.sum() + seed}
+
+    def _evaluate():
+        state = {
+            "cache": {},
+            "seed": itertools.count(0),
+            "func_counter": 0,
+            "evaluation_store": tmp_path,
+        }
+        x_sample = [np.array([0.1, 0.2]), np.array([0.3, 0.4])]
+        return do_evaluations(
+            func,
+            x_sample,
+            state,
+            n_evaluations_per_x=2,
+            return_type="aggregated",
+            batch_evaluator=_sequential_batch_evaluator,
+            batch_evaluator_options={},
+        )
+
+    first, first_state = _evaluate()
+    assert calls == [0, 1, 2, 3]
+
+    # a restarted optimization draws the same seeds and loads all evaluations.
+    second, second_state = _evaluate()
+    assert calls == [0, 1, 2, 3]
+    np.testing.assert_array_almost_equal(first, second)
+    assert first_state["func_counter"] == second_state["func_counter"] == 4
+
+
+def test_criteria_which_share_an_evaluation_store(tmp_path):
+    def _evaluate(func, evaluation_store_key):
+        state = {
+            "cache": {},
+            "seed": itertools.count(0),
+            "func_counter": 0,
+            "evaluation_store": tmp_path,
+            "evaluation_store_key": evaluation_store_key,
+        }
+        evaluations, _ = do_evaluations(
+            func,
+            [np.array([0.1, 0.2])],
+            state,
+            n_evaluations_per_x=1,
+            return_type="aggregated",
+            batch_evaluator=_sequential_batch_evaluator,
+            batch_evaluator_options={},
+        )
+        return evaluations
+
+    def first_func(x, seed):  # noqa: U100
+        return {"value": x.sum()}
+
+    def second_func(x, seed):  # noqa: U100
+        return {"value": -x.sum()}
+
+    np.testing.assert_array_almost_equal(_evaluate(first_func, "first"), [0.3])
+    np.testing.assert_array_almost_equal(_evaluate(second_func, "second"), [-0.3])
+    # both evaluations are stored and reused.
+    np.testing.assert_array_almost_equal(_evaluate(second_func, "first"), [0.3])
+    assert len(list(tmp_path.glob("*.pkl"))) == 2
+
+
+def test_do_evaluations_with_common_random_numbers():
+    calls = []
+
+    def func(x, seed):
+        calls.append((x[0], seed))
+        return {"value": x[0] + seed}
+
+    state = {
+        "cache": {},
+        "seed": itertools.count(0),
+        "func_counter": 0,
+        "common_seed": 3,
+    }
+    x_sample = [np.array([0.1]), np.array([0.2]), np.array([0.1])]
+    do_evaluations(
+        func,
+        x_sample,
+        state,
+        n_evaluations_per_x=2,
+        return_type="aggregated",
+        batch_evaluator=_sequential_batch_evaluator,
+        batch_evaluator_options={},
+    )
+    assert calls == [(0.1, 3), (0.1, 100_003), (0.2, 3), (0.2, 100_003)]
+
+    # later evaluations continue the common seeds of every x.
+    do_evaluations(
+        func,
+        [np.array([0.2])],
+        state,
+        n_evaluations_per_x=3,
+        return_type="aggregated",
+        batch_evaluator=_sequential_batch_evaluator,
+        batch_evaluator_options={},
+    )
+    assert calls[-1] == (0.2, 200_003)
+    assert state["func_counter"] == 5
+
+
+def test_do_evaluations_accepts_early_improvements():
+    release = threading.Event()
+
+    def func(x, seed):  # noqa: U100
+        if x[0] == 0.3:
+            release.wait(timeout=10)
+        return {"value": x[0]}
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        state = {
+            "cache": {},
+            "seed": itertools.count(0),
+            "func_counter": 0,
+            "executor": executor,
+            "acceptance_share": 0.5,
+            "pending": {},
+        }
+        evaluations, state = do_evaluations(
+            func,
+            [np.array([0.2])],
+            state,
+            n_evaluations_per_x=1,
+            return_type="aggregated",
+            batch_evaluator=None,
+            batch_evaluator_options={},
+        )
+        assert evaluations == [0.2]
+
+        x_sample = [np.array([0.2]), np.array([0.1]), np.array([0.3])]
+        evaluations, state = do_evaluations(
+            func,
+            x_sample,
+            state,
+            n_evaluations_per_x=1,
+            return_type="aggregated",
+            batch_evaluator=None,
+            batch_evaluator_options={},
+        )
+        # the slow evaluation is still running but 0.1 is already an improvement.
+        assert evaluations == [0.2, 0.1, np.inf]
+        assert len(state["pending"]) == 1
+
+        release.set()
+        evaluations, state = do_evaluations(
+            func,
+            x_sample,
+            state,
+            n_evaluations_per_x=1,
+            return_type="aggregated",
+            batch_evaluator=None,
+            batch_evaluator_options={},
+        )
+        assert evaluations == [0.2, 0.1, 0.3]
+        assert state["func_counter"] == 3
+
+
+def _get_executor_state(executor, **kwargs):
+    return {
+        "cache": {},
+        "seed": itertools.count(0),
+        "func_counter": 0,
+        "executor": executor,
+        "acceptance_share": 0.5,
+        "pending": {},
+        **kwargs,
+    }
+
+
+def test_do_evaluations_accepts_early_without_previous_evaluations():
+    release = threading.Event()
+
+    def func(x, seed):  # noqa: U100
+        if x[0] == 0.3:
+            release.wait(timeout=10)
+        return {"value": x[0]}
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        state = _get_executor_state(executor)
+        evaluations, state = do_evaluations(
+            func,
+            [np.array([0.1]), np.array([0.3])],
+            state,
+            n_evaluations_per_x=1,
+            return_type="aggregated",
+            batch_evaluator=None,
+            batch_evaluator_options={},
+        )
+        release.set()
+    assert evaluations == [0.1, np.inf]
+
+
+def test_do_evaluations_without_aggregation_omits_unfinished_vectors():
+    release = threading.Event()
+
+    def func(x, seed):
+        if x[0] == 0.3 and seed == 100_000:
+            release.wait(timeout=10)
+        return {"value": x[0]}
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        state = _get_executor_state(executor, common_seed=0)
+        evaluations, state = do_evaluations(
+            func,
+            [np.array([0.1]), np.array([0.3])],
+            state,
+            n_evaluations_per_x=2,
+            return_type="raw",
+            batch_evaluator=None,
+            batch_evaluator_options={},
+        )
+        release.set()
+    # one of the two evaluations of 0.3 is finished but 0.3 is unfinished.
+    assert evaluations == [[{"value": 0.1}, {"value": 0.1}], []]
+
+
+def test_finish_pending_evaluations(tmp_path):
+    started = threading.Event()
+
+    def func(x, seed):  # noqa: U100
+        started.set()
+        time.sleep(0.2)
+        return {"value": x[0]}
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        state = _get_executor_state(executor, evaluation_store=tmp_path)
+        x_sample = [np.array([0.1]), np.array([0.2])]
+        state = submit_evaluations(func, x_sample, state, n_evaluations_per_x=1)
+        started.wait(timeout=10)
+        state = finish_pending_evaluations(state)
+
+    # the running evaluation is awaited and stored, the queued one is cancelled.
+    assert state["pending"] == {}
+    assert state["func_counter"] == 1
+    assert [entry["evals"] for entry in state["cache"].values()] == [[{"value": 0.1}]]
+    assert len(list(tmp_path.glob("*.pkl"))) == 1
+
+
+def test_minimize_manfred_with_executor():
+    def func(x, seed):  # noqa: U100
+        residuals = x - np.array([0.3, 0.6])
+        return {"root_contributions": residuals, "value": residuals @ residuals}
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        res = minimize_manfred(
+            func=func,
+            x=np.array([0.5, 0.5]),
+            step_sizes=[0.1, 0.05],
+            lower_bounds=np.zeros(2),
+            upper_bounds=np.ones(2),
+            xtol=0.001,
+            executor=executor,
+        )
+    assert_array_almost_equal(res["solution_x"], [0.3, 0.6], decimal=1)
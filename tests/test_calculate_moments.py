@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.calculate_moments import calculate_period_outcome_sim
+from src.calculate_moments import calculate_period_outcomes_sim
+from src.calculate_moments import compress_period_outputs
+from src.calculate_moments import period_output_to_pandas
+from src.shared import add_integer_codes
+
+
+@pytest.fixture
+def states():
+    rng = np.random.default_rng(0)
+    states = pd.DataFrame(
+        {
+            "date": pd.Timestamp("2021-03-01"),
+            "newly_infected": rng.random(100) < 0.3,
+            "new_known_case": rng.random(100) < 0.1,
+            "state": rng.choice(["Berlin", "Hessen", "Saarland"], size=100),
+            "age_group_rki": rng.choice(["0-4", "5-14", "15-34"], size=100),
+        }
+    )
+    return states
+
+
+@pytest.mark.parametrize("groupby", [None, "state", "age_group_rki"])
+@pytest.mark.parametrize("with_codes", [True, False])
+def test_calculate_period_outcomes_sim(states, groupby, with_codes):
+    if with_codes:
+        states = add_integer_codes(states)
+
+    outcomes = ["newly_infected", "new_known_case"]
+    res = calculate_period_outcomes_sim(states, dict(zip(outcomes, outcomes)), groupby)
+
+    for outcome in outcomes:
+        expected = calculate_period_outcome_sim(states, outcome, groupby)
+        pd.testing.assert_series_equal(res[outcome].fillna(0), expected)
+
+
+def test_calculate_period_outcomes_sim_with_arrays_and_empty_groups(states):
+    states = add_integer_codes(states)
+    is_old = np.zeros(len(states), dtype=bool)
+    res = calculate_period_outcomes_sim(states, {"is_old": is_old}, "age_group_rki")
+    assert res["is_old"].name == "is_old"
+    assert res["is_old"].loc[:, "80-100"].isnull().all()
+    assert (res["is_old"].loc[:, "0-4"] == 0).all()
+
+
+def test_compress_period_outputs_round_trip(states):
+    states = add_integer_codes(states)
+    period_outputs = {"by_state": [], "overall": [], "r_effective": [], "other": []}
+    for date in pd.date_range("2021-03-01", periods=4):
+        states["date"] = date
+        outcomes = {"newly_infected": "newly_infected"}
+        by_state = calculate_period_outcomes_sim(states, outcomes, "state")
+        overall = calculate_period_outcomes_sim(states, outcomes)
+        period_outputs["by_state"].append(by_state["newly_infected"])
+        period_outputs["overall"].append(overall["newly_infected"].fillna(0))
+        period_outputs["r_effective"].append(pd.Series([1.5], index=[date]))
+        period_outputs["other"].append(pd.DataFrame({"a": [1]}, index=[date]))
+
+    compressed = compress_period_outputs(period_outputs)
+
+    assert isinstance(compressed["by_state"]["values"], np.ndarray)
+    assert compressed["by_state"]["values"].shape == (4, 3)
+    assert isinstance(compressed["other"], list)
+    for name, outputs in period_outputs.items():
+        res = period_output_to_pandas(compressed[name])
+        expected = pd.concat(outputs)
+        if name == "other":
+            pd.testing.assert_frame_equal(res, expected)
+        else:
+            pd.testing.assert_series_equal(res, expected)
+
+
+def test_compress_period_outputs_with_groups_missing_on_some_days():
+    outputs = []
+    for i, date in enumerate(pd.date_range("2021-03-01", periods=3)):
+        groups = ["Berlin", "Hessen"] if i == 1 else ["Berlin", "Hessen", "Saarland"]
+        index = pd.MultiIndex.from_product([[date], groups], names=["date", "state"])
+        outputs.append(pd.Series(np.arange(len(groups)) + i, index=index, name="a"))
+
+    compressed = compress_period_outputs({"by_state": outputs})
+    res = period_output_to_pandas(compressed["by_state"])
+    pd.testing.assert_series_equal(res, pd.concat(outputs))
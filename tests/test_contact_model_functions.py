@@ -1,5 +1,7 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import numba as nb
 import numpy as np
 import pandas as pd
 import pytest
@@ -7,17 +9,23 @@ from pandas.testing import assert_series_equal
 
 from src.contact_models.contact_model_functions import _draw_nr_of_contacts
 from src.contact_models.contact_model_functions import _draw_potential_vacation_contacts
+from src.contact_models.contact_model_functions import _get_multipliers
 from src.contact_models.contact_model_functions import (
     _identify_ppl_affected_by_vacation,
 )
+from src.contact_models.contact_model_functions import _reduce_contacts_with_context
 from src.contact_models.contact_model_functions import (
     calculate_non_recurrent_contacts_from_empirical_distribution,
 )
+from src.contact_models.contact_model_functions import get_contact_model_context
+from src.contact_models.contact_model_functions import get_states_w_vacations
 from src.contact_models.contact_model_functions import go_to_daily_work_meeting
 from src.contact_models.contact_model_functions import go_to_weekly_meeting
 from src.contact_models.contact_model_functions import meet_daily_other_contacts
 from src.contact_models.contact_model_functions import reduce_contacts_on_condition
+from src.contact_models.contact_model_functions import reduce_contacts_on_conditions
 from src.shared import draw_groups
+from src.shared import from_timestamps_to_epochs
 
 
 @pytest.fixture
@@ -446,6 +454,10 @@ def test_draw_nr_of_contacts_differ_btw_ages(states):
 
 
 def test_draw_nr_of_contacts_differ_btw_ages_random(states):
+    # with 20 copies of the states, there are 12,600 young individuals. The standard
+    # deviation of the mean of the young is about 0.0045 and the tolerance of 0.025 is
+    # more than five standard deviations.
+    states = pd.concat([states] * 20, ignore_index=True)
     np.random.seed(24)
     dist = pd.DataFrame(
         data=[
@@ -470,6 +482,37 @@ def test_draw_nr_of_contacts_differ_btw_ages_random(states):
     assert old.mean() == pytest.approx(6.5, 0.05)
 
 
+def test_draw_nr_of_contacts_is_reproducible_across_threads(states, monkeypatch):
+    monkeypatch.setattr("src.contact_models.contact_model_functions.CHUNK_SIZE", 100)
+    dist = pd.DataFrame(
+        data=[
+            [0, 0.3, "10-19"],
+            [1, 0.7, "10-19"],
+            [6, 0.5, "40-49"],
+            [7, 0.5, "40-49"],
+        ],
+        columns=["name", "value", "subcategory"],
+    ).set_index(["subcategory", "name"])["value"]
+    pop = pd.Series(data=True, index=states.index)
+
+    n_threads = nb.get_num_threads()
+    try:
+        nb.set_num_threads(1)
+        single_thread = _draw_nr_of_contacts(dist, pop, states, seed=3)
+    finally:
+        nb.set_num_threads(n_threads)
+    multi_thread = _draw_nr_of_contacts(dist, pop, states, seed=3)
+
+    assert_series_equal(single_thread, multi_thread)
+    assert not single_thread.equals(_draw_nr_of_contacts(dist, pop, states, seed=4))
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        in_worker_thread = executor.submit(
+            _draw_nr_of_contacts, dist, pop, states, seed=3
+        ).result()
+    assert_series_equal(in_worker_thread, multi_thread)
+
+
 # ------------------------------------------------------------------------------------
 
 
@@ -505,6 +548,92 @@ def test_reduce_recurrent_contacts_on_condition(states):
     assert_series_equal(res, expected, check_dtype=False)
 
 
+def test_get_contact_model_context_is_shared_within_period(a_thursday):
+    context_cache = {}
+    first = get_contact_model_context(a_thursday, context_cache)
+    second = get_contact_model_context(a_thursday, context_cache)
+    assert first is second
+    assert first["day"] == "Thursday"
+    assert not first["is_weekend"]
+
+    a_saturday = a_thursday.copy()
+    a_saturday["date"] = pd.Timestamp("2020-04-04")
+    third = get_contact_model_context(a_saturday, context_cache)
+    assert third is not first
+    assert third["is_weekend"]
+
+
+def test_get_contact_model_context_is_not_shared_between_simulations(a_thursday):
+    context_cache = {}
+    first = get_contact_model_context(a_thursday, context_cache)
+    # another simulation starts on the same date with other states.
+    other_simulation = a_thursday.copy()
+    other_simulation["symptomatic"] = ~other_simulation["symptomatic"]
+    second = get_contact_model_context(other_simulation, context_cache)
+    assert second is not first
+    assert (second["conditions"][:, 0] == other_simulation["symptomatic"]).all()
+
+
+def test_reduce_contacts_with_context_equals_reduce_contacts_on_condition(states):
+    states["symptomatic"] = [True, False] * int(len(states) / 2)
+    states["knows_currently_infected"] = [True, True, False] * int(len(states) / 3)
+    states["quarantine_compliance"] = np.linspace(0, 1, len(states))
+    nr_of_contacts = pd.Series(data=3, index=states.index)
+    multipliers = {"symptomatic_multiplier": 0.3, "positive_test_multiplier": 0.6}
+
+    expected = nr_of_contacts
+    for params_entry, condition in [
+        ("symptomatic_multiplier", "symptomatic"),
+        ("positive_test_multiplier", "knows_currently_infected"),
+    ]:
+        expected = reduce_contacts_on_condition(
+            contacts=expected,
+            states=states,
+            multiplier=multipliers[params_entry],
+            condition=condition,
+            is_recurrent=False,
+        )
+
+    context = get_contact_model_context(states)
+    res = _reduce_contacts_with_context(
+        nr_of_contacts, context, multipliers, is_recurrent=False
+    )
+    assert_series_equal(res, expected, check_dtype=False)
+    assert len(context["stays_home"]) == 1
+
+
+def test_reduce_contacts_on_conditions_equals_reduction_per_model(states, params):
+    states["symptomatic"] = [True, False] * int(len(states) / 2)
+    states["knows_currently_infected"] = [True, True, False] * int(len(states) / 3)
+    states["quarantine_compliance"] = np.linspace(0, 1, len(states))
+    params["value"] = [0.3, 0.6, 0.8, 0.1]
+    contacts = pd.DataFrame(
+        {"work_non_recurrent": 3, "other_non_recurrent": True}, index=states.index
+    )
+
+    multipliers = pd.DataFrame(
+        [_get_multipliers(params, col) for col in contacts.columns],
+        index=contacts.columns,
+    )
+    context = get_contact_model_context(states)
+    res = reduce_contacts_on_conditions(
+        contacts=contacts,
+        conditions=context["conditions"],
+        quarantine_compliance=context["quarantine_compliance"],
+        multipliers=multipliers,
+    )
+
+    for col, is_recurrent in [
+        ("work_non_recurrent", False),
+        ("other_non_recurrent", True),
+    ]:
+        expected = _reduce_contacts_with_context(
+            contacts[col], context, multipliers.loc[col].to_dict(), is_recurrent
+        )
+        assert_series_equal(res[col], expected, check_names=False)
+    assert res.dtypes.equals(contacts.dtypes)
+
+
 # ------------------------------------------------------------------------------------
 
 
@@ -578,3 +707,44 @@ def test_draw_potential_vacation_contacts_not_random():
     res = _draw_potential_vacation_contacts(states, params, state_to_vacation, seed)
     expected = pd.Series([1, 1, 0, 0, 0])
     assert_series_equal(res, expected, check_names=False, check_dtype=False)
+
+
+@pytest.fixture
+def vacation_params():
+    vacations = [
+        ("Osterferien", "A", "2021-03-29", "2021-04-09"),
+        ("Osterferien", "B", "2021-04-01", "2021-04-16"),
+        ("Pfingstferien", "B", "2021-05-25", "2021-05-25"),
+        ("Sommerferien", "C", "2021-06-21", "2021-07-30"),
+    ]
+    params = pd.DataFrame(
+        [
+            (name, state, limit, date)
+            for name, state, start, end in vacations
+            for limit, date in [("start", start), ("end", end)]
+        ],
+        columns=["category", "subcategory", "name", "value"],
+    ).set_index(["category", "subcategory", "name"])
+    params["value"] = from_timestamps_to_epochs(pd.to_datetime(params["value"]))
+    return params
+
+
+@pytest.mark.parametrize(
+    "date, expected",
+    [
+        ("2021-03-01", {}),
+        ("2021-03-29", {"A": "Osterferien"}),
+        ("2021-04-05", {"A": "Osterferien", "B": "Osterferien"}),
+        ("2021-04-16", {"B": "Osterferien"}),
+        ("2021-05-25", {"B": "Pfingstferien"}),
+        ("2021-07-30", {"C": "Sommerferien"}),
+    ],
+)
+def test_get_states_w_vacations(vacation_params, date, expected):
+    res = get_states_w_vacations(pd.Timestamp(date), vacation_params)
+    assert res == expected
+
+
+def test_get_states_w_vacations_fails_after_last_vacation(vacation_params):
+    with pytest.raises(AssertionError, match="Vacations are only known until"):
+        get_states_w_vacations(pd.Timestamp("2021-07-31"), vacation_params)
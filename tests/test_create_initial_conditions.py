@@ -1,14 +1,23 @@
+import os
+
 import numpy as np
 import pandas as pd
 import pandas.testing as pdt
 import pytest
 
+from src.create_initial_states.create_initial_conditions import (
+    _get_initial_conditions_key,
+)
+from src.create_initial_states.create_initial_conditions import _prune_cache
 from src.create_initial_states.create_initial_conditions import (
     _scale_up_empirical_new_infections,
 )
 from src.create_initial_states.create_initial_conditions import (
     create_group_specific_share_known_cases,
 )
+from src.create_initial_states.create_initial_conditions import (
+    create_initial_conditions,
+)
 from src.create_initial_states.create_initial_infections import (
     _add_variant_info_to_infections,
 )
@@ -271,3 +280,82 @@ def test_scale_up_empirical_new_infections_raise_error(
             group_weights=group_weights,
             overall_share_known_cases=overall_share_known_cases,
         )
+
+
+@pytest.fixture
+def initial_conditions_kwargs(empirical_infections, synthetic_data):
+    dates = pd.date_range("2020-09-25", "2020-10-05", name="date")
+    return {
+        "start": "2020-09-28",
+        "end": "2020-09-29",
+        "seed": 3930,
+        "virus_shares": {"base_strain": pd.Series(1.0, index=dates)},
+        "reporting_delay": 2,
+        "synthetic_data": synthetic_data,
+        "empirical_infections": empirical_infections,
+        "population_size": 100,
+        "overall_share_known_cases": pd.Series(0.5, index=dates),
+        "group_share_known_cases": None,
+        "group_weights": pd.Series(
+            [0.5, 0.5], index=pd.Index(["young", "old"], name="age_group_rki")
+        ),
+    }
+
+
+def test_get_initial_conditions_key(initial_conditions_kwargs):
+    key = _get_initial_conditions_key(**initial_conditions_kwargs)
+    same_inputs = {
+        **initial_conditions_kwargs,
+        "start": pd.Timestamp("2020-09-28"),
+        "synthetic_data": initial_conditions_kwargs["synthetic_data"].copy(),
+    }
+    assert key == _get_initial_conditions_key(**same_inputs)
+
+    other_seed = {**initial_conditions_kwargs, "seed": 3931}
+    assert key != _get_initial_conditions_key(**other_seed)
+
+    synthetic_data = initial_conditions_kwargs["synthetic_data"].copy()
+    synthetic_data.loc[0, "county"] = "B"
+    other_data = {**initial_conditions_kwargs, "synthetic_data": synthetic_data}
+    assert key != _get_initial_conditions_key(**other_data)
+
+
+def test_create_initial_conditions_loads_cached_results(
+    initial_conditions_kwargs, tmp_path
+):
+    key = _get_initial_conditions_key(**initial_conditions_kwargs)
+    expected = {
+        "initial_infections": pd.DataFrame({"2020-09-28": [True, False]}),
+        "initial_immunity": pd.Series([True, True]),
+    }
+    pd.to_pickle(expected, tmp_path / f"{key}.pkl")
+
+    res = create_initial_conditions(**initial_conditions_kwargs, cache_dir=tmp_path)
+    pdt.assert_frame_equal(res["initial_infections"], expected["initial_infections"])
+    pdt.assert_series_equal(res["initial_immunity"], expected["initial_immunity"])
+
+
+def test_cache_hit_marks_entry_as_recently_used(initial_conditions_kwargs, tmp_path):
+    key = _get_initial_conditions_key(**initial_conditions_kwargs)
+    path = tmp_path / f"{key}.pkl"
+    pd.to_pickle({"initial_immunity": pd.Series([True])}, path)
+    os.utime(path, ns=(0, 0))
+
+    create_initial_conditions(**initial_conditions_kwargs, cache_dir=tmp_path)
+    assert path.stat().st_mtime_ns > 0
+
+
+def test_prune_cache_keeps_most_recently_used_entries(tmp_path):
+    for i in range(4):
+        path = tmp_path / f"{i}.pkl"
+        path.touch()
+        os.utime(path, ns=(i, i))
+    (tmp_path / "other.txt").touch()
+
+    _prune_cache(tmp_path, 2)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "2.pkl",
+        "3.pkl",
+        "other.txt",
+    ]
@@ -1,4 +1,5 @@
 import pandas as pd
+import pytest
 from pandas.testing import assert_series_equal
 
 from src.config import POPULATION_GERMANY
@@ -6,6 +7,12 @@ from src.testing.create_rapid_test_statistics import (
     _calculate_rapid_test_statistics_by_channel,
 )
 from src.testing.create_rapid_test_statistics import create_rapid_test_statistics
+from src.testing.create_rapid_test_statistics import flush_rapid_test_statistics
+from src.testing.create_rapid_test_statistics import (
+    get_rapid_test_statistics_columns,
+)
+from src.testing.create_rapid_test_statistics import load_rapid_test_statistics
+from src.testing.create_rapid_test_statistics import save_rapid_test_statistics
 
 
 def test_create_rapid_test_statistics(monkeypatch):
@@ -37,6 +44,7 @@ def test_create_rapid_test_statistics(monkeypatch):
         states=states,
         date=date,
         params=None,
+        mode="sampled",
     )
 
     # groups:
@@ -184,3 +192,76 @@ def test_calculate_rapid_test_statistics_by_channel():
         }
     )
     assert_series_equal(res.loc[expected.index], expected, check_names=False)
+
+
+def test_save_rapid_test_statistics_in_batches(tmp_path):
+    path = tmp_path / "rapid_test_statistics.parquet"
+    dates = pd.date_range("2021-04-01", periods=5)
+    for i, date in enumerate(dates):
+        statistics = pd.Series(
+            {"date": date, "number_tested_by_a": 10 * i, "popshare_tested_by_a": i / 10}
+        ).to_frame()
+        save_rapid_test_statistics(statistics, path, flush_every=2)
+        assert path.exists() == (i >= 1)
+
+    assert len(load_rapid_test_statistics(path)) == 4
+    flush_rapid_test_statistics(path)
+
+    res = load_rapid_test_statistics(path, columns=["number_tested_by_a"])
+    expected = pd.Series(
+        [0.0, 10.0, 20.0, 30.0, 40.0],
+        index=pd.Index(dates, name="date"),
+        name="number_tested_by_a",
+    )
+    assert_series_equal(res["number_tested_by_a"], expected, check_freq=False)
+    assert list(res.columns) == ["number_tested_by_a"]
+    assert get_rapid_test_statistics_columns(path) == [
+        "number_tested_by_a",
+        "popshare_tested_by_a",
+    ]
+
+
+def test_create_rapid_test_statistics_expected_mode():
+    params = pd.DataFrame(
+        {
+            "category": "rapid_test",
+            "subcategory": ["sensitivity"] * 4 + ["specificity"],
+            "name": [
+                "pre-infectious",
+                "start_infectious",
+                "while_infectious",
+                "after_infectious",
+                "specificity",
+            ],
+            "value": [0.3, 0.8, 0.9, 0.5, 0.98],
+        }
+    ).set_index(["category", "subcategory", "name"])
+    # 0: pre-infectious, 1: infectious, 2: not infected, 3: after infectious
+    states = pd.DataFrame(
+        {
+            "cd_infectious_true": [5, -3, -20, -5],
+            "infectious": [False, True, False, False],
+            "currently_infected": [False, True, False, True],
+        }
+    )
+    demand_by_channel = pd.DataFrame(
+        {"a": [True, True, False, False], "b": [False, True, True, True]}
+    )
+
+    res = create_rapid_test_statistics(
+        demand_by_channel=demand_by_channel,
+        states=states,
+        date=pd.Timestamp("2021-04-26"),
+        params=params,
+        mode="expected",
+    )[0]
+
+    assert res["popshare_tested_by_a"] == 2 / 4
+    assert res["testshare_tested_positive_by_a"] == pytest.approx(1.2 / 2)
+    assert res["testshare_true_positive_by_a"] == pytest.approx(0.9 / 2)
+    assert res["testshare_false_positive_by_a"] == pytest.approx(0.3 / 2)
+    assert res["testshare_true_negative_by_a"] == pytest.approx(0.7 / 2)
+    assert res["testshare_false_negative_by_a"] == pytest.approx(0.1 / 2)
+    assert res["popshare_tested_positive_by_b"] == pytest.approx(1.42 / 4)
+    assert res["popshare_false_negative_by_overall"] == pytest.approx(0.6 / 4)
+    assert res["number_tested_by_overall"] == POPULATION_GERMANY
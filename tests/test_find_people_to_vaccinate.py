@@ -1,8 +1,10 @@
 import warnings
 
+import numpy as np
 import pandas as pd
 import pytest
 
+from src.policies.find_people_to_vaccinate import _get_positions_sorted_by_rank
 from src.policies.find_people_to_vaccinate import find_people_to_vaccinate
 
 
@@ -119,3 +121,66 @@ def test_find_people_to_vaccinate_start_date(params):
         )
 
     pd.testing.assert_series_equal(expected, res, check_names=False)
+
+
+def test_find_people_to_vaccinate_matches_comparison_of_ranks(params):
+    rng = np.random.default_rng(0)
+    states = pd.DataFrame({"vaccination_rank": rng.random(10_000)})
+    dates = pd.date_range("2021-02-01", "2021-02-10")
+    vaccination_shares = pd.Series(rng.uniform(0, 0.04, size=len(dates)), dates)
+    params["value"] = 0.2
+
+    cutoffs = vaccination_shares.cumsum().clip(upper=0.8)
+    cutoffs[:"2021-02-02"] = 0
+    for date in dates[1:]:
+        states["date"] = date
+        res = find_people_to_vaccinate(
+            receives_vaccine=None,
+            states=states,
+            params=params,
+            seed=33,
+            vaccination_shares=vaccination_shares,
+            init_start=pd.Timestamp("2021-02-03"),
+        )
+        ranks = states["vaccination_rank"]
+        expected = (cutoffs[date - pd.Timedelta(days=1)] <= ranks) & (
+            ranks < cutoffs[date]
+        )
+        pd.testing.assert_series_equal(res, expected, check_names=False)
+
+
+def test_find_people_to_vaccinate_warns_once(params):
+    states = pd.DataFrame({"vaccination_rank": [0.1, 0.5]})
+    states["date"] = pd.Timestamp("2020-12-02")
+    vaccination_shares = pd.Series(
+        [0.2, 0.2], index=pd.date_range("2020-12-01", "2020-12-02")
+    )
+    with pytest.warns(UserWarning, match="The vaccination shares imply") as record:
+        for _ in range(2):
+            find_people_to_vaccinate(
+                receives_vaccine=None,
+                states=states,
+                params=params,
+                seed=33,
+                vaccination_shares=vaccination_shares,
+                init_start=pd.Timestamp("2020-12-01"),
+            )
+    assert len(record) == 1
+
+
+def test_get_positions_sorted_by_rank_is_cached_by_rank_array():
+    ranks = np.random.default_rng(0).permutation(4_000) / 4_000
+    first = pd.DataFrame({"vaccination_rank": ranks})
+    positions, _ = _get_positions_sorted_by_rank(first)
+    np.testing.assert_array_equal(positions, np.argsort(ranks))
+
+    changed_ranks = ranks.copy()
+    changed_ranks[[1, 2]] = changed_ranks[[2, 1]]
+    second = pd.DataFrame({"vaccination_rank": changed_ranks})
+    second_positions, sorted_ranks = _get_positions_sorted_by_rank(second)
+    np.testing.assert_array_equal(second_positions, np.argsort(changed_ranks))
+    np.testing.assert_array_equal(sorted_ranks, np.sort(changed_ranks))
+
+    # alternating rank arrays are both cached.
+    assert _get_positions_sorted_by_rank(first)[0] is positions
+    assert _get_positions_sorted_by_rank(second)[0] is second_positions
@@ -0,0 +1,109 @@
+import itertools
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+from sid.contacts import calculate_contacts
+
+from src.contact_models.get_contact_models import _EXECUTORS
+from src.contact_models.get_contact_models import _get_executor
+from src.contact_models.get_contact_models import _shutdown_executors
+from src.contact_models.get_contact_models import evaluate_contact_models_concurrently
+
+
+def _draw_contacts(states, params, seed, name):
+    rng = np.random.default_rng(seed)
+    value = params.loc[(name, name), "value"]
+    return pd.Series(value * rng.random(len(states)), index=states.index)
+
+
+def _count_threads(states, params, seed, thread_names):  # noqa: U100
+    thread_names.add(threading.current_thread().name)
+    return pd.Series(True, index=states.index)
+
+
+@pytest.fixture
+def params():
+    params = pd.DataFrame(
+        {"category": ["a", "b"], "subcategory": ["a", "b"], "name": ["a", "b"]}
+    ).set_index(["category", "subcategory", "name"])
+    params["value"] = [1.0, 10.0]
+    return params
+
+
+@pytest.fixture
+def states():
+    return pd.DataFrame({"date": pd.Timestamp("2021-04-01")}, index=range(10))
+
+
+def _get_contact_models():
+    contact_models = {}
+    for name in ["a", "b"]:
+        contact_models[name] = {
+            "is_recurrent": False,
+            "model": lambda states, params, seed, name=name: _draw_contacts(
+                states, params, seed, name
+            ),
+            "loc": name,
+        }
+    return contact_models
+
+
+def test_evaluate_contact_models_concurrently_is_reproducible(states, params):
+    contact_models = evaluate_contact_models_concurrently(_get_contact_models(), 2)
+    # sid passes all params and the wrapper applies the "loc" of each model.
+    assert all(model["loc"] == slice(None) for model in contact_models.values())
+
+    first = calculate_contacts(contact_models, states, params, itertools.count(3))
+    second = calculate_contacts(contact_models, states, params, itertools.count(3))
+    pd.testing.assert_frame_equal(first, second)
+
+    # the params slices are applied before the models are evaluated.
+    assert (first["a"] < 1).all()
+    assert (first["b"] > 1).any()
+
+    next_day = states.assign(date=pd.Timestamp("2021-04-02"))
+    third = calculate_contacts(contact_models, next_day, params, itertools.count(4))
+    assert not first.equals(third)
+
+
+def test_evaluate_contact_models_concurrently_uses_thread_pool(states, params):
+    thread_names = set()
+    contact_models = {
+        name: {
+            "is_recurrent": True,
+            "model": lambda states, params, seed: _count_threads(
+                states, params, seed, thread_names
+            ),
+        }
+        for name in ["a", "b", "c"]
+    }
+    contact_models = evaluate_contact_models_concurrently(contact_models, 2)
+    calculate_contacts(contact_models, states, params, itertools.count(0))
+    assert threading.main_thread().name not in thread_names
+
+
+def test_evaluate_contact_models_concurrently_starts_new_simulations(states, params):
+    contact_models = evaluate_contact_models_concurrently(_get_contact_models(), 2)
+    first = calculate_contacts(contact_models, states, params, itertools.count(3))
+    # another simulation with the same states and date but another seed.
+    second = calculate_contacts(contact_models, states, params, itertools.count(10))
+    assert not first.equals(second)
+
+
+def test_evaluate_contact_models_concurrently_shares_thread_pool(states, params):
+    for _ in range(2):
+        contact_models = evaluate_contact_models_concurrently(_get_contact_models(), 3)
+        calculate_contacts(contact_models, states, params, itertools.count(0))
+    assert _get_executor(3) is _get_executor(3)
+    assert sum(key[1] == 3 for key in _EXECUTORS) == 1
+
+
+def test_shutdown_executors(states, params):
+    contact_models = evaluate_contact_models_concurrently(_get_contact_models(), 5)
+    calculate_contacts(contact_models, states, params, itertools.count(0))
+    executor = _get_executor(5)
+    _shutdown_executors()
+    assert executor._shutdown
+    assert _get_executor(5) is not executor
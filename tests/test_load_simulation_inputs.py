@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.calculate_moments import calculate_period_outcome_sim
+from src.shared import add_integer_codes
+from src.simulation.load_simulation_inputs import create_period_outputs
+from src.simulation.load_simulation_inputs import INCIDENCE_OUTCOMES
+
+
+@pytest.fixture
+def states():
+    rng = np.random.default_rng(0)
+    n = 200
+    states = pd.DataFrame(
+        {
+            "date": pd.Timestamp("2021-03-01"),
+            "state": rng.choice(["Berlin", "Hessen"], size=n),
+            "age_group_rki": rng.choice(["0-4", "5-14", "15-34"], size=n),
+            "cd_received_rapid_test": rng.choice([-9999, -8, -3, -1, 0], size=n),
+        }
+    )
+    for outcome in INCIDENCE_OUTCOMES:
+        states[outcome] = rng.random(n) < 0.2
+    return add_integer_codes(states)
+
+
+def test_fused_period_outputs_match_groupby(states):
+    period_outputs = create_period_outputs()
+    cd = states["cd_received_rapid_test"]
+    rapid_test_outcomes = {
+        "share_ever_rapid_test": ("ever_had_a_rapid_test", cd.between(-9998, 0)),
+        "share_rapid_test_in_last_week": (
+            "last_rapid_test_in_the_last_week",
+            cd.between(-6, 0),
+        ),
+        "share_doing_rapid_test_today": ("did_rapid_test_today", cd == -1),
+    }
+    for groupby in ["state", "age_group_rki", None]:
+        gb_str = f"_by_{groupby}" if groupby is not None else ""
+        for outcome in INCIDENCE_OUTCOMES:
+            res = period_outputs[outcome + gb_str](states)
+            expected = calculate_period_outcome_sim(states, outcome, groupby)
+            pd.testing.assert_series_equal(res, expected)
+
+        for output_name, (outcome, values) in rapid_test_outcomes.items():
+            res = period_outputs[output_name + gb_str](states)
+            groupers = [pd.Grouper(key="date", freq="D")]
+            groupers += [] if groupby is None else [groupby]
+            expected = (
+                states.assign(**{outcome: values}).groupby(groupers)[outcome].mean()
+            )
+            # empty groups stay missing except for the share doing a test today.
+            if outcome == "did_rapid_test_today":
+                expected = expected.fillna(0)
+            pd.testing.assert_series_equal(res, expected)
+
+
+def test_fused_period_outputs_are_recomputed_in_next_period(states):
+    output = create_period_outputs()["newly_infected"]
+    first = output(states)
+
+    states["date"] = pd.Timestamp("2021-03-02")
+    states["newly_infected"] = True
+    second = output(states)
+
+    assert first.iloc[0] < 1
+    assert second.iloc[0] == 1
+    assert second.index[0] == pd.Timestamp("2021-03-02")
@@ -67,3 +67,34 @@ def test_rapid_test_reactions_lln():
     assert 0.145 < share_meet_other < 0.155
     assert 0.695 < share_meet_hh < 0.705
     assert (res.loc[9980:] == contacts.loc[9980:]).all().all()
+
+
+def test_rapid_test_reactions_keeps_dtypes_and_does_not_modify_contacts():
+    states = pd.DataFrame()
+    states["quarantine_compliance"] = [0.9, 0.9, 0.1]
+    states["cd_received_rapid_test"] = [0, -10, 0]
+    states["is_tested_positive_by_rapid_test"] = True
+
+    contacts = pd.DataFrame(index=[3, 4, 5])
+    contacts["households"] = [True, True, True]
+    contacts["work"] = np.array([4, 4, 4], dtype=np.int16)
+    states.index = contacts.index
+    original = contacts.copy()
+
+    params = pd.DataFrame(
+        data=[0.95, 0.5],
+        columns=["value"],
+        index=pd.MultiIndex.from_tuples(
+            [
+                ("rapid_test_demand", "reaction", "hh_contacts_multiplier"),
+                ("rapid_test_demand", "reaction", "not_hh_contacts_multiplier"),
+            ]
+        ),
+    )
+    res = rapid_test_reactions(states, contacts, params, None)
+
+    expected = pd.DataFrame(index=[3, 4, 5])
+    expected["households"] = [True, True, True]
+    expected["work"] = np.array([0, 4, 4], dtype=np.int16)
+    pd.testing.assert_frame_equal(res, expected)
+    pd.testing.assert_frame_equal(contacts, original)
@@ -275,4 +275,7 @@ def test_random_rapid_test_demand_lln():
         share_refuser=0.15,
     )
     assert not res[states["rapid_test_compliance"] < 0.15].any()
-    assert res.mean() == pytest.approx(0.6, abs=0.001)
+    # about 85,000 compliers are tested with a probability of 0.6 / 0.85. Thus, the
+    # standard deviation of the share of tested individuals is about 0.0013 and the
+    # tolerance is almost four standard deviations.
+    assert res.mean() == pytest.approx(0.6, abs=0.005)
@@ -0,0 +1,76 @@
+from functools import partial
+
+import pytest
+
+from src.simulation.scenario_runner import get_fingerprint
+from src.simulation.scenario_runner import is_checkpointed
+from src.simulation.scenario_runner import set_rapid_test_statistics_path
+from src.simulation.scenario_runner import write_checkpoint
+
+
+@pytest.fixture
+def setup(tmp_path):
+    dependency = tmp_path / "params.csv"
+    dependency.write_text("value")
+    paths = {
+        "period_outputs": tmp_path / "period_outputs_0.parquet",
+        "last_states": None,
+        "rapid_test_statistics": None,
+        "initial_states": tmp_path / "initial_states.parquet",
+    }
+    scenario = {"sim_input_scenario": "baseline", "params_scenario": "baseline"}
+    return scenario, paths, {"params": dependency}
+
+
+def test_checkpoint_is_valid_after_writing_outputs(setup):
+    scenario, paths, depends_on = setup
+    fingerprint = get_fingerprint(scenario, 500, paths, depends_on)
+    assert not is_checkpointed(paths, fingerprint)
+
+    write_checkpoint(paths, fingerprint)
+    # the checkpoint is invalid as long as the outputs are missing.
+    assert not is_checkpointed(paths, fingerprint)
+
+    paths["period_outputs"].write_text("outputs")
+    assert is_checkpointed(paths, fingerprint)
+
+
+def test_fingerprint_changes_with_seed_scenario_and_dependencies(setup):
+    scenario, paths, depends_on = setup
+    fingerprint = get_fingerprint(scenario, 500, paths, depends_on)
+    assert fingerprint == get_fingerprint(scenario, 500, paths, depends_on)
+
+    assert fingerprint != get_fingerprint(scenario, 100_500, paths, depends_on)
+
+    other_scenario = {**scenario, "params_scenario": "other"}
+    assert fingerprint != get_fingerprint(other_scenario, 500, paths, depends_on)
+
+    depends_on["params"].write_text("changed value")
+    assert fingerprint != get_fingerprint(scenario, 500, paths, depends_on)
+
+
+def _rapid_test_demand(states, save_path, randomize):  # noqa: U100
+    return save_path
+
+
+def test_set_rapid_test_statistics_path(tmp_path):
+    simulation_kwargs = {
+        "rapid_test_models": {
+            "demand": {
+                "model": partial(_rapid_test_demand, save_path=None, randomize=True),
+                "start": "2021-01-01",
+            },
+            "other": {"model": _rapid_test_demand},
+        },
+        "contact_models": {},
+    }
+    res = set_rapid_test_statistics_path(simulation_kwargs, tmp_path / "stats.csv")
+
+    demand = res["rapid_test_models"]["demand"]
+    assert demand["model"](states=None) == tmp_path / "stats.csv"
+    assert demand["model"].keywords["randomize"]
+    assert demand["start"] == "2021-01-01"
+    assert res["rapid_test_models"]["other"]["model"] is _rapid_test_demand
+    # the shared inputs are not modified.
+    shared = simulation_kwargs["rapid_test_models"]["demand"]["model"]
+    assert shared(states=None) is None
@@ -4,11 +4,20 @@ import pytest
 from numpy.testing import assert_array_equal
 from pandas.testing import assert_series_equal
 
+import src.shared
 from src.shared import _create_group_ids
 from src.shared import _determine_number_of_groups
 from src.shared import _expand_or_contract_ids
+from src.shared import add_integer_codes
 from src.shared import create_groups_from_dist
+from src.shared import create_rng
 from src.shared import draw_groups
+from src.shared import get_integer_codes
+from src.shared import get_params_slice
+from src.shared import get_params_value
+from src.shared import get_params_view
+from src.shared import get_period_mask
+from src.shared import map_with_integer_codes
 
 
 @pytest.fixture
@@ -101,3 +110,139 @@ def test_create_groups_from_dist(monkeypatch):
         dtype="category",
     )
     assert_series_equal(res, expected)
+
+
+def test_add_integer_codes():
+    states = pd.DataFrame(
+        {
+            "state": ["Berlin", "Bavaria", "Berlin"],
+            "age_group": ["80-100", "0-9", "10-19"],
+        }
+    )
+    res = add_integer_codes(states)
+    assert_array_equal(res["state_code"], [1, 0, 1])
+    assert_array_equal(res["age_group_code"], [8, 0, 1])
+    assert "state_code" not in states
+
+
+@pytest.mark.parametrize("preprocess", [True, False])
+def test_map_with_integer_codes(preprocess):
+    states = pd.DataFrame({"state": ["Berlin", "Bavaria", None, "Hamburg"]})
+    if preprocess:
+        states = add_integer_codes(states)
+    res = map_with_integer_codes(states, "state", {"Berlin": 0.5, "Bavaria": 0.2}, 0)
+    assert_array_equal(res, [0.5, 0.2, 0, 0])
+
+
+def test_get_integer_codes_uses_categories_of_column():
+    states = pd.DataFrame({"age_group": ["10-19", "0-9"]})
+    states["age_group"] = pd.Categorical(
+        states["age_group"], categories=["10-19", "0-9"]
+    )
+    codes, categories = get_integer_codes(states, "age_group")
+    assert_array_equal(codes, [0, 1])
+    assert list(categories) == ["10-19", "0-9"]
+
+
+def test_create_rng_creates_independent_streams_without_global_state():
+    np.random.seed(0)
+    expected_global = np.random.uniform(size=3)
+
+    np.random.seed(0)
+    first = create_rng(42).random(3)
+    second = create_rng(42, stream=1).random(3)
+    assert_array_equal(np.random.uniform(size=3), expected_global)
+
+    assert_array_equal(first, create_rng(42).random(3))
+    assert not np.allclose(first, second)
+    assert not np.allclose(first, create_rng(43).random(3))
+
+
+@pytest.fixture
+def params():
+    index = pd.MultiIndex.from_tuples(
+        [
+            ("events", "b117", "2021-01-15"),
+            ("events", "b117", "2021-01-01"),
+            ("a", "b", "c"),
+        ],
+        names=["category", "subcategory", "name"],
+    )
+    return pd.DataFrame({"value": [2.0, 1.0, 0.5]}, index=index)
+
+
+def test_get_params_value_and_slice(params):
+    assert get_params_value(params, ("a", "b", "c")) == 0.5
+
+    res = get_params_slice(params, ("events", "b117"))
+    expected = pd.Series(
+        [1.0, 2.0], index=pd.Index(["2021-01-01", "2021-01-15"], name="name")
+    )
+    assert_series_equal(res, expected, check_names=False)
+    assert get_params_slice(params, ("events", "b117")) is res
+
+
+def test_get_params_view_is_shared_by_copies_and_changes_with_values(params):
+    view = get_params_view(params)
+    assert get_params_view(params.copy()) is view
+    assert get_params_view(params["value"]) is view
+
+    changed = params.copy()
+    changed.loc[("a", "b", "c"), "value"] = 0.7
+    assert get_params_view(changed) is not view
+    assert get_params_value(changed, ("a", "b", "c")) == 0.7
+
+
+def test_get_params_view_recognizes_known_params_by_id(params, monkeypatch):
+    calls = []
+    build_params_key = src.shared._build_params_key
+
+    def _counting_build_params_key(index):
+        calls.append(index)
+        return build_params_key(index)
+
+    monkeypatch.setattr(src.shared, "_build_params_key", _counting_build_params_key)
+    view = get_params_view(params)
+    assert get_params_view(params) is view
+    assert len(calls) == 1
+
+    # values which are changed in place are detected.
+    params.loc[("a", "b", "c"), "value"] = 0.7
+    assert get_params_view(params) is not view
+    assert get_params_value(params, ("a", "b", "c")) == 0.7
+
+
+def test_get_params_view_evicts_least_recently_used_views(params, monkeypatch):
+    monkeypatch.setattr(src.shared, "MAX_PARAMS_VIEWS", 2)
+    first, second, third = [params.assign(value=i) for i in range(3)]
+    view = get_params_view(first)
+    get_params_view(second)
+    assert get_params_view(first) is view
+    get_params_view(third)
+    assert get_params_view(first) is view
+    assert len(src.shared._PARAMS_VIEWS) == 2
+
+
+def test_get_period_mask_is_reused_within_period_and_stage():
+    states = pd.DataFrame({"a": [1, 2, 3], "date": pd.Timestamp("2021-03-01")})
+    mask = get_period_mask(states, "a >= 2")
+    assert_array_equal(mask, [False, True, True])
+    assert get_period_mask(states, "a >= 2") is mask
+    assert not mask.flags.writeable
+
+    states["a"] = [3, 1, 1]
+    assert get_period_mask(states, "a >= 2") is mask
+    after = get_period_mask(states, "a >= 2", stage="after_rapid_tests")
+    assert_array_equal(after, [True, False, False])
+
+    states["date"] = pd.Timestamp("2021-03-02")
+    assert get_period_mask(states, "a >= 2", stage="after_rapid_tests") is not after
+
+
+def test_get_period_mask_without_date_and_with_constant():
+    states = pd.DataFrame({"a": [1, 2, 3]})
+    assert_array_equal(get_period_mask(states, "a == 2"), [False, True, False])
+    assert_array_equal(get_period_mask(states, "True"), [True, True, True])
+
+    with pytest.raises(ValueError, match="stage must be one of"):
+        get_period_mask(states, "a == 2", stage="middle")
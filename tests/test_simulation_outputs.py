@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.calculate_moments import calculate_period_outcomes_sim
+from src.calculate_moments import period_output_to_pandas
+from src.shared import add_integer_codes
+from src.simulation.load_simulation_inputs import calculate_period_virus_share
+from src.simulation.simulation_outputs import load_period_outputs
+from src.simulation.simulation_outputs import save_period_outputs
+
+
+@pytest.fixture
+def period_outputs():
+    rng = np.random.default_rng(0)
+    states = pd.DataFrame(
+        {
+            "newly_infected": rng.random(100) < 0.3,
+            "state": rng.choice(["Berlin", "Hessen"], size=100),
+            "age_group_rki": rng.choice(["0-4", "5-14", "15-34"], size=100),
+        }
+    )
+    states = add_integer_codes(states)
+    states["occupation"] = rng.choice(["working", "retired"], size=100)
+
+    period_outputs = {"newly_infected": [], "r_effective": []}
+    for groupby in ["state", "age_group_rki", "occupation"]:
+        period_outputs[f"newly_infected_by_{groupby}"] = []
+
+    for date in pd.date_range("2021-03-01", periods=5):
+        states["date"] = date
+        outcomes = {"newly_infected": "newly_infected"}
+        for groupby in [None, "state", "age_group_rki", "occupation"]:
+            gb_str = f"_by_{groupby}" if groupby is not None else ""
+            sr = calculate_period_outcomes_sim(states, outcomes, groupby)
+            period_outputs["newly_infected" + gb_str].append(sr["newly_infected"])
+        period_outputs["r_effective"].append(pd.Series([1.2], index=[date]))
+    return period_outputs
+
+
+def test_save_and_load_period_outputs(period_outputs, tmp_path):
+    path = tmp_path / "period_outputs.parquet"
+    save_period_outputs(period_outputs, path)
+
+    loaded = load_period_outputs(path)
+    assert set(loaded) == set(period_outputs)
+    for name, outputs in period_outputs.items():
+        res = period_output_to_pandas(loaded[name])
+        pd.testing.assert_series_equal(res, pd.concat(outputs))
+
+
+def test_load_subset_of_period_outputs(period_outputs, tmp_path):
+    path = tmp_path / "period_outputs.parquet"
+    save_period_outputs(period_outputs, path)
+
+    loaded = load_period_outputs(path, outputs=["newly_infected_by_state"])
+    assert list(loaded) == ["newly_infected_by_state"]
+    assert loaded["newly_infected_by_state"]["values"].shape == (5, 2)
+
+
+def test_save_period_outputs_with_different_dates_raises(period_outputs, tmp_path):
+    period_outputs["r_effective"] = period_outputs["r_effective"][1:]
+    with pytest.raises(ValueError, match="same dates"):
+        save_period_outputs(period_outputs, tmp_path / "period_outputs.parquet")
+
+
+def test_save_and_load_period_outputs_with_empty_days(tmp_path):
+    period_outputs = {"newly_infected": [], "share_b117": [], "irregular": []}
+    for i, date in enumerate(pd.date_range("2021-03-01", periods=3)):
+        states = pd.DataFrame(
+            {
+                "date": date,
+                "virus_strain": pd.Categorical(["b117", "base_strain"]),
+                "newly_infected": [i != 1, True] if i != 1 else [False, False],
+            }
+        )
+        period_outputs["newly_infected"].append(
+            pd.Series([states["newly_infected"].sum()], index=[date])
+        )
+        period_outputs["share_b117"].append(
+            calculate_period_virus_share(states, strain="b117")
+        )
+        period_outputs["irregular"].append(pd.Series(range(i + 1), name="irregular"))
+    assert [len(sr) for sr in period_outputs["share_b117"]] == [1, 0, 1]
+
+    path = tmp_path / "period_outputs.parquet"
+    save_period_outputs(period_outputs, path)
+    loaded = load_period_outputs(path)
+
+    for name, outputs in period_outputs.items():
+        expected = pd.concat([sr for sr in outputs if len(sr) > 0])
+        res = period_output_to_pandas(loaded[name])
+        pd.testing.assert_series_equal(res, expected, check_freq=False)
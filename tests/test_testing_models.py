@@ -1,8 +1,10 @@
+import numpy as np
 import pandas as pd
 import pytest
 
 from src.testing.testing_models import _calculate_test_demand_from_rapid_tests
 from src.testing.testing_models import _calculate_test_demand_from_share_known_cases
+from src.testing.testing_models import _sample_positions
 from src.testing.testing_models import allocate_tests
 from src.testing.testing_models import process_tests
 
@@ -79,7 +81,8 @@ def test_calculate_test_demand_from_rapid_tests():
     states["is_tested_positive_by_rapid_test"] = [True, False, True, True, False]
     states["currently_infected"] = [False, True, False, True, False]
 
-    res = _calculate_test_demand_from_rapid_tests(states, 1)
+    rng = np.random.default_rng(0)
+    res = _calculate_test_demand_from_rapid_tests(states, 1, rng)
     expected = pd.Series([False, False, False, True, False], index=states.index)
     pd.testing.assert_series_equal(res, expected, check_names=False)
 
@@ -102,6 +105,26 @@ def test_calculate_test_demand_from_share_known_cases():
         states=states,
         share_known_cases=share_known_cases,
         share_of_tests_for_symptomatics=share_of_tests_for_symptomatics,
+        rng=np.random.default_rng(0),
     )
 
     pd.testing.assert_series_equal(calculated, expected)
+
+
+def test_calculate_test_demand_from_rapid_tests_with_non_default_index():
+    states = pd.DataFrame(index=[10, 5, 7, 3])
+    states["cd_received_rapid_test"] = 0
+    states["is_tested_positive_by_rapid_test"] = [True, True, False, True]
+    states["currently_infected"] = True
+
+    rng = np.random.default_rng(0)
+    res = _calculate_test_demand_from_rapid_tests(states, 1, rng)
+    expected = pd.Series([True, True, False, True], index=states.index)
+    pd.testing.assert_series_equal(res, expected, check_names=False)
+
+
+def test_sample_positions():
+    pool = np.arange(0, 1_000_000, 2)
+    sampled = _sample_positions(pool, 1000, np.random.default_rng(0))
+    assert len(np.unique(sampled)) == 1000
+    assert np.isin(sampled, pool).all()
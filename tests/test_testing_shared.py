@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from src.testing.shared import get_piecewise_linear_interpolation
+from src.testing.shared import get_piecewise_linear_interpolation_for_one_day
+
+
+@pytest.fixture
+def params_slice():
+    params_slice = pd.DataFrame(
+        {"value": [0.1, 0.5, 0.2]}, index=["2021-03-01", "2021-03-05", "2021-03-15"]
+    )
+    params_slice.index.name = "name"
+    return params_slice
+
+
+def test_get_piecewise_linear_interpolation_for_one_day(params_slice):
+    expected = get_piecewise_linear_interpolation(params_slice)
+    for date, value in expected.items():
+        res = get_piecewise_linear_interpolation_for_one_day(date, params_slice)
+        assert res == pytest.approx(value)
+
+    assert list(params_slice.index) == ["2021-03-01", "2021-03-05", "2021-03-15"]
+
+
+def test_get_piecewise_linear_interpolation_for_one_day_with_changed_params(
+    params_slice,
+):
+    date = pd.Timestamp("2021-03-03")
+    assert get_piecewise_linear_interpolation_for_one_day(
+        date, params_slice
+    ) == pytest.approx(0.3)
+
+    params_slice.loc["2021-03-05", "value"] = 0.9
+    assert get_piecewise_linear_interpolation_for_one_day(
+        date, params_slice
+    ) == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize("date", ["2021-02-28", "2021-03-16"])
+def test_get_piecewise_linear_interpolation_for_one_day_outside_of_dates(
+    params_slice, date
+):
+    with pytest.raises(KeyError):
+        get_piecewise_linear_interpolation_for_one_day(date, params_slice)